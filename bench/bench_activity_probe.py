@@ -0,0 +1,73 @@
+"""活动检测探测开销微基准
+
+对当前平台上所有可用的活动检测后端，测量单次 get_idle_seconds() 的耗时。
+在Windows上同时测量旧实现（每次探测重新定义并分配 LASTINPUTINFO）作为对比。
+
+用法（在仓库根目录）:
+    python bench/bench_activity_probe.py --probes 100000
+"""
+import argparse
+import ctypes
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from lib.activity_detector import BACKENDS
+from lib.logger_manager import LoggerManager
+
+
+def legacy_windows_probe():
+    """旧版实现：每次探测都重新定义结构体类"""
+    import ctypes.wintypes
+
+    class LASTINPUTINFO(ctypes.Structure):
+        _fields_ = [("cbSize", ctypes.wintypes.UINT),
+                    ("dwTime", ctypes.wintypes.DWORD)]
+
+    lii = LASTINPUTINFO()
+    lii.cbSize = ctypes.sizeof(LASTINPUTINFO)
+    ctypes.windll.user32.GetLastInputInfo(ctypes.byref(lii))
+    return (ctypes.windll.kernel32.GetTickCount() - lii.dwTime) // 1000
+
+
+def time_probe(probe, probes):
+    """返回每次探测的平均耗时（纳秒）"""
+    for _ in range(min(1000, probes)):
+        probe()
+    start = time.perf_counter_ns()
+    for _ in range(probes):
+        probe()
+    return (time.perf_counter_ns() - start) / probes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="活动检测探测开销微基准")
+    parser.add_argument("--probes", type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    LoggerManager.get_logger().setLevel(logging.WARNING)
+    results = {}
+    for name, backend_class in BACKENDS.items():
+        try:
+            backend = backend_class()
+        except Exception as e:
+            print(f"{name:10s} 不可用: {e}")
+            continue
+        try:
+            results[name] = time_probe(backend.get_idle_seconds, args.probes)
+        finally:
+            backend.close()
+
+    if sys.platform == "win32":
+        results["windows-legacy"] = time_probe(legacy_windows_probe, args.probes)
+
+    for name, ns in results.items():
+        print(f"{name:16s} {ns:10.0f} ns/次")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
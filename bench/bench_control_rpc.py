@@ -0,0 +1,121 @@
+"""控制通道吞吐量基准
+
+在本进程内启动 ControlServer（status 方法返回与核心相同结构的数据），测量:
+    1. 单个长连接上连续请求的吞吐量（status --watch 和常驻小部件的用法）
+    2. 每个请求新建连接的吞吐量
+    3. 多个客户端并发时的总吞吐量
+    4. 命令行客户端 python -m lib.ctl status 的完整耗时（含解释器启动），并确认没有导入wx
+
+运行前需要退出正在运行的护眼助手（端点被占用时无法启动服务）。
+
+用法（在仓库根目录）:
+    python bench/bench_control_rpc.py --requests 20000 --clients 4
+"""
+import argparse
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC_DIR)
+
+from lib.control_server import ControlServer
+from lib.ipc import ControlClient, send_command
+from lib.logger_manager import LoggerManager
+
+
+def status():
+    return {
+        "state": "working",
+        "status_text": "工作中: 还剩 12:34",
+        "remaining_seconds": 754,
+        "state_seconds": 1046,
+        "work_time": 30,
+        "rest_time": 1,
+    }
+
+
+def bench_persistent(count):
+    with ControlClient() as client:
+        start = time.perf_counter()
+        for _ in range(count):
+            client.call("status")
+        return count / (time.perf_counter() - start)
+
+
+def bench_reconnect(count):
+    start = time.perf_counter()
+    for _ in range(count):
+        send_command("status")
+    return count / (time.perf_counter() - start)
+
+
+def bench_concurrent(clients, count):
+    barrier = threading.Barrier(clients + 1)
+
+    def worker():
+        with ControlClient(timeout=5) as client:
+            barrier.wait()
+            for _ in range(count):
+                client.call("status")
+
+    threads = [threading.Thread(target=worker) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return clients * count / (time.perf_counter() - start)
+
+
+def bench_cli(runs):
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "lib.ctl", "status"], cwd=SRC_DIR, check=True, capture_output=True)
+        durations.append(time.perf_counter() - start)
+    check = "import sys, lib.ctl; print(' '.join(m for m in ('wx', 'psutil') if m in sys.modules))"
+    heavy = subprocess.run([sys.executable, "-c", check], cwd=SRC_DIR, check=True, capture_output=True,
+                           text=True).stdout.strip()
+    durations.sort()
+    return durations[len(durations) // 2], heavy
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="控制通道吞吐量基准")
+    parser.add_argument("--requests", type=int, default=20000, help="长连接上的请求数")
+    parser.add_argument("--clients", type=int, default=4, help="并发客户端数")
+    parser.add_argument("--cli-runs", type=int, default=10, help="命令行客户端的运行次数")
+    args = parser.parse_args(argv)
+
+    LoggerManager.get_logger().setLevel(logging.WARNING)
+
+    server = ControlServer({"status": status})
+    try:
+        server.start()
+    except OSError as e:
+        print(f"无法启动控制通道（护眼助手是否正在运行？）: {e}")
+        return 1
+
+    try:
+        persistent = bench_persistent(args.requests)
+        reconnect = bench_reconnect(max(1, args.requests // 10))
+        concurrent = bench_concurrent(args.clients, max(1, args.requests // args.clients))
+        cli_seconds, heavy = bench_cli(args.cli_runs)
+    finally:
+        server.stop()
+
+    print(f"长连接:        {persistent:10.0f} 请求/秒  ({1e6 / persistent:.1f} 微秒/请求)")
+    print(f"每次新建连接:  {reconnect:10.0f} 请求/秒  ({1e6 / reconnect:.1f} 微秒/请求)")
+    print(f"{args.clients}个并发客户端: {concurrent:10.0f} 请求/秒")
+    print(f"lib.ctl status: {cli_seconds * 1000:9.1f} 毫秒/次（中位数，含解释器启动）")
+    print(f"lib.ctl 导入的重量级模块: {heavy or '无'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
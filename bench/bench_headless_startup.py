@@ -0,0 +1,100 @@
+"""无界面核心与wx的启动时间和内存对比
+
+每个场景在新的解释器进程中运行（工作目录为临时目录，不读取真实的配置和统计文件），
+报告从进程启动到就绪的时间和常驻内存（RSS）:
+    python        空解释器
+    headless      导入并创建 EyeRestCore，收到第一个核心事件（daemon.py 的启动路径）
+    import wx     只导入wx
+    wx.App        导入wx并创建 wx.App（需要图形环境）
+
+用法（在仓库根目录）:
+    python bench/bench_headless_startup.py --runs 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+# 子进程在就绪后执行，输出 {"seconds": 启动到就绪的秒数, "rss_kb": 常驻内存}
+REPORT = """
+import json, os, sys, time
+def _rss_kb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    try:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss // 1024 if sys.platform == "darwin" else rss
+    except ImportError:
+        return None
+print(json.dumps({"seconds": time.time() - float(sys.argv[1]), "rss_kb": _rss_kb()}))
+"""
+
+SCENARIOS = {
+    "python": "",
+    "headless": f"""
+import sys, logging
+sys.path.insert(0, {SRC_DIR!r})
+from lib.logger_manager import LoggerManager
+LoggerManager.get_logger().setLevel(logging.WARNING)
+from lib.app_core import EyeRestCore
+core = EyeRestCore()
+subscription = core.events.subscribe()
+core.start_work_session_from_config()
+subscription.get(timeout=5)
+""",
+    "import wx": "import wx\n",
+    "wx.App": "import wx\napp = wx.App(False)\n",
+}
+
+
+def run_scenario(code, workdir):
+    """运行一次场景，失败时返回None"""
+    script = code + REPORT
+    start = "%.6f" % time.time()
+    result = subprocess.run([sys.executable, "-c", script, start], cwd=workdir,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="无界面核心与wx的启动时间和内存对比")
+    parser.add_argument("--runs", type=int, default=5, help="每个场景的运行次数，取中位数")
+    args = parser.parse_args(argv)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, code in SCENARIOS.items():
+            samples = [run_scenario(code, workdir) for _ in range(args.runs)]
+            samples = [s for s in samples if s is not None]
+            if not samples:
+                print(f"{name:10s} 无法运行（未安装或没有图形环境）")
+                continue
+            seconds = sorted(s["seconds"] for s in samples)[len(samples) // 2]
+            rss = sorted(s["rss_kb"] or 0 for s in samples)[len(samples) // 2]
+            results[name] = (seconds, rss)
+            print(f"{name:10s} 就绪 {seconds * 1000:7.1f} 毫秒   RSS {rss / 1024:6.1f} MiB")
+
+    if "headless" in results and "import wx" in results:
+        base_seconds, base_rss = results["python"]
+        core_seconds, core_rss = results["headless"]
+        wx_seconds, wx_rss = results["import wx"]
+        print(f"核心本身: {(core_seconds - base_seconds) * 1000:.1f} 毫秒 / {(core_rss - base_rss) / 1024:.1f} MiB，"
+              f"仅导入wx: {(wx_seconds - base_seconds) * 1000:.1f} 毫秒 / {(wx_rss - base_rss) / 1024:.1f} MiB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
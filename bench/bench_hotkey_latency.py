@@ -0,0 +1,76 @@
+"""热键触发延迟与绑定更新开销
+
+使用假热键后端从独立线程注入按键，测量:
+    1. 按键到回调把事件放入队列的延迟（HotkeyManager 自带的统计）
+    2. 按键到事件被消费线程取出的延迟（包含队列交接）
+    3. set_bindings() 修改一个热键时实际增删的绑定数
+
+用法（在仓库根目录）:
+    python bench/bench_hotkey_latency.py --presses 20000
+"""
+import argparse
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from lib.hotkey_backends import FakeHotkeyBackend
+from lib.hotkey_manager import HotkeyManager
+from lib.logger_manager import LoggerManager
+from lib.metrics import LatencyStats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="热键触发延迟基准")
+    parser.add_argument("--presses", type=int, default=20000, help="注入的按键次数")
+    args = parser.parse_args(argv)
+
+    LoggerManager.get_logger().setLevel(logging.WARNING)
+
+    backend = FakeHotkeyBackend()
+    manager = HotkeyManager(backend=backend)
+    events = queue.Queue()
+
+    def force_rest():
+        events.put({'type': 'FORCE_REST', 'pressed_at': pressed_at[0]})
+
+    pressed_at = [0.0]
+    manager.set_bindings([("ctrl+shift+r", force_rest), ("ctrl+shift+e", lambda: None)])
+
+    consumed = LatencyStats(window=args.presses)
+
+    def consumer():
+        for _ in range(args.presses):
+            event = events.get()
+            consumed.record(time.time() - event['pressed_at'])
+
+    thread = threading.Thread(target=consumer)
+    thread.start()
+
+    def injector():
+        for _ in range(args.presses):
+            pressed_at[0] = time.time()
+            backend.press("ctrl+shift+r", pressed_at[0])
+
+    injector_thread = threading.Thread(target=injector)
+    injector_thread.start()
+    injector_thread.join()
+    thread.join()
+
+    print(f"按键 → 进入事件队列: {manager.get_latency_stats()}")
+    print(f"按键 → 事件被取出:   {consumed.snapshot()}")
+
+    adds, removes = backend.add_calls, backend.remove_calls
+    manager.set_bindings([("ctrl+shift+t", force_rest), ("ctrl+shift+e", lambda: None)])
+    print(f"修改一个热键: 新增 {backend.add_calls - adds} 个，删除 {backend.remove_calls - removes} 个绑定，"
+          f"监听{'未中断' if manager.is_running else '已停止'}")
+    manager.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
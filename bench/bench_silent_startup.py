@@ -0,0 +1,110 @@
+"""静默启动（已有配置文件）到托盘图标就绪的时间和内存
+
+每个场景在新的解释器进程中运行，工作目录为带默认配置文件的临时目录:
+    lazy     当前行为：只创建核心和托盘图标，设置/统计界面和休息窗口在第一次打开时创建
+    eager    启动时立即创建设置/统计界面和休息窗口（延迟创建之前的行为）
+
+另外报告 lazy 模式下第一次打开主窗口（创建界面）的耗时。
+需要wx和图形环境，休息窗口需要pywin32（Windows）。
+
+用法（在仓库根目录）:
+    python bench/bench_silent_startup.py --runs 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+# 子进程输出 {"tray": 启动到托盘就绪的秒数, "open": 第一次打开窗口的秒数, "rss_kb": 托盘就绪时的常驻内存}
+SCRIPT = """
+import json, logging, sys, time
+sys.path.insert(0, {src!r})
+
+def _rss_kb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss // 1024
+    except ImportError:
+        return None
+
+import wx
+from lib.logger_manager import LoggerManager
+LoggerManager.get_logger().setLevel(logging.WARNING)
+from lib.main_window import MainFrame
+
+app = wx.App(False)
+frame = MainFrame()
+if {eager!r}:
+    frame.ensure_ui()
+    frame.rest_screen
+frame.core.start_work_session_from_config()
+tray = time.time() - float(sys.argv[1])
+rss = _rss_kb()
+
+start = time.perf_counter()
+frame.ensure_ui()
+opened = time.perf_counter() - start
+
+frame.core.cleanup()
+print(json.dumps({{"tray": tray, "open": opened, "rss_kb": rss}}))
+"""
+
+
+def run_scenario(eager, workdir):
+    """运行一次场景，失败时返回None"""
+    script = SCRIPT.format(src=SRC_DIR, eager=eager)
+    start = "%.6f" % time.time()
+    result = subprocess.run([sys.executable, "-c", script, start], cwd=workdir,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="静默启动到托盘图标就绪的时间和内存")
+    parser.add_argument("--runs", type=int, default=5, help="每个场景的运行次数，取中位数")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # 有配置文件时 main.py 走静默启动
+        sys.path.insert(0, SRC_DIR)
+        from lib.config import Config
+        config = Config()
+        config.config_path = os.path.join(workdir, "eye_rest_config.json")
+        config.save()
+
+        for name, eager in (("lazy", False), ("eager", True)):
+            samples = [run_scenario(eager, workdir) for _ in range(args.runs)]
+            samples = [s for s in samples if s is not None]
+            if not samples:
+                print(f"{name:6s} 无法运行（需要wx、图形环境和pywin32）")
+                continue
+            tray = median(s["tray"] for s in samples)
+            rss = median(s["rss_kb"] or 0 for s in samples)
+            line = f"{name:6s} 托盘就绪 {tray * 1000:7.1f} 毫秒   RSS {rss / 1024:6.1f} MiB"
+            if not eager:
+                line += f"   首次打开窗口 {median(s['open'] for s in samples) * 1000:6.1f} 毫秒"
+            print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""启动性能基准：导入耗时、核心就绪和托盘就绪时间，超过基线时失败
+
+每个场景在新的解释器进程中运行（工作目录为带默认配置文件的临时目录），指标:
+    import_ms          -X importtime 统计的 lib.app_core 累计导入耗时
+    core_ready_ms      进程启动到 EyeRestCore 创建完成
+    timer_running_ms   进程启动到工作计时开始（收到进入工作状态的事件）
+    tray_ms            进程启动到托盘图标就绪（需要wx和图形环境，否则跳过）
+
+用 --bundle 测量 build_zipapp.py 生成的 .pyz（代码从包中导入）。
+用 --save-baseline 保存结果，之后用 --baseline 比较：任一指标比基线慢
+超过 --tolerance（比例）且超过 --min-delta-ms 时以退出码 1 结束。
+
+用法（在仓库根目录）:
+    python bench/bench_startup.py --runs 7 --save-baseline bench/startup_baseline.json
+    python bench/bench_startup.py --runs 7 --baseline bench/startup_baseline.json
+    python build_zipapp.py && python bench/bench_startup.py --bundle dist/eye_rest.pyz
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+PATH_PRELUDE = """
+import sys
+sys.path.insert(0, {path!r})
+"""
+
+PRELUDE = PATH_PRELUDE + """
+import json, logging, time
+from lib.logger_manager import LoggerManager
+LoggerManager.get_logger().setLevel(logging.WARNING)
+"""
+
+# 输出 {"core_ready": 秒, "timer_running": 秒}，时间从父进程启动子进程时算起
+CORE_SCENARIO = """
+from lib.app_core import EyeRestCore
+from lib.app_states import AppState
+core = EyeRestCore()
+core_ready = time.time() - float(sys.argv[1])
+subscription = core.events.subscribe(kinds=["transition"])
+core.start_work_session_from_config()
+while subscription.get(timeout=5).new_state != AppState.WORKING.value:
+    pass
+timer_running = time.time() - float(sys.argv[1])
+core.cleanup()
+print(json.dumps({"core_ready": core_ready, "timer_running": timer_running}))
+"""
+
+# 与 main.py 的静默启动路径相同
+TRAY_SCENARIO = """
+import wx
+app = wx.App(False)
+from lib.main_window import MainFrame
+frame = MainFrame()
+tray = time.time() - float(sys.argv[1])
+frame.core.cleanup()
+print(json.dumps({"tray": tray}))
+"""
+
+IMPORT_SCENARIO = "from lib.app_core import EyeRestCore\n"
+
+
+def parse_importtime(stderr):
+    """解析 -X importtime 的输出
+    Args:
+        stderr: 子进程的标准错误输出
+    Returns:
+        list: [(模块名, 自身耗时微秒, 累计耗时微秒, 嵌套层级), ...]，按导入完成顺序
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # 表头
+        name = fields[2].rstrip()
+        level = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(fields[0]), int(fields[1]), level))
+    return rows
+
+
+def run_script(code, path, workdir, extra_args=(), prelude=PRELUDE):
+    """在新进程中运行场景，返回 (returncode, stdout, stderr)"""
+    script = prelude.format(path=path) + code
+    start = "%.6f" % time.time()
+    result = subprocess.run([sys.executable, *extra_args, "-c", script, start], cwd=workdir,
+                            capture_output=True, text=True)
+    return result.returncode, result.stdout, result.stderr
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2] if values else None
+
+
+def measure(path, runs, workdir, top):
+    """运行所有场景，返回 (指标字典, 最慢的导入列表)"""
+    metrics = {}
+    imports = []
+    samples = []
+    for _ in range(runs):
+        code, _, stderr = run_script(IMPORT_SCENARIO, path, workdir, ("-X", "importtime"), PATH_PRELUDE)
+        if code != 0:
+            raise RuntimeError(f"导入 lib.app_core 失败:\n{stderr}")
+        rows = parse_importtime(stderr)
+        samples.append(next(cumulative for name, _, cumulative, _ in rows if name == "lib.app_core"))
+        imports = rows
+    metrics["import_ms"] = median(samples) / 1000
+    # 最后一次运行中自身耗时最多的模块（自身耗时不重复计算子模块）
+    slowest = sorted(imports, key=lambda row: row[1], reverse=True)[:top]
+
+    core_samples = []
+    for _ in range(runs):
+        code, stdout, stderr = run_script(CORE_SCENARIO, path, workdir)
+        if code != 0:
+            raise RuntimeError(f"核心启动失败:\n{stderr}")
+        core_samples.append(json.loads(stdout.strip().splitlines()[-1]))
+    metrics["core_ready_ms"] = median(s["core_ready"] for s in core_samples) * 1000
+    metrics["timer_running_ms"] = median(s["timer_running"] for s in core_samples) * 1000
+
+    tray_samples = []
+    for _ in range(runs):
+        code, stdout, _ = run_script(TRAY_SCENARIO, path, workdir)
+        if code != 0:
+            break  # 没有wx或图形环境
+        tray_samples.append(json.loads(stdout.strip().splitlines()[-1])["tray"])
+    if tray_samples:
+        metrics["tray_ms"] = median(tray_samples) * 1000
+    return metrics, slowest
+
+
+def compare(metrics, baseline, tolerance, min_delta_ms):
+    """与基线比较
+    Returns:
+        list: 超过阈值的指标说明，为空表示没有退化
+    """
+    regressions = []
+    for name, value in metrics.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if value > base * (1 + tolerance) and value - base > min_delta_ms:
+            regressions.append(f"{name}: {value:.1f} 毫秒，基线 {base:.1f} 毫秒（+{(value / base - 1) * 100:.0f}%）")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="启动性能基准")
+    parser.add_argument("--runs", type=int, default=5, help="每个场景的运行次数，取中位数")
+    parser.add_argument("--bundle", help="测量 zipapp 包（build_zipapp.py 的输出）而不是 src 目录")
+    parser.add_argument("--top", type=int, default=10, help="列出自身导入耗时最多的模块数")
+    parser.add_argument("--baseline", help="基线文件，指标退化超过阈值时退出码为1")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="允许比基线慢的比例，默认0.25")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0,
+                        help="比基线慢的绝对值小于该值时不算退化，避免短指标的抖动，默认5毫秒")
+    parser.add_argument("--save-baseline", help="把本次结果保存为基线文件")
+    parser.add_argument("--json", action="store_true", help="以JSON输出结果")
+    args = parser.parse_args(argv)
+
+    path = os.path.abspath(args.bundle) if args.bundle else SRC_DIR
+    with tempfile.TemporaryDirectory() as workdir:
+        # 有配置文件时与实际的静默启动路径一致
+        sys.path.insert(0, SRC_DIR)
+        from lib.config import Config
+        config = Config()
+        config.config_path = os.path.join(workdir, "eye_rest_config.json")
+        config.save()
+        metrics, slowest = measure(path, args.runs, workdir, args.top)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(metrics, json.load(f), args.tolerance, args.min_delta_ms)
+
+    if args.json:
+        print(json.dumps({
+            "metrics": metrics,
+            "slowest_imports": [{"module": name, "self_us": own, "cumulative_us": cumulative}
+                                for name, own, cumulative, _ in slowest],
+            "regressions": regressions,
+        }, ensure_ascii=False, indent=2))
+    else:
+        print(f"代码位置: {path}")
+        for name, value in metrics.items():
+            print(f"  {name:18s} {value:8.1f} 毫秒")
+        if "tray_ms" not in metrics:
+            print("  tray_ms            跳过（需要wx和图形环境）")
+        print(f"自身导入耗时最多的 {len(slowest)} 个模块:")
+        for name, own, cumulative, _ in slowest:
+            print(f"  {own / 1000:7.2f} 毫秒（累计 {cumulative / 1000:7.2f}）  {name}")
+        for line in regressions:
+            print(f"退化 {line}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(metrics, f, indent=2)
+            f.write("\n")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
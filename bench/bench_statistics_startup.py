@@ -0,0 +1,79 @@
+"""统计管理器启动耗时对比
+
+比较立即加载（lazy=False，与原来的启动路径相同）和延迟加载两种方式下，
+StatisticsManager 构造耗时和第一次查询耗时。统计文件的小时数据设为昨天，
+以覆盖跨天重置的路径。
+
+用法（在仓库根目录）:
+    python bench/bench_statistics_startup.py --repeat 200
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from lib import statistics_crdt
+from lib.logger_manager import LoggerManager
+from lib.statistics_manager import StatisticsManager
+
+
+def write_sample(path, devices=3):
+    """写入一份包含多台设备、30天记录、小时数据为昨天的统计文件"""
+    today = date.today()
+    yesterday = (today - timedelta(days=1)).strftime(statistics_crdt.DATE_FORMAT)
+    counters = {}
+    for index in range(devices):
+        device = statistics_crdt.new_device_counters()
+        for offset in range(30):
+            day = (today - timedelta(days=offset)).strftime(statistics_crdt.DATE_FORMAT)
+            device["daily"][day] = 8 + offset % 5
+            device["total"] += device["daily"][day]
+        device["hourly"] = {"date": yesterday, "hours": [1] * 24}
+        counters[f"device-{index}"] = device
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(statistics_crdt.build_document(counters), f, indent=2)
+
+
+def measure(lazy, repeat):
+    construct, first_query = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        manager = StatisticsManager(lazy=lazy)
+        constructed = time.perf_counter()
+        manager.get_today_hourly_records()
+        queried = time.perf_counter()
+        construct.append((constructed - start) * 1000)
+        first_query.append((queried - constructed) * 1000)
+    return construct, first_query
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="统计管理器启动耗时对比")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    LoggerManager.get_logger().setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        write_sample("statistics.json")
+        before = os.path.getmtime("statistics.json")
+        for lazy in (False, True):
+            construct, first_query = measure(lazy, args.repeat)
+            label = "延迟加载" if lazy else "立即加载"
+            print(f"{label}: 构造 中位数 {statistics.median(construct):.3f} ms，"
+                  f"首次查询 中位数 {statistics.median(first_query):.3f} ms")
+        written = os.path.getmtime("statistics.json") != before
+        print(f"启动过程中是否写盘: {'是' if written else '否'}")
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""统计文件合并耗时
+
+生成数千个模拟设备的统计文件（其中每台设备还有若干个旧副本），测量合并全部文件和一半文件的耗时，
+耗时比明显超过线性（大于3）时退出码为1。合并结果的正确性（与顺序无关、幂等、旧格式文件）
+由 tests/test_statistics_merge.py 检查。
+
+用法（在仓库根目录）:
+    python bench/bench_stats_merge.py --devices 2000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from lib import statistics_crdt
+from lib.stats import merge_files
+
+
+def make_device_history(rng, days=30):
+    """生成一台设备的完整计数器，以及它在不同时间点导出的旧副本"""
+    today = date.today()
+    counters = statistics_crdt.new_device_counters()
+    snapshots = []
+    for offset in range(days, -1, -1):
+        day = (today - timedelta(days=offset)).strftime(statistics_crdt.DATE_FORMAT)
+        completed = rng.randint(0, 12)
+        if completed:
+            counters["daily"][day] = completed
+        counters["total"] += completed
+        counters["hourly"] = {"date": day, "hours": [0] * 24}
+        for _ in range(completed):
+            counters["hourly"]["hours"][rng.randint(8, 20)] += 1
+        if rng.random() < 0.1:
+            snapshots.append(json.loads(json.dumps(counters)))
+    return counters, snapshots
+
+
+def write_file(directory, name, devices):
+    path = os.path.join(directory, name)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(statistics_crdt.build_document(devices), f)
+    return path
+
+
+def timed_merge(paths):
+    start = time.perf_counter()
+    devices = merge_files(paths)
+    return devices, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="统计文件合并耗时")
+    parser.add_argument("--devices", type=int, default=2000, help="模拟设备数量")
+    parser.add_argument("--seed", type=int, default=20250817)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for index in range(args.devices):
+            device_id = f"device-{index:05d}"
+            counters, snapshots = make_device_history(rng)
+            paths.append(write_file(directory, f"{device_id}.json", {device_id: counters}))
+            for n, snapshot in enumerate(snapshots):
+                paths.append(write_file(directory, f"{device_id}.old{n}.json", {device_id: snapshot}))
+
+        _, elapsed = timed_merge(paths)
+        print(f"合并 {len(paths)} 个文件（{args.devices} 台设备）: {elapsed * 1000:.1f} ms")
+
+        _, half_elapsed = timed_merge(paths[: len(paths) // 2])
+        ratio = elapsed / half_elapsed if half_elapsed else 0
+        print(f"合并一半文件: {half_elapsed * 1000:.1f} ms，耗时比 {ratio:.2f}（线性约为2）")
+    if ratio > 3.0:
+        print(f"失败: 合并耗时增长超过线性: {ratio:.2f}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,338 @@
+"""核心热点路径的基准套件，输出机器可读的结果并与基线比较
+
+覆盖:
+    core.*        _handle_event 分发吞吐（直接调用和经过事件队列）、_start_timer/_cancel_timer
+    stats.*       StatisticsManager 加载、record_completed_rest 和各个读取方法，数据为 30/365/10000 天
+    config.*      Config.load / Config.save
+    hotkey.*      HotkeyManager._normalize_hotkey
+    activity.*    当前平台上可用的 ActivityDetector 后端的单次探测
+    chart.*       各统计图表在内存DC上的 draw_chart（需要wx和图形环境，否则跳过）
+
+每项结果为单次操作耗时的中位数（微秒）。--json 输出完整结果，--output 写入文件；
+用 --save-baseline 保存结果，之后用 --baseline 比较：任一项比基线慢超过 --tolerance（比例）
+且超过 --min-delta-us 时以退出码 1 结束。
+
+核心在临时目录中以假活动检测和假热键后端创建，不读写真实的配置、统计、锁文件和控制通道。
+
+用法（在仓库根目录）:
+    python bench/bench_suite.py --save-baseline bench_baseline.json
+    python bench/bench_suite.py --baseline bench_baseline.json
+    python bench/bench_suite.py --filter 'stats.*' --json
+"""
+import argparse
+import fnmatch
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+import timeit
+from datetime import date, datetime, timedelta
+from statistics import median
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+STATS_DAYS = (30, 365, 10000)
+SETUP_CALLS = 30            # 每次调用前需要重新准备数据的项目的调用次数
+
+
+class _NoPersistence:
+    """统计基准只测量内存中的更新，不写盘"""
+
+    def mark_dirty(self, obj):
+        pass
+
+
+class Suite:
+    """收集各项基准结果"""
+
+    def __init__(self, pattern=None, repeat=5, min_time=0.2):
+        """初始化
+        Args:
+            pattern: 只运行名称匹配该通配符的项目，None时全部运行
+            repeat: 每项重复的轮数，取中位数
+            min_time: 每轮的最短耗时（秒），据此确定每轮调用次数
+        """
+        self.pattern = pattern
+        self.repeat = repeat
+        self.min_time = min_time
+        self.results = {}
+        self.skipped = {}
+
+    def selected(self, name):
+        return self.pattern is None or fnmatch.fnmatch(name, self.pattern)
+
+    def bench(self, name, func, setup=None, ops=1):
+        """测量func的单次耗时
+        Args:
+            name: 项目名称，如 "stats.record_completed_rest[365]"
+            func: 无参函数
+            setup: 每次调用前执行的准备函数（不计时），None时连续调用func
+            ops: 每次调用包含的操作数，结果按单个操作计
+        """
+        if not self.selected(name):
+            return
+        if setup is None:
+            timer = timeit.Timer(func)
+            number, elapsed = timer.autorange()
+            number = max(1, int(number * self.min_time / max(elapsed, 1e-9)))
+            samples = [t / number for t in timer.repeat(self.repeat, number)]
+            calls = number * self.repeat
+        else:
+            samples = []
+            for _ in range(SETUP_CALLS):
+                setup()
+                start = time.perf_counter()
+                func()
+                samples.append(time.perf_counter() - start)
+            calls = SETUP_CALLS
+        self.results[name] = {
+            "us": round(median(samples) / ops * 1e6, 3),
+            "min_us": round(min(samples) / ops * 1e6, 3),
+            "calls": calls * ops,
+        }
+
+    def skip(self, name, reason):
+        if self.selected(name):
+            self.skipped[name] = reason
+
+
+def bench_core(suite):
+    """核心事件分发和定时器"""
+    from lib.app_core import EyeRestCore
+
+    core = EyeRestCore()
+    try:
+        heartbeat = {'type': 'HEARTBEAT', 'data': {'callback': lambda: None}}
+        # 空闲状态下这些事件只经过分发：STOP_WORK 在分支链开头，HEARTBEAT 在末尾
+        for event in ({'type': 'STOP_WORK'}, {'type': 'UPDATE_DISPLAY'}, heartbeat):
+            suite.bench(f"core.handle_event[{event['type']}]", lambda event=event: core._handle_event(event))
+
+        # 经过事件队列由事件循环线程处理，按单个事件计
+        batch = 1000
+
+        def put_batch():
+            for _ in range(batch):
+                core.event_queue.put(heartbeat)
+            core.event_queue.join()
+        suite.bench("core.event_queue_throughput", put_batch, ops=batch)
+
+        def start_cancel():
+            core._start_timer('bench', 3600, 'BENCH')
+            core._cancel_timer('bench')
+        suite.bench("core.start_cancel_timer", start_cancel)
+    finally:
+        core.cleanup()
+
+
+def make_statistics_document(days, today=None):
+    """生成包含最近days天每日记录的统计数据（绕过30天保留期，模拟旧版本或合并得到的长历史）"""
+    from lib import statistics_crdt
+
+    today = today or date.today()
+    counters = statistics_crdt.new_device_counters()
+    for offset in range(days):
+        day = (today - timedelta(days=offset)).strftime(statistics_crdt.DATE_FORMAT)
+        counters["daily"][day] = offset % 12 + 1
+        counters["total"] += offset % 12 + 1
+    counters["hourly"] = {"date": today.strftime(statistics_crdt.DATE_FORMAT),
+                          "hours": [hour % 5 for hour in range(24)]}
+    return statistics_crdt.build_document({statistics_crdt.get_device_id(): counters})
+
+
+def bench_statistics(suite):
+    """统计的记录、加载和读取"""
+    from lib.statistics_manager import StatisticsManager
+
+    for days in STATS_DAYS:
+        document = json.dumps(make_statistics_document(days))
+        manager = StatisticsManager(persistence=_NoPersistence(), lazy=True)
+
+        def reset(manager=manager, document=document):
+            manager.data = json.loads(document)
+            manager._loaded = True
+
+        # 记录时会清理超过30天的记录，每次调用前恢复完整数据
+        suite.bench(f"stats.record_completed_rest[{days}]",
+                    lambda manager=manager: manager.record_completed_rest(datetime.now()), setup=reset)
+
+        reset()
+        suite.bench(f"stats.get_today_count[{days}]", manager.get_today_count)
+        suite.bench(f"stats.get_week_count[{days}]", manager.get_week_count)
+        suite.bench(f"stats.get_daily_records_7[{days}]", lambda manager=manager: manager.get_daily_records(7))
+        suite.bench(f"stats.get_average_daily_count[{days}]", manager.get_average_daily_count)
+        suite.bench(f"stats.get_today_hourly_records[{days}]", manager.get_today_hourly_records)
+        suite.bench(f"stats.get_snapshot[{days}]", manager.get_snapshot)
+
+        with open(manager.stats_path, "w", encoding="utf-8") as f:
+            f.write(document)
+        suite.bench(f"stats.load[{days}]", manager.load)
+        os.remove(manager.stats_path)
+
+
+def bench_config(suite):
+    """配置文件的读写"""
+    from lib.config import Config
+
+    config = Config()
+    config.save()
+    suite.bench("config.load", config.load)
+    suite.bench("config.save", config.save)
+
+
+def bench_hotkey(suite):
+    from lib.hotkey_backends import FakeHotkeyBackend
+    from lib.hotkey_manager import HotkeyManager
+
+    manager = HotkeyManager(backend=FakeHotkeyBackend())
+    suite.bench("hotkey.normalize", lambda: manager._normalize_hotkey("ctrl+shift+r"))
+    suite.bench("hotkey.normalize_long", lambda: manager._normalize_hotkey("Control + Alt + Shift + Win + F12"))
+
+
+def bench_activity(suite):
+    """可用的活动检测后端的单次探测"""
+    from lib.activity_detector import ActivityDetector, BACKENDS
+
+    for name, backend_class in BACKENDS.items():
+        try:
+            backend = backend_class()
+        except Exception as e:
+            suite.skip(f"activity.probe[{name}]", str(e))
+            continue
+        detector = ActivityDetector(backend)
+        try:
+            suite.bench(f"activity.probe[{name}]", detector.get_idle_seconds)
+        finally:
+            detector.close()
+
+
+def bench_charts(suite):
+    """统计图表在内存DC上的绘制"""
+    names = ["chart.statistics", "chart.hourly", "chart.dark_hourly"]
+    try:
+        import wx  # 只有图表基准需要
+        app = wx.App(False)
+    except Exception as e:
+        for name in names:
+            suite.skip(name, f"需要wx和图形环境: {e}")
+        return
+
+    from lib.hourly_chart import DarkHourlyChart, HourlyChart
+    from lib.statistics_chart import StatisticsChart
+
+    frame = wx.Frame(None)
+    daily = [{"display_date": (date.today() - timedelta(days=6 - i)).strftime("%m-%d"), "completed": i * 2}
+             for i in range(7)]
+    hourly = [{"hour": hour, "completed": hour % 5} for hour in range(24)]
+    size = (600, 240)
+    bitmap = wx.Bitmap(*size)
+    try:
+        for name, chart_class, data in zip(names, (StatisticsChart, HourlyChart, DarkHourlyChart),
+                                           (daily, hourly, hourly)):
+            chart = chart_class(frame)
+            chart.SetSize(size)
+            chart.set_data(data)
+            dc = wx.MemoryDC(bitmap)
+            try:
+                suite.bench(name, lambda chart=chart, dc=dc: chart.draw_chart(dc))
+            finally:
+                dc.SelectObject(wx.NullBitmap)
+    finally:
+        frame.Destroy()
+        app.Destroy()
+
+
+GROUPS = (bench_core, bench_statistics, bench_config, bench_hotkey, bench_activity, bench_charts)
+
+
+def compare(results, baseline, tolerance, min_delta_us):
+    """与基线比较
+    Returns:
+        list: 超过阈值的项目说明，为空表示没有退化
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        value, base = result["us"], base["us"]
+        if value > base * (1 + tolerance) and value - base > min_delta_us:
+            regressions.append(f"{name}: {value:.2f} 微秒，基线 {base:.2f} 微秒（+{(value / base - 1) * 100:.0f}%）")
+    return regressions
+
+
+def run(args):
+    from lib.logger_manager import LoggerManager
+
+    LoggerManager.get_logger().setLevel(logging.WARNING)
+    suite = Suite(args.filter, args.repeat, args.min_time)
+    for func in GROUPS:
+        func(suite)
+    return suite
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="核心热点路径基准套件")
+    parser.add_argument("--filter", help="只运行名称匹配该通配符的项目，如 'stats.*' 或 '*[10000]'")
+    parser.add_argument("--repeat", type=int, default=5, help="每项重复的轮数，取中位数")
+    parser.add_argument("--min-time", type=float, default=0.2, help="每轮的最短耗时（秒）")
+    parser.add_argument("--baseline", help="基线文件，任一项退化超过阈值时退出码为1")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="允许比基线慢的比例，默认0.3")
+    parser.add_argument("--min-delta-us", type=float, default=1.0,
+                        help="比基线慢的绝对值小于该值时不算退化，避免极短项目的抖动，默认1微秒")
+    parser.add_argument("--save-baseline", help="把本次结果保存为基线文件")
+    parser.add_argument("--output", help="把完整结果写入JSON文件")
+    parser.add_argument("--json", action="store_true", help="以JSON输出结果")
+    args = parser.parse_args(argv)
+    paths = {key: os.path.abspath(value) if value else None
+             for key, value in (("baseline", args.baseline), ("save_baseline", args.save_baseline),
+                                ("output", args.output))}
+
+    # 配置、统计、锁文件和控制通道都位于工作目录或HOME下，先切换到临时目录再导入
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.environ["HOME"] = os.environ["USERPROFILE"] = workdir
+        os.environ["EYE_REST_ACTIVITY_BACKEND"] = "fake"
+        os.environ["EYE_REST_HOTKEY_BACKEND"] = "fake"
+        os.chdir(workdir)
+        sys.path.insert(0, SRC_DIR)
+        try:
+            suite = run(args)
+        finally:
+            os.chdir(cwd)
+
+    regressions = []
+    if paths["baseline"]:
+        with open(paths["baseline"], "r", encoding="utf-8") as f:
+            regressions = compare(suite.results, json.load(f)["results"], args.tolerance, args.min_delta_us)
+
+    document = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": suite.results,
+        "skipped": suite.skipped,
+        "regressions": regressions,
+    }
+    if args.json:
+        print(json.dumps(document, ensure_ascii=False, indent=2))
+    else:
+        width = max((len(name) for name in suite.results), default=0)
+        for name, result in suite.results.items():
+            print(f"  {name:{width}s} {result['us']:12.3f} 微秒")
+        for name, reason in suite.skipped.items():
+            print(f"  {name:{width}s} 跳过（{reason}）")
+        for line in regressions:
+            print(f"退化 {line}")
+
+    for key in ("output", "save_baseline"):
+        if paths[key]:
+            with open(paths[key], "w", encoding="utf-8") as f:
+                json.dump(document, f, ensure_ascii=False, indent=2)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""界面更新合并器的投递次数和卡顿后积压对比
+
+用一个处理回调队列的线程模拟界面线程（相当于 wx.CallAfter 的事件循环），
+界面线程每隔一段时间卡顿一次。两个生产者线程模拟核心的状态刷新和休息倒计时，
+并穿插少量必须按顺序执行的回调（休息开始、临时暂停/恢复）。比较:
+    direct      每个回调单独投递（原来的 wx.CallAfter 用法）
+    dispatcher  经过 UiDispatcher 合并
+
+用法（在仓库根目录）:
+    python bench/bench_ui_dispatch.py --seconds 2 --rate 500 --stall-ms 300
+"""
+import argparse
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from lib.logger_manager import LoggerManager
+from lib.ui_dispatcher import UiDispatcher
+
+
+class FakeGui:
+    """模拟界面线程：顺序执行投递的函数，按周期卡顿"""
+
+    def __init__(self, stall_every, stall_seconds):
+        self.calls = queue.Queue()
+        self.stall_every = stall_every
+        self.stall_seconds = stall_seconds
+        self.schedule_calls = 0
+        self.status_updates = 0
+        self.display_updates = 0
+        self.ordered = []
+        self.max_backlog = 0
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def call_after(self, func, *args):
+        self.schedule_calls += 1
+        self.calls.put((func, args))
+
+    def _run(self):
+        next_stall = time.perf_counter() + self.stall_every
+        while True:
+            func, args = self.calls.get()
+            if func is None:
+                return
+            self.max_backlog = max(self.max_backlog, self.calls.qsize())
+            func(*args)
+            if time.perf_counter() >= next_stall:
+                time.sleep(self.stall_seconds)  # 模拟界面卡顿（如绘制统计图、模态对话框）
+                next_stall = time.perf_counter() + self.stall_every
+
+    def on_status(self, text):
+        self.status_updates += 1
+
+    def on_display(self, data):
+        self.display_updates += 1
+
+    def on_ordered(self, name):
+        self.ordered.append(name)
+
+    def stop(self):
+        self.calls.put((None, ()))
+        self.thread.join()
+
+
+def run(mode, seconds, rate, stall_every, stall_seconds):
+    gui = FakeGui(stall_every, stall_seconds)
+    if mode == "dispatcher":
+        dispatcher = UiDispatcher(gui.call_after)
+        dispatcher.latest_only(gui.on_status)
+        post_status = lambda i: dispatcher(gui.on_status, i)
+        post_display = lambda i: dispatcher.post("rest_display", gui.on_display, i)
+        post_ordered = lambda name: dispatcher(gui.on_ordered, name)
+    else:
+        dispatcher = None
+        post_status = lambda i: gui.call_after(gui.on_status, i)
+        post_display = lambda i: gui.call_after(gui.on_display, i)
+        post_ordered = lambda name: gui.call_after(gui.on_ordered, name)
+
+    expected_ordered = []
+
+    def producer(post, ordered_prefix):
+        interval = 1.0 / rate
+        end = time.perf_counter() + seconds
+        i = 0
+        while time.perf_counter() < end:
+            post(i)
+            if i % 100 == 0:
+                name = f"{ordered_prefix}{i}"
+                expected_ordered.append(name)
+                post_ordered(name)
+            i += 1
+            time.sleep(interval)
+        return i
+
+    threads = [threading.Thread(target=producer, args=(post_status, "core-")),
+               threading.Thread(target=producer, args=(post_display, "rest-"))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # 等待界面线程处理完积压
+    done = threading.Event()
+    (dispatcher or gui.call_after)(done.set)
+    done.wait(10)
+    gui.stop()
+
+    stats = dispatcher.get_stats() if dispatcher else None
+    # 每个生产者的顺序回调都应按投递顺序全部执行
+    ordered_ok = all([n for n in gui.ordered if n.startswith(prefix)] ==
+                     [n for n in expected_ordered if n.startswith(prefix)] for prefix in ("core-", "rest-"))
+    return gui, stats, ordered_ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="界面更新合并器对比")
+    parser.add_argument("--seconds", type=float, default=2.0, help="每个模式的运行秒数")
+    parser.add_argument("--rate", type=int, default=500, help="每个生产者每秒投递次数（放大真实的每秒1次）")
+    parser.add_argument("--stall-every", type=float, default=0.5, help="界面线程卡顿间隔（秒）")
+    parser.add_argument("--stall-ms", type=float, default=300, help="每次卡顿时长（毫秒）")
+    args = parser.parse_args(argv)
+    LoggerManager.get_logger().setLevel(logging.WARNING)
+
+    for mode in ("direct", "dispatcher"):
+        gui, stats, ordered_ok = run(mode, args.seconds, args.rate, args.stall_every, args.stall_ms / 1000)
+        print(f"{mode:10s} CallAfter {gui.schedule_calls:6d} 次  状态刷新 {gui.status_updates:6d} 次  "
+              f"倒计时刷新 {gui.display_updates:6d} 次  最大积压 {gui.max_backlog:5d}  "
+              f"顺序回调{'完整' if ordered_ok else '缺失'}")
+        if stats:
+            print(f"{'':10s} 投递 {stats['posted']} 次，合并 {stats['coalesced']} 次，"
+                  f"{stats['batches']} 批，最大批 {stats['max_batch']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
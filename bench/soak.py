@@ -0,0 +1,407 @@
+"""长时间运行压测：模拟数周的工作/休息循环，检查内存、线程、CPU和唤醒次数是否随运行时间增长
+
+使用假活动检测后端和假热键后端，在当前进程中驱动无界面核心（HeadlessFrontend 负责休息计时），
+每轮循环依次经历: 工作 → （按间隔）离开再回来 → 工作时间到 → 休息 →
+（按间隔）临时暂停后自动恢复或按热键恢复、按热键增加休息时间 → 休息完成。
+
+时间按 --speed 倍加速：工作时长、空闲探测、显示刷新、临时暂停和休息倒计时的间隔都按比例缩短
+（不低于 MIN_INTERVAL 和 MIN_TICK），定时器线程、活动监视线程和休息计时线程的创建和退出与真实运行一致。
+离开检测阈值保持真实值，由假后端直接设定空闲时长。
+
+每隔 --sample-every 轮采样一次常驻内存、tracemalloc 已分配内存、线程数、上下文切换和CPU时间，
+预热后前四分之一和最后四分之一的采样比较，超过阈值时退出码为1；--report 写入完整的JSON报告
+（包含 tracemalloc 增长最多的分配位置）。
+
+有 psutil 时用它读取进程指标，没有时使用 resource 和 /proc（Linux/macOS）。
+工作目录和 HOME 都指向临时目录，不读写真实的配置、统计、锁文件和控制通道。
+
+用法（在仓库根目录）:
+    python bench/soak.py                          # 约10个工作周（每周40小时）
+    python bench/soak.py --cycles 3000 --report soak.json
+    python bench/soak.py --weeks 1 --speed 5000
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+WORK_MINUTES = 20
+REST_MINUTES = 5
+IDLE_THRESHOLD_MINUTES = 1
+TEMP_PAUSE_SECONDS = 20
+HOURS_PER_WEEK = 40
+MIN_INTERVAL = 0.002        # 加速后定时器间隔的下限（秒）
+MIN_TICK = 0.0002           # 加速后休息倒计时每秒的下限（秒），休息要持续到按下的热键被处理
+WAIT_TIMEOUT = 10           # 等待一次状态转换的最长时间（秒）
+TRACE_EVENTS = 200          # 压测期间追踪缓冲区保留的事件数
+
+
+def _proc_status():
+    """读取 /proc/self/status 中的常驻内存（KB）和线程数，不可用时为None"""
+    rss_kb = threads = None
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    rss_kb = int(line.split()[1])
+                elif line.startswith("Threads:"):
+                    threads = int(line.split()[1])
+    except OSError:
+        pass
+    return rss_kb, threads
+
+
+def process_sample():
+    """当前进程的资源占用
+    Returns:
+        dict: rss_kb、threads、cpu_seconds、voluntary_switches（阻塞后被唤醒）、involuntary_switches，
+              平台不支持的项为None
+    """
+    try:
+        import psutil  # 只有压测需要，未安装时退回标准库
+    except ImportError:
+        psutil = None
+
+    if psutil is not None:
+        process = psutil.Process()
+        cpu = process.cpu_times()
+        switches = process.num_ctx_switches()
+        return {
+            "rss_kb": process.memory_info().rss // 1024,
+            "threads": process.num_threads(),
+            "cpu_seconds": cpu.user + cpu.system,
+            "voluntary_switches": switches.voluntary,
+            "involuntary_switches": switches.involuntary,
+        }
+
+    rss_kb, threads = _proc_status()
+    sample = {
+        "rss_kb": rss_kb,
+        "threads": threads if threads is not None else threading.active_count(),
+        "cpu_seconds": time.process_time(),
+        "voluntary_switches": None,
+        "involuntary_switches": None,
+    }
+    try:
+        import resource  # Windows上没有
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        sample["voluntary_switches"] = usage.ru_nvcsw
+        sample["involuntary_switches"] = usage.ru_nivcsw
+        if rss_kb is None:
+            sample["rss_kb"] = usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss
+    except ImportError:
+        pass
+    return sample
+
+
+class SoakDriver:
+    """按加速时间驱动核心完成工作/离开/休息/临时暂停循环"""
+
+    def __init__(self, core, speed):
+        from lib.app_states import AppState
+        from lib.frontend import HeadlessFrontend
+        from lib.tracing import tracer
+
+        self.core = core
+        self.states = AppState
+        self.scale = lambda seconds: max(MIN_INTERVAL, seconds / speed)
+        self.activity = core.activity_detector.backend
+        self.hotkeys = core.hotkey_manager.backend
+        self.transitions = core.events.subscribe(4096, ["transition"])
+
+        # 追踪缓冲区有上限，但默认大小要几千轮才能填满，会被误判为增长
+        tracer.set_capacity(TRACE_EVENTS)
+
+        core.idle_check_interval = self.scale(5)
+        core.activity_check_interval = self.scale(2)
+        core.display_update_interval = self.scale(1)
+        # 加速后的工作时长和临时暂停时长是小数，超出设置界面允许的范围，压测中不做配置校验
+        core.config.validate = lambda key, value: None
+
+        self.frontend = HeadlessFrontend(core, output=None, maxlen=4096)
+        self.frontend.rest.tick_seconds = max(MIN_TICK, 1 / speed)
+        self.frontend_thread = threading.Thread(target=self.frontend.run, name="SoakFrontend")
+        self.frontend_thread.daemon = True
+        self.frontend_thread.start()
+
+        self.counts = {"away": 0, "natural_break": 0, "temp_pause": 0, "extend": 0}
+        self.speed = speed
+
+    def wait_for(self, state, poke=None):
+        """等待核心进入state，超时抛出RuntimeError
+        Args:
+            state: 目标状态
+            poke: 等待期间每10毫秒调用一次（如模拟用户输入），None时只等待
+        """
+        deadline = time.monotonic() + WAIT_TIMEOUT
+        while True:
+            remaining = deadline - time.monotonic()
+            if poke:
+                poke()
+            event = self.transitions.get(timeout=min(0.01, max(0, remaining)) if poke else max(0, remaining))
+            if event is not None and event.new_state == state.value:
+                return
+            if event is None and remaining <= 0:
+                raise RuntimeError(f"等待 {state.value} 超时，当前状态 {self.core.current_state.value}")
+
+    def press(self, hotkey):
+        if not self.hotkeys.press(hotkey):
+            raise RuntimeError(f"热键 {hotkey} 没有绑定")
+
+    def start(self):
+        config = self.core.config
+        self.core.start_work_session(
+            WORK_MINUTES / self.speed, REST_MINUTES, False, False,
+            idle_detection_enabled=True,
+            idle_threshold_minutes=IDLE_THRESHOLD_MINUTES,
+            temp_pause_enabled=True,
+            temp_pause_duration=self.scale(TEMP_PAUSE_SECONDS),
+            work_end_reminder_enabled=True,
+            adaptive_schedule_enabled=False,
+        )
+        self.wait_for(self.states.WORKING)
+        # 临时暂停热键只在启用时注册，开始会话后重新绑定
+        self.core.hotkey_manager.set_bindings(self.core.hotkey_bindings())
+        self.hotkey, self.temp_pause_hotkey = config.hotkey, config.temp_pause_hotkey
+
+    def cycle(self, index):
+        """一轮工作和休息"""
+        states = self.states
+        self.activity.touch()
+
+        if index % 3 == 0:
+            # 离开：每两次中有一次离开时间超过休息时长，记为自然休息
+            natural = index % 6 == 0
+            idle = REST_MINUTES * 60 + 30 if natural else IDLE_THRESHOLD_MINUTES * 60 + 1
+            self.activity.set_idle(idle)
+            self.wait_for(states.AWAY)
+            # 活动监视线程开始等待前的输入会被丢弃，持续模拟输入直到回到工作状态
+            self.wait_for(states.WORKING, poke=self.activity.touch)
+            self.counts["away"] += 1
+            self.counts["natural_break"] += natural
+
+        self.wait_for(states.RESTING)
+
+        if index % 4 == 0:
+            self.press(self.temp_pause_hotkey)
+            self.wait_for(states.TEMP_PAUSED)
+            if index % 8 == 0:
+                self.press(self.hotkey)  # 临时暂停中按强制休息热键立即恢复
+            self.wait_for(states.RESTING)  # 否则等待临时暂停超时自动恢复
+            self.counts["temp_pause"] += 1
+        if index % 5 == 0:
+            self.press(self.hotkey)  # 休息中按热键增加1分钟
+            self.counts["extend"] += 1
+
+        self.wait_for(states.WORKING)
+
+    def close(self):
+        self.core.stop_work_session()
+        self.wait_for(self.states.IDLE)
+        self.frontend.stop()
+        self.frontend_thread.join(timeout=2)
+        self.frontend.close()
+        self.transitions.close()
+
+
+def take_sample(core, cycle, started):
+    gc.collect()
+    sample = process_sample()
+    traced, peak = tracemalloc.get_traced_memory()
+    sample.update({
+        "cycle": cycle,
+        "elapsed": round(time.monotonic() - started, 3),
+        "traced_kb": traced // 1024,
+        "python_threads": threading.active_count(),
+        "timers": len(core.timers),
+        "queue_size": core.event_queue.qsize(),
+    })
+    return sample
+
+
+def _rate(samples, key):
+    """相邻采样之间每轮循环的增量，取中位数；指标不可用时为None"""
+    rates = [(b[key] - a[key]) / (b["cycle"] - a["cycle"])
+             for a, b in zip(samples, samples[1:]) if a[key] is not None and b[key] is not None]
+    return statistics.median(rates) if rates else None
+
+
+def _median(samples, key):
+    values = [s[key] for s in samples if s[key] is not None]
+    return statistics.median(values) if values else None
+
+
+def analyze(samples, args):
+    """比较预热后前四分之一和最后四分之一的采样
+    Returns:
+        (dict, list): 各项指标 {"first", "last", "growth", "limit"}，超过阈值的指标名
+    """
+    quarter = max(2, len(samples) // 4)
+    first, last = samples[:quarter], samples[-quarter:]
+    checks = {
+        "rss_kb": (_median, args.max_rss_growth_kb),
+        "traced_kb": (_median, args.max_traced_growth_kb),
+        "threads": (_median, args.max_thread_growth),
+        "cpu_seconds": (_rate, args.max_rate_growth),
+        "voluntary_switches": (_rate, args.max_rate_growth),
+    }
+    results, failed = {}, []
+    for key, (measure, limit) in checks.items():
+        a, b = measure(first, key), measure(last, key)
+        if a is None or b is None:
+            results[key] = None
+            continue
+        if measure is _rate:
+            # 每轮CPU时间和唤醒次数的相对增长
+            growth = (b - a) / a if a > 0 else 0.0
+            a, b, growth = round(a, 6), round(b, 6), round(growth, 3)
+        else:
+            growth = b - a
+        results[key] = {"first": a, "last": b, "growth": growth, "limit": limit}
+        if growth > limit:
+            failed.append(key)
+    return results, failed
+
+
+def run(args):
+    from lib.app_core import EyeRestCore
+    from lib.logger_manager import LoggerManager
+
+    LoggerManager.get_logger().setLevel(logging.WARNING)
+    tracemalloc.start(args.traceback_frames)
+
+    core = EyeRestCore()
+    driver = SoakDriver(core, args.speed)
+    samples, top = [], []
+    error = None
+    started = time.monotonic()
+    try:
+        driver.start()
+        for index in range(1, args.warmup + 1):
+            driver.cycle(index)
+        baseline = tracemalloc.take_snapshot()
+        samples.append(take_sample(core, 0, started))
+        for index in range(1, args.cycles + 1):
+            driver.cycle(args.warmup + index)
+            if index % args.sample_every == 0 or index == args.cycles:
+                samples.append(take_sample(core, index, started))
+                if args.verbose:
+                    print(json.dumps(samples[-1]), flush=True)
+        gc.collect()
+        snapshot = tracemalloc.take_snapshot()
+        top = [{"where": str(stat.traceback), "size_diff_kb": round(stat.size_diff / 1024, 1),
+                "count_diff": stat.count_diff}
+               for stat in snapshot.compare_to(baseline, "lineno")[:args.top]]
+        driver.close()
+    except RuntimeError as e:
+        error = str(e)
+    finally:
+        loop_errors = core.loop_errors
+        core.cleanup()
+        tracemalloc.stop()
+
+    simulated_hours = (args.warmup + args.cycles) * (WORK_MINUTES + REST_MINUTES) / 60
+    report = {
+        "cycles": args.cycles,
+        "warmup": args.warmup,
+        "speed": args.speed,
+        "simulated_hours": round(simulated_hours, 1),
+        "wall_seconds": round(time.monotonic() - started, 1),
+        "counts": driver.counts,
+        "loop_errors": loop_errors,
+        "error": error,
+        "samples": samples,
+        "top_allocations": top,
+    }
+    report["checks"], report["failed"] = analyze(samples, args) if len(samples) >= 4 else ({}, [])
+    if error:
+        report["failed"].append("error")
+    if loop_errors:
+        report["failed"].append("loop_errors")
+    return report
+
+
+def print_report(report):
+    print(f"模拟 {report['simulated_hours']} 小时（{report['warmup'] + report['cycles']} 轮），"
+          f"实际用时 {report['wall_seconds']} 秒，加速 {report['speed']} 倍")
+    counts = report["counts"]
+    print(f"离开 {counts['away']} 次（自然休息 {counts['natural_break']} 次），"
+          f"临时暂停 {counts['temp_pause']} 次，增加休息时间 {counts['extend']} 次")
+    labels = {
+        "rss_kb": "常驻内存 (KB)",
+        "traced_kb": "Python分配 (KB)",
+        "threads": "线程数",
+        "cpu_seconds": "每轮CPU时间 (秒)",
+        "voluntary_switches": "每轮唤醒次数",
+    }
+    for key, label in labels.items():
+        check = report["checks"].get(key)
+        if check is None:
+            print(f"  {label:16s} 不可用")
+            continue
+        mark = "超出" if key in report["failed"] else "正常"
+        growth = f"{check['growth']:+.1%}" if key in ("cpu_seconds", "voluntary_switches") else f"{check['growth']:+}"
+        print(f"  {label:16s} {check['first']:>12} → {check['last']:<12} 增长 {growth:>8}（上限 {check['limit']}） {mark}")
+    if report["top_allocations"]:
+        print("tracemalloc 增长最多的位置:")
+        for item in report["top_allocations"][:5]:
+            print(f"  {item['size_diff_kb']:+8.1f} KB {item['count_diff']:+6d} 个  {item['where']}")
+    if report["error"]:
+        print(f"错误: {report['error']}")
+    if report["loop_errors"]:
+        print(f"事件处理异常 {report['loop_errors']} 次")
+    print("结果: " + ("失败 " + ", ".join(report["failed"]) if report["failed"] else "通过"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="长时间运行压测（加速时间）")
+    parser.add_argument("--weeks", type=float, default=10, help=f"模拟的工作周数（每周{HOURS_PER_WEEK}小时）")
+    parser.add_argument("--cycles", type=int, help="工作/休息循环轮数，指定时忽略 --weeks")
+    parser.add_argument("--warmup", type=int, default=20, help="不计入比较的预热轮数")
+    parser.add_argument("--speed", type=float, default=20000, help="时间加速倍数")
+    parser.add_argument("--sample-every", type=int, default=20, help="每隔多少轮采样一次")
+    parser.add_argument("--max-rss-growth-kb", type=int, default=4096, help="常驻内存增长上限（KB）")
+    parser.add_argument("--max-traced-growth-kb", type=int, default=512, help="tracemalloc 已分配内存增长上限（KB）")
+    parser.add_argument("--max-thread-growth", type=int, default=1, help="线程数增长上限")
+    parser.add_argument("--max-rate-growth", type=float, default=0.5,
+                        help="每轮CPU时间和唤醒次数的相对增长上限（0.5 即 50%%）")
+    parser.add_argument("--traceback-frames", type=int, default=1, help="tracemalloc 记录的调用栈深度")
+    parser.add_argument("--top", type=int, default=10, help="报告中列出的分配位置数")
+    parser.add_argument("--report", help="把完整报告写入JSON文件")
+    parser.add_argument("--verbose", action="store_true", help="每次采样输出一行JSON")
+    args = parser.parse_args(argv)
+    if args.cycles is None:
+        args.cycles = max(1, round(args.weeks * HOURS_PER_WEEK * 60 / (WORK_MINUTES + REST_MINUTES)))
+    report_path = os.path.abspath(args.report) if args.report else None
+
+    # 配置、统计、锁文件和控制通道都位于工作目录或HOME下，先切换到临时目录再导入
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.environ["HOME"] = os.environ["USERPROFILE"] = workdir
+        os.environ["EYE_REST_ACTIVITY_BACKEND"] = "fake"
+        os.environ["EYE_REST_HOTKEY_BACKEND"] = "fake"
+        os.chdir(workdir)
+        sys.path.insert(0, SRC_DIR)
+        try:
+            report = run(args)
+        finally:
+            os.chdir(cwd)
+
+    print_report(report)
+    if report_path:
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""打包为单文件 zipapp（快速启动版本）
+
+把 src 打包成一个 .pyz 文件，包内带预编译的字节码（不校验源文件时间戳的
+unchecked-hash pyc），启动时只需打开一个文件，不再逐个查找和编译模块，
+适合磁盘较慢的机器。wx、pywin32 等第三方依赖仍使用已安装的版本。
+
+字节码与打包时的Python版本绑定，需要用同一版本的Python运行:
+    python build_zipapp.py                     # 生成 dist/eye_rest.pyz（图形界面）
+    python build_zipapp.py --entry daemon      # 生成无界面版本
+    python dist/eye_rest.pyz --force-rest
+    PYTHONPATH=dist/eye_rest.pyz python -m lib.ctl status
+"""
+import argparse
+import compileall
+import os
+import py_compile
+import shutil
+import sys
+import tempfile
+import zipapp
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(ROOT_DIR, "src")
+
+MAIN_TEMPLATE = """import sys
+from {entry} import main
+sys.exit(main())
+"""
+
+
+def _ignore(directory, names):
+    """不打包缓存、日志和运行时生成的文件"""
+    return [name for name in names
+            if name in ("__pycache__", "logs") or name.endswith((".pyc", ".json", ".log"))]
+
+
+def build(target, entry="main", strip_source=False, compress=True):
+    """生成zipapp
+    Args:
+        target: 输出的 .pyz 路径
+        entry: 入口模块（main 为图形界面，daemon 为无界面版本）
+        strip_source: 是否只保留字节码（文件更小，但异常堆栈中没有源代码行）
+        compress: 是否压缩
+    Returns:
+        int: 生成的文件大小（字节）
+    """
+    with tempfile.TemporaryDirectory() as workdir:
+        staging = os.path.join(workdir, "eye_rest")
+        shutil.copytree(SRC_DIR, staging, ignore=_ignore)
+        with open(os.path.join(staging, "__main__.py"), "w", encoding="utf-8") as f:
+            f.write(MAIN_TEMPLATE.format(entry=entry))
+
+        # zipimport 只查找与 .py 同目录的 .pyc（legacy布局）；unchecked-hash 使其不和源文件比较时间戳
+        if not compileall.compile_dir(staging, quiet=1, legacy=True,
+                                      invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH):
+            raise RuntimeError("编译字节码失败")
+        if strip_source:
+            for directory, _, files in os.walk(staging):
+                for name in files:
+                    # zipapp需要 __main__.py 作为入口
+                    if name.endswith(".py") and name != "__main__.py":
+                        os.remove(os.path.join(directory, name))
+
+        os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+        zipapp.create_archive(staging, target, interpreter="/usr/bin/env python3", compressed=compress)
+    return os.path.getsize(target)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="打包为单文件 zipapp")
+    parser.add_argument("--entry", choices=["main", "daemon"], default="main",
+                        help="入口：main 图形界面（默认），daemon 无界面版本")
+    parser.add_argument("-o", "--output", help="输出文件，默认 dist/eye_rest.pyz（daemon 为 dist/eye_rest_daemon.pyz）")
+    parser.add_argument("--strip-source", action="store_true", help="只保留字节码")
+    parser.add_argument("--no-compress", action="store_true", help="不压缩（文件更大，解压开销更小）")
+    args = parser.parse_args(argv)
+
+    target = args.output or os.path.join(
+        ROOT_DIR, "dist", "eye_rest.pyz" if args.entry == "main" else "eye_rest_daemon.pyz")
+    size = build(target, entry=args.entry, strip_source=args.strip_source, compress=not args.no_compress)
+    print(f"已生成 {target}（{size / 1024:.0f} KiB，Python {sys.version_info[0]}.{sys.version_info[1]}）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""护眼助手无界面版本
+
+不加载wx，核心状态机在后台运行，前端为ANSI终端界面（标准输出不是终端
+或指定 --plain 时按行输出状态变化）。运行中的实例可以用 python -m lib.ctl 控制。
+
+用法（在 src 目录）:
+    python daemon.py            # 有配置文件时直接开始工作
+    python daemon.py --plain    # 按行输出，适合 systemd 等服务管理器
+"""
+import argparse
+import os
+import signal
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from lib.process_checker import check_duplicate_process, create_lock_file
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="护眼助手（无界面版本）")
+    parser.add_argument("--plain", action="store_true", help="不使用终端界面，按行输出状态变化")
+    parser.add_argument("--start", action="store_true", help="没有配置文件时也立即开始工作（使用默认配置）")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if check_duplicate_process():
+        print("护眼助手已在运行中，可以用 python -m lib.ctl 控制运行中的实例", file=sys.stderr)
+        return 1
+    create_lock_file()
+
+    from lib.app_core import EyeRestCore
+    core = EyeRestCore()
+
+    if args.plain or not sys.stdout.isatty() or not sys.stdin.isatty():
+        from lib.frontend import HeadlessFrontend
+        frontend = HeadlessFrontend(core)
+    else:
+        from lib.terminal_ui import TerminalFrontend
+        frontend = TerminalFrontend(core)
+
+    # 信号处理函数只设置标志，由 run() 自行退出
+    signal.signal(signal.SIGTERM, lambda signum, frame: frontend.request_stop())
+
+    if args.start or os.path.exists(core.config.config_path):
+        core.start_work_session_from_config()
+
+    try:
+        frontend.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        frontend.close()
+        core.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
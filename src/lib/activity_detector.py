@@ -1,32 +1,341 @@
 import ctypes
-import ctypes.wintypes
+import glob
+import os
+import struct
+import sys
 import time
+from collections import deque
+from .logger_manager import LoggerManager
+
+
+class ActivityBackend:
+    """用户活动检测后端接口
+
+    子类实现 get_idle_seconds()，返回距离最后一次键盘鼠标输入的秒数。
+    探测在核心线程中周期调用，实现应避免每次调用都分配新的对象。
+    """
+    name = "base"
+
+    def get_idle_seconds(self):
+        """获取空闲秒数"""
+        raise NotImplementedError
+
+    def input_fds(self):
+        """可用于阻塞等待输入的文件描述符，空列表表示只支持轮询"""
+        return []
+
+    def drain_fd(self, fd):
+        """读取指定描述符上积压的数据
+        Returns:
+            bool: 是否读到了用户输入
+        """
+        return False
+
+    def close(self):
+        """释放后端占用的资源"""
+        pass
+
+
+class WindowsActivityBackend(ActivityBackend):
+    """Windows后端：GetLastInputInfo，结构体只创建一次"""
+    name = "windows"
 
-class ActivityDetector:
-    """用户活动检测器，使用Windows API检测键盘鼠标活动"""
-    
     def __init__(self):
-        self.user32 = ctypes.windll.user32
-        
-    def get_last_input_time(self):
-        """获取最后一次输入时间（毫秒）"""
+        import ctypes.wintypes
+
         class LASTINPUTINFO(ctypes.Structure):
             _fields_ = [("cbSize", ctypes.wintypes.UINT),
-                       ("dwTime", ctypes.wintypes.DWORD)]
-        
-        lii = LASTINPUTINFO()
-        lii.cbSize = ctypes.sizeof(LASTINPUTINFO)
-        
-        if self.user32.GetLastInputInfo(ctypes.byref(lii)):
-            return lii.dwTime
+                        ("dwTime", ctypes.wintypes.DWORD)]
+
+        self._lii = LASTINPUTINFO()
+        self._lii.cbSize = ctypes.sizeof(LASTINPUTINFO)
+        self._lii_ref = ctypes.byref(self._lii)
+        self._get_last_input_info = ctypes.windll.user32.GetLastInputInfo
+        # GetTickCount 在开机49.7天后回绕，改用64位版本
+        self._get_tick_count = ctypes.windll.kernel32.GetTickCount64
+        self._get_tick_count.restype = ctypes.c_ulonglong
+
+    def get_last_input_time(self):
+        """获取最后一次输入时间（毫秒，32位计数）"""
+        if self._get_last_input_info(self._lii_ref):
+            return self._lii.dwTime
         return 0
-    
+
     def get_idle_seconds(self):
         """获取空闲秒数"""
         last_input_time = self.get_last_input_time()
-        current_time = ctypes.windll.kernel32.GetTickCount()
-        return (current_time - last_input_time) // 1000
-    
+        # dwTime 仍是32位计数，与当前计数的低32位按模2^32求差，跨越回绕点时结果依然正确
+        current_time = self._get_tick_count() & 0xFFFFFFFF
+        return ((current_time - last_input_time) & 0xFFFFFFFF) // 1000
+
+
+class X11ActivityBackend(ActivityBackend):
+    """Linux X11后端：XScreenSaver扩展的空闲时间"""
+    name = "x11"
+
+    class _XScreenSaverInfo(ctypes.Structure):
+        _fields_ = [("window", ctypes.c_ulong),
+                    ("state", ctypes.c_int),
+                    ("kind", ctypes.c_int),
+                    ("til_or_since", ctypes.c_ulong),
+                    ("idle", ctypes.c_ulong),
+                    ("eventMask", ctypes.c_ulong)]
+
+    def __init__(self):
+        import ctypes.util  # find_library会导入subprocess/shutil，只有X11后端需要
+        xlib_path = ctypes.util.find_library("X11")
+        xss_path = ctypes.util.find_library("Xss")
+        if not xlib_path or not xss_path:
+            raise RuntimeError("未找到 libX11 或 libXss")
+
+        self._xlib = ctypes.CDLL(xlib_path)
+        self._xss = ctypes.CDLL(xss_path)
+        self._xlib.XOpenDisplay.restype = ctypes.c_void_p
+        self._xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        self._xlib.XDefaultRootWindow.restype = ctypes.c_ulong
+        self._xlib.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        self._xlib.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        self._xss.XScreenSaverQueryInfo.argtypes = [
+            ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(self._XScreenSaverInfo)
+        ]
+
+        self._display = self._xlib.XOpenDisplay(None)
+        if not self._display:
+            raise RuntimeError("无法连接X显示服务器")
+        self._root = self._xlib.XDefaultRootWindow(self._display)
+        self._info = self._XScreenSaverInfo()
+        self._info_ref = ctypes.byref(self._info)
+        self._query = self._xss.XScreenSaverQueryInfo
+
+    def get_idle_seconds(self):
+        """获取空闲秒数"""
+        if not self._query(self._display, self._root, self._info_ref):
+            return 0
+        return self._info.idle // 1000
+
+    def close(self):
+        if self._display:
+            self._xlib.XCloseDisplay(self._display)
+            self._display = None
+
+
+class EvdevActivityBackend(ActivityBackend):
+    """Linux evdev后端：读取 /dev/input/event* 的最后事件时间戳
+
+    设备以非阻塞方式打开，探测时把积压的事件读入预分配的缓冲区，
+    只解析最后一个事件的时间戳。需要对输入设备有读权限（通常是input组）。
+    """
+    name = "evdev"
+
+    # struct input_event { struct timeval time; __u16 type; __u16 code; __s32 value; }
+    EVENT_FORMAT = "llHHi"
+    EVENT_SIZE = struct.calcsize(EVENT_FORMAT)
+    EV_KEY, EV_REL, EV_ABS = 0x01, 0x02, 0x03
+
+    def __init__(self, device_paths=None, buffer_events=64):
+        self.logger = LoggerManager.get_logger()
+        paths = device_paths if device_paths is not None else sorted(glob.glob("/dev/input/event*"))
+        self.devices = []
+        for path in paths:
+            try:
+                fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+            except OSError:
+                continue
+            self.devices.append(os.fdopen(fd, "rb", buffering=0))
+        if not self.devices:
+            raise RuntimeError("没有可读取的输入设备")
+
+        self._buffer = bytearray(self.EVENT_SIZE * buffer_events)
+        self._view = memoryview(self._buffer)
+        self.last_input_time = time.time()  # 启动时视为刚有输入
+
+    def input_fds(self):
+        """所有输入设备的文件描述符"""
+        return [device.fileno() for device in self.devices]
+
+    def drain_fd(self, fd):
+        """读取指定设备积压的事件"""
+        for device in self.devices:
+            if device.fileno() == fd:
+                return self.drain(device)
+        return False
+
+    def drain(self, device=None):
+        """读取积压的事件并更新最后输入时间
+        Args:
+            device: 只读取指定设备，None表示读取所有设备
+        Returns:
+            bool: 是否读到了用户输入事件
+        """
+        got_input = False
+        for dev in ([device] if device is not None else self.devices):
+            while True:
+                try:
+                    size = dev.readinto(self._view)
+                except BlockingIOError:
+                    break
+                except OSError:
+                    break
+                if not size:
+                    break
+                # 从后往前找最后一个键盘/鼠标事件
+                for offset in range(size - self.EVENT_SIZE, -1, -self.EVENT_SIZE):
+                    sec, usec, ev_type, _, _ = struct.unpack_from(self.EVENT_FORMAT, self._buffer, offset)
+                    if ev_type in (self.EV_KEY, self.EV_REL, self.EV_ABS):
+                        self.last_input_time = max(self.last_input_time, sec + usec / 1e6)
+                        got_input = True
+                        break
+                if size < len(self._buffer):
+                    break
+        return got_input
+
+    def get_idle_seconds(self):
+        """获取空闲秒数"""
+        self.drain()
+        return max(0, int(time.time() - self.last_input_time))
+
+    def close(self):
+        for device in self.devices:
+            try:
+                device.close()
+            except OSError:
+                pass
+        self.devices = []
+
+
+class FakeActivityBackend(ActivityBackend):
+    """可编程的假后端，用于测试、压测和没有输入检测能力的环境
+
+    可以用 touch() 模拟一次输入，用 set_idle() 直接设定空闲时长，
+    或用 queue_idle() 预设接下来若干次探测的返回值。
+    touch() 同时向内部管道写入一个字节，供 ActivityWatcher 阻塞等待。
+    """
+    name = "fake"
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.last_input_time = clock()
+        self.script = deque()
+        self.probes = 0
+        self._pipe = None
+
+    def touch(self):
+        """模拟一次用户输入"""
+        self.last_input_time = self.clock()
+        if self._pipe:
+            try:
+                os.write(self._pipe[1], b"\x01")
+            except BlockingIOError:
+                pass  # 管道已满，已有未读的输入
+
+    def set_idle(self, seconds):
+        """设定当前已空闲的秒数"""
+        self.last_input_time = self.clock() - seconds
+
+    def queue_idle(self, *values):
+        """预设接下来若干次探测返回的空闲秒数"""
+        self.script.extend(values)
+
+    def get_idle_seconds(self):
+        """获取空闲秒数"""
+        self.probes += 1
+        if self.script:
+            return self.script.popleft()
+        return int(self.clock() - self.last_input_time)
+
+    def input_fds(self):
+        """管道的读端，第一次调用时创建"""
+        if self._pipe is None:
+            self._pipe = os.pipe()
+            os.set_blocking(self._pipe[0], False)
+            os.set_blocking(self._pipe[1], False)
+        return [self._pipe[0]]
+
+    def drain_fd(self, fd):
+        """读空管道"""
+        got_input = False
+        while True:
+            try:
+                data = os.read(fd, 4096)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+            got_input = True
+        return got_input
+
+    def close(self):
+        if self._pipe:
+            for fd in self._pipe:
+                os.close(fd)
+            self._pipe = None
+
+
+class NullActivityBackend(ActivityBackend):
+    """没有可用后端时的兜底实现，始终视为用户活跃"""
+    name = "null"
+
+    def get_idle_seconds(self):
+        return 0
+
+
+BACKENDS = {
+    "windows": WindowsActivityBackend,
+    "x11": X11ActivityBackend,
+    "evdev": EvdevActivityBackend,
+    "fake": FakeActivityBackend,
+    "null": NullActivityBackend,
+}
+
+
+def create_activity_backend(name=None):
+    """创建活动检测后端
+    Args:
+        name: 后端名称，None时读取环境变量 EYE_REST_ACTIVITY_BACKEND，仍为空则按平台自动选择
+    Returns:
+        ActivityBackend: 后端实例
+    """
+    logger = LoggerManager.get_logger()
+    name = name or os.environ.get("EYE_REST_ACTIVITY_BACKEND")
+    if name:
+        return BACKENDS[name]()
+
+    if sys.platform == "win32":
+        candidates = ["windows"]
+    elif os.environ.get("DISPLAY"):
+        candidates = ["x11", "evdev"]
+    else:
+        candidates = ["evdev"]
+
+    for candidate in candidates:
+        try:
+            backend = BACKENDS[candidate]()
+            logger.info(f"活动检测后端: {candidate}")
+            return backend
+        except Exception as e:
+            logger.warning(f"活动检测后端 {candidate} 不可用: {str(e)}")
+    logger.warning("没有可用的活动检测后端，离开检测将不会触发")
+    return NullActivityBackend()
+
+
+class ActivityDetector:
+    """用户活动检测器，通过可替换的后端检测键盘鼠标活动"""
+
+    def __init__(self, backend=None):
+        """初始化活动检测器
+        Args:
+            backend: ActivityBackend 实例，None时按平台自动选择
+        """
+        self.backend = backend or create_activity_backend()
+
+    def get_idle_seconds(self):
+        """获取空闲秒数"""
+        return self.backend.get_idle_seconds()
+
     def is_user_idle(self, threshold_seconds):
         """检查用户是否空闲超过阈值"""
-        return self.get_idle_seconds() >= threshold_seconds 
\ No newline at end of file
+        return self.backend.get_idle_seconds() >= threshold_seconds
+
+    def close(self):
+        """释放后端资源"""
+        self.backend.close()
@@ -0,0 +1,203 @@
+import math
+import os
+import struct
+import threading
+import time
+from array import array
+from datetime import datetime
+from .logger_manager import LoggerManager
+from .persistence import atomic_write_bytes
+
+
+class ActivityHistory:
+    """每分钟用户活动强度的环形缓冲区，以及按指数衰减的疲劳度
+
+    空闲探测的结果按分钟汇总为0-100的活动强度，存放在固定大小的
+    array('B') 中（默认一周，10080字节），新的一分钟覆盖一周前的数据。
+    疲劳度在每分钟结束时增量更新：
+
+        score = score * decay + intensity
+
+    其中 decay 由半衰期决定，没有探测的分钟（离开、休息）只做衰减。
+    更新是O(1)的，不需要回扫历史；score * (1 - decay) 归一化到0-1，
+    持续满强度输入时趋近1。
+    """
+
+    CAPACITY = 7 * 24 * 60  # 一周的分钟数
+    SAVE_INTERVAL_MINUTES = 15  # 每隔多少分钟写一次盘
+    _HEADER = struct.Struct("<4sIqd")  # 魔数, 容量, 最后一分钟的序号, 疲劳度累计值
+    _MAGIC = b"EAH1"
+
+    def __init__(self, path="activity_history.bin", half_life_minutes=30, persistence=None, clock=time.time):
+        """初始化活动历史
+        Args:
+            path: 持久化文件路径
+            half_life_minutes: 疲劳度半衰期（分钟）
+            persistence: 后台持久化线程，为None时save()同步写盘
+            clock: 返回时间戳（秒）的函数，测试和压测时可替换
+        """
+        self.logger = LoggerManager.get_logger()
+        self.path = path
+        self.persistence = persistence
+        self.clock = clock
+        self.decay = 0.5 ** (1.0 / half_life_minutes)
+
+        self._lock = threading.Lock()
+        self.levels = array("B", bytes(self.CAPACITY))
+        self.score = 0.0
+        self._minute = None         # 当前正在累计的分钟序号（时间戳 // 60）
+        self._probes = 0            # 当前分钟的探测次数
+        self._active_probes = 0     # 当前分钟内检测到输入的探测次数
+        self._unsaved_minutes = 0
+
+        self.load()
+
+    def load(self):
+        """从文件恢复历史，文件不存在或格式不符时从空历史开始"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "rb") as f:
+                header = f.read(self._HEADER.size)
+                magic, capacity, minute, score = self._HEADER.unpack(header)
+                if magic != self._MAGIC or capacity != self.CAPACITY:
+                    raise ValueError("文件格式不匹配")
+                levels = array("B")
+                levels.fromfile(f, capacity)
+            self.levels = levels
+            self._minute = minute
+            self.score = score
+            self.logger.info("活动历史加载成功")
+        except Exception as e:
+            self.logger.error(f"活动历史加载失败: {str(e)}")
+
+    def save(self):
+        """保存活动历史，有持久化线程时只标记为脏并立即返回"""
+        self._unsaved_minutes = 0
+        if self.persistence:
+            self.persistence.mark_dirty(self)
+        else:
+            self.persist()
+
+    def persist(self):
+        """同步写入历史文件"""
+        with self._lock:
+            header = self._HEADER.pack(self._MAGIC, self.CAPACITY,
+                                       self._minute if self._minute is not None else 0, self.score)
+            payload = header + self.levels.tobytes()
+        atomic_write_bytes(self.path, payload)
+
+    def record(self, idle_seconds, probe_interval, timestamp=None):
+        """记录一次空闲探测的结果
+        Args:
+            idle_seconds: 探测到的空闲秒数
+            probe_interval: 探测间隔（秒），空闲时间小于间隔表示这段时间内有输入
+            timestamp: 探测时间，默认当前时间
+        Returns:
+            bool: 是否进入了新的一分钟（上一分钟的强度已写入缓冲区）
+        """
+        minute = int((timestamp if timestamp is not None else self.clock()) // 60)
+        with self._lock:
+            advanced = self._advance(minute)
+            self._probes += 1
+            if idle_seconds < probe_interval:
+                self._active_probes += 1
+        if advanced and self._unsaved_minutes >= self.SAVE_INTERVAL_MINUTES:
+            self.save()
+        return advanced
+
+    def _advance(self, minute):
+        """结束当前分钟并前进到指定分钟，调用方持有锁
+        Returns:
+            bool: 是否前进了
+        """
+        if self._minute is None:
+            self._minute = minute
+            self.levels[minute % self.CAPACITY] = 0
+            return False
+        elapsed = minute - self._minute
+        if elapsed <= 0:
+            return False  # 同一分钟内，或时钟回拨
+
+        level = (100 * self._active_probes + self._probes // 2) // self._probes if self._probes else 0
+        self.levels[self._minute % self.CAPACITY] = level
+        # 结束的分钟计入疲劳度，中间没有探测的分钟只衰减
+        self.score = (self.score * self.decay + level / 100.0) * self.decay ** (elapsed - 1)
+
+        # 清掉被跳过的分钟和新的当前分钟里一周前的旧数据
+        for skipped in range(self._minute + 1, self._minute + 1 + min(elapsed, self.CAPACITY)):
+            self.levels[skipped % self.CAPACITY] = 0
+
+        self._minute = minute
+        self._probes = 0
+        self._active_probes = 0
+        self._unsaved_minutes += elapsed
+        return True
+
+    def fatigue(self, timestamp=None):
+        """当前疲劳度（0-1），只计算已结束的分钟
+        Args:
+            timestamp: 计算时间，默认当前时间；这段时间内没有探测的分钟按衰减处理
+        """
+        minute = int((timestamp if timestamp is not None else self.clock()) // 60)
+        with self._lock:
+            score = self.score
+            if self._minute is not None and minute > self._minute:
+                # 不修改状态：当前分钟尚未结束，按已记录的部分估算
+                level = self._active_probes / self._probes if self._probes else 0.0
+                score = (score * self.decay + level) * self.decay ** (minute - self._minute - 1)
+        return min(1.0, score * (1.0 - self.decay))
+
+    def get_minutes(self, count, timestamp=None):
+        """获取最近count分钟的活动强度（从旧到新，不含当前分钟）"""
+        minute = int((timestamp if timestamp is not None else self.clock()) // 60)
+        count = min(count, self.CAPACITY)
+        with self._lock:
+            last = self._minute
+            levels = [
+                self.levels[m % self.CAPACITY] if last is not None and last - self.CAPACITY < m < last else 0
+                for m in range(minute - count, minute)
+            ]
+        return levels
+
+    def get_snapshot(self, timestamp=None):
+        """界面需要的活动数据
+        Returns:
+            dict: 疲劳度、今日活跃分钟数、今日每小时平均活动强度
+        """
+        now = timestamp if timestamp is not None else self.clock()
+        midnight = datetime.fromtimestamp(now).replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+        minutes_today = int(now // 60) - int(midnight // 60)
+        levels = self.get_minutes(minutes_today, now)
+
+        hourly = []
+        for hour in range(24):
+            chunk = levels[hour * 60:(hour + 1) * 60]
+            hourly.append({
+                "hour": hour,
+                "intensity": int(round(sum(chunk) / 60.0)) if chunk else 0
+            })
+        return {
+            "fatigue": self.fatigue(now),
+            "active_minutes_today": sum(1 for level in levels if level),
+            "hourly_intensity": hourly
+        }
+
+
+def adaptive_factor(fatigue, threshold=0.6):
+    """疲劳度超过阈值的程度（0-1），用于调整工作和休息时长"""
+    if fatigue <= threshold:
+        return 0.0
+    return min(1.0, (fatigue - threshold) / (1.0 - threshold))
+
+
+def adjust_work_seconds(work_seconds, fatigue, max_adjust_percent):
+    """疲劳时缩短工作时长，最多缩短 max_adjust_percent%"""
+    factor = adaptive_factor(fatigue)
+    return max(60, int(work_seconds * (1.0 - factor * max_adjust_percent / 100.0)))
+
+
+def adjust_rest_seconds(rest_seconds, fatigue, max_adjust_percent):
+    """疲劳时延长休息时长，最多延长 max_adjust_percent%，按整10秒取整"""
+    factor = adaptive_factor(fatigue)
+    return int(math.ceil(rest_seconds * (1.0 + factor * max_adjust_percent / 100.0) / 10.0) * 10)
@@ -0,0 +1,121 @@
+import os
+import selectors
+import threading
+from .logger_manager import LoggerManager
+
+
+class ActivityWatcher:
+    """推送式活动检测
+
+    用 selectors（Linux上为epoll）阻塞等待输入设备可读，不做任何周期轮询。
+    arm() 之后的第一次用户输入会调用一次 on_active，然后自动解除监听；
+    未 arm 时只监听内部唤醒管道，正常输入不会唤醒线程。
+    """
+
+    def __init__(self, backend, on_active):
+        """初始化活动监视器
+        Args:
+            backend: 提供 input_fds()/drain_fd() 的活动检测后端
+            on_active: 检测到用户输入时调用（在监视线程中执行）
+        """
+        self.logger = LoggerManager.get_logger()
+        self.backend = backend
+        self.on_active = on_active
+
+        self._selector = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ)
+
+        self._armed = False         # 期望状态，由其他线程修改
+        self._registered = False    # 输入设备是否已注册，只在监视线程中修改
+        self._running = True
+        self.wakeups = 0            # 监视线程被唤醒的次数
+
+        self._thread = threading.Thread(target=self._run, name="ActivityWatcher")
+        self._thread.daemon = True
+        self._thread.start()
+
+    @staticmethod
+    def is_supported(backend):
+        """后端是否支持阻塞等待输入"""
+        try:
+            return bool(backend.input_fds())
+        except Exception:
+            return False
+
+    def arm(self):
+        """开始等待下一次用户输入"""
+        self._armed = True
+        self._wake()
+
+    def disarm(self):
+        """停止等待用户输入"""
+        if self._armed:
+            self._armed = False
+            self._wake()
+
+    def stop(self):
+        """停止监视线程"""
+        self._running = False
+        self._wake()
+        if self._thread.is_alive() and threading.current_thread() != self._thread:
+            self._thread.join(timeout=1)
+        self._selector.close()
+        os.close(self._wake_r)
+        os.close(self._wake_w)
+
+    def _wake(self):
+        try:
+            os.write(self._wake_w, b"\x00")
+        except (BlockingIOError, OSError):
+            pass
+
+    def _sync_registration(self):
+        """根据期望状态注册或注销输入设备"""
+        if self._armed and not self._registered:
+            for fd in self.backend.input_fds():
+                # 丢弃arm之前积压的输入，只响应之后的新输入
+                self.backend.drain_fd(fd)
+                self._selector.register(fd, selectors.EVENT_READ)
+            self._registered = True
+        elif not self._armed and self._registered:
+            for fd in self.backend.input_fds():
+                try:
+                    self._selector.unregister(fd)
+                except KeyError:
+                    pass
+            self._registered = False
+
+    def _run(self):
+        """监视线程主循环"""
+        while self._running:
+            try:
+                events = self._selector.select()
+            except OSError as e:
+                self.logger.error(f"活动监视等待失败: {str(e)}")
+                break
+            self.wakeups += 1
+
+            fired = False
+            for key, _ in events:
+                if key.fd == self._wake_r:
+                    try:
+                        while os.read(self._wake_r, 4096):
+                            pass
+                    except BlockingIOError:
+                        pass
+                    continue
+                if self.backend.drain_fd(key.fd) and self._armed and not fired:
+                    fired = True
+
+            if fired:
+                self._armed = False
+                self._sync_registration()
+                try:
+                    self.on_active()
+                except Exception as e:
+                    self.logger.error(f"活动回调失败: {str(e)}")
+            elif self._running:
+                self._sync_registration()
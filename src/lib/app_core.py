@@ -1,25 +1,64 @@
 import threading
 import time
 import queue
-import wx
-import winsound
+try:
+    import winsound
+except ImportError:  # 非Windows平台没有winsound
+    winsound = None
 from .config import Config
+from .persistence import PersistenceWorker
 from .hotkey_manager import HotkeyManager
+from .hotkey_chord import Chord
 from .logger_manager import LoggerManager
 from .app_states import AppState
 from .activity_detector import ActivityDetector
+from .activity_watcher import ActivityWatcher
+from .activity_history import ActivityHistory, adjust_work_seconds, adjust_rest_seconds
+from .interval_log import IntervalLog
+from .rate_limiter import ActionRateLimiter
+from .event_bus import EventBus
 from .statistics_manager import StatisticsManager
+from .statistics_view_model import StatisticsViewModelService
 from .process_checker import remove_lock_file
+from .control_server import ControlServer
+from .control_api import ControlApi
+from .watchdog import Watchdog
+from .profiler import ProfilerCapture, DEFAULT_SECONDS
+from .tracing import tracer
+
+def _call_now(func, *args):
+    func(*args)
 
 class EyeRestCore:
     """护眼助手核心业务逻辑 - 纯事件驱动架构"""
     
-    def __init__(self):
-        """初始化核心逻辑"""
+    # 不发送看门狗心跳的状态（没有定时器在运行，也就没有会卡住的工作）
+    UNWATCHED_STATES = (AppState.AWAY, AppState.IDLE)
+    
+    # 修改后需要重新注册热键的配置项
+    HOTKEY_CONFIG_KEYS = ('hotkey', 'temp_pause_enabled', 'temp_pause_hotkey', 'profile_hotkey')
+    
+    def __init__(self, dispatch=None):
+        """初始化核心逻辑
+        Args:
+            dispatch: 把 on_* 回调交给界面线程执行的函数（wx界面传入 wx.CallAfter），
+                      None时在核心线程中直接调用；不使用 on_* 回调的前端订阅 self.events
+        """
         self.logger = LoggerManager.get_logger()
-        self.config = Config()
+        self.dispatch = dispatch or _call_now
+        
+        # 配置和统计的保存交给后台线程，状态转换不等待磁盘
+        self.persistence = PersistenceWorker()
+        self.config = Config(persistence=self.persistence)
         self.hotkey_manager = HotkeyManager()
-        self.statistics = StatisticsManager()
+        self.statistics = StatisticsManager(persistence=self.persistence)
+        
+        # 每分钟活动强度和疲劳度，由空闲探测填充
+        self.activity_history = ActivityHistory(persistence=self.persistence)
+        
+        # 统计视图模型在后台线程构建（同时完成统计文件的加载），通过dispatch交给界面
+        self.statistics_view = StatisticsViewModelService(
+            self.statistics, dispatch=self.dispatch, activity=self.activity_history)
         
         # 状态机
         self.current_state = AppState.IDLE
@@ -28,10 +67,15 @@ class EyeRestCore:
         # 工作相关
         self.work_start_time = 0
         self.work_end_time = 0
+        self.work_duration = 0  # 本轮工作的总时长（秒），托盘图标按剩余比例显示进度
         self.remaining_work_time = 0  # 用于暂停/恢复工作计时
         
         # 离开状态相关
         self.away_start_time = 0
+        self.idle_since = 0  # 本次离开实际开始的时间（检测到离开时已空闲了一段时间）
+        # 离开时段记录，离开时长达到休息时间时记为一次自然休息
+        self.away_log = IntervalLog(merge_gap=60, retention_seconds=24 * 3600)
+        self.natural_break_end = None  # 最近一次记为自然休息的时段结束时间，避免重复记录
         
         # 临时暂停相关
         self.temp_pause_start_time = 0
@@ -40,9 +84,22 @@ class EyeRestCore:
         # 活动检测
         self.activity_detector = ActivityDetector()
         self.idle_threshold = self.config.idle_threshold_minutes * 60
+        self.idle_check_interval = 5  # 空闲探测间隔（秒）
+        self.activity_check_interval = 2  # 离开状态下轮询用户活动的间隔（秒，没有活动监视线程时）
+        self.display_update_interval = 1  # 工作状态下刷新显示的间隔（秒）
+        
+        # 后端支持阻塞等待输入时，离开状态下由监视线程推送USER_ACTIVE事件，不再轮询
+        self.activity_watcher = None
+        if ActivityWatcher.is_supported(self.activity_detector.backend):
+            self.activity_watcher = ActivityWatcher(self.activity_detector.backend, self._on_user_active)
+        
+        # 状态变化的发布/订阅，每个订阅者有独立的有界缓冲区，慢订阅者不影响核心
+        self.events = EventBus()
         
         # 事件队列和控制
         self.event_queue = queue.Queue()
+        # 热键输入的限流：同一动作在队列中最多一个事件，超频的触发丢弃（按钮、控制通道等不限流）
+        self.input_limiter = ActionRateLimiter()
         self.running = True
         
         # 定时器管理
@@ -54,34 +111,72 @@ class EyeRestCore:
         self.on_work_complete = None    # 工作完成回调
         self.on_temp_pause = None       # 临时暂停回调
         self.on_temp_resume = None      # 恢复休息回调
+        self.on_show_window = None      # 显示设置窗口回调（第二个实例启动时转发）
+        self.on_config_change = None    # 配置被修改回调（控制通道等修改配置后刷新设置界面）
+        
+        # 运行时性能采集（热键或 lib.ctl profile 触发）
+        self.profiler = ProfilerCapture()
+        
+        # 看门狗：事件循环卡顿时记录线程调用栈，线程退出时重启（wx界面另外登记主循环）
+        # 离开和空闲状态下核心没有要执行的工作，暂停心跳，事件循环不被周期唤醒
+        self.watchdog = Watchdog()
+        self.watchdog.watch('core', self._post_heartbeat,
+                            is_alive=lambda: self.event_loop_thread.is_alive() or not self.running,
+                            restart=self._start_event_loop)
+        self.watchdog.set_active('core', self.current_state not in self.UNWATCHED_STATES)
         
         # 启动事件循环线程
-        self.event_loop_thread = threading.Thread(target=self._event_loop)
-        self.event_loop_thread.daemon = True
-        self.event_loop_thread.start()
+        self.loop_errors = 0  # 事件处理异常次数
+        self._start_event_loop()
+        self.watchdog.start()
         
         # 初始化热键
         self._init_hotkey()
         
+        # 本机控制通道
+        self.control_server = self._start_control_server()
+        
         self.logger.info("纯事件驱动状态机启动")
     
+    def _start_event_loop(self):
+        """启动（或在线程意外退出后重启）事件循环线程"""
+        self.event_loop_thread = threading.Thread(target=self._event_loop, name="EyeRestCore")
+        self.event_loop_thread.daemon = True
+        self.event_loop_thread.start()
+    
+    def _post_heartbeat(self, callback):
+        """看门狗心跳，在事件循环中执行callback"""
+        self.event_queue.put({'type': 'HEARTBEAT', 'data': {'callback': callback}})
+    
     def _event_loop(self):
         """纯事件驱动的主循环 - 阻塞等待事件"""
         self.logger.info("事件循环开始")
         
-        while self.running:
-            try:
-                # 阻塞等待事件（1秒超时用于优雅退出）
+        try:
+            while self.running:
+                # 阻塞等待事件，没有事件时不唤醒；cleanup() 放入 None 结束循环
+                event = self.event_queue.get()
+                if event is None:
+                    self.event_queue.task_done()
+                    break
+                
                 try:
-                    event = self.event_queue.get(timeout=1.0)
-                    self._handle_event(event)
+                    trace_id = event.get('trace')
+                    if trace_id is None:
+                        self._handle_event(event)
+                    else:
+                        # 处理期间的通知回调继承追踪ID
+                        with tracer.activate(trace_id), tracer.span(trace_id, f"handle {event['type']}"):
+                            self._handle_event(event)
+                except Exception as e:
+                    self.loop_errors += 1
+                    self.logger.error(f"事件处理异常: {str(e)}", exc_info=True)
+                finally:
+                    # 处理失败的事件同样算完成，event_queue.join() 不会一直等待
                     self.event_queue.task_done()
-                except queue.Empty:
-                    # 超时是正常的，用于检查运行状态
-                    continue
-                    
-            except Exception as e:
-                self.logger.error(f"事件处理异常: {str(e)}")
+        finally:
+            # 线程意外退出时（离开状态下心跳已暂停）恢复监测，看门狗发现线程已退出后重启
+            self.watchdog.set_active('core', True)
         
         self.logger.info("事件循环退出")
     
@@ -91,13 +186,17 @@ class EyeRestCore:
         event_data = event.get('data', {})
         
         # 高频事件使用DEBUG级别，重要事件使用INFO级别
-        high_frequency_events = {'UPDATE_DISPLAY', 'CHECK_IDLE', 'CHECK_ACTIVITY'}
+        high_frequency_events = {'UPDATE_DISPLAY', 'CHECK_IDLE', 'CHECK_ACTIVITY', 'HEARTBEAT'}
         
         if event_type in high_frequency_events:
             self.logger.debug(f"处理事件: {event_type}")
         else:
             self.logger.info(f"处理事件: {event_type}")
         
+        # 限流的输入事件已出队，之后的触发可以再次入队
+        if event.get('limited'):
+            self.input_limiter.done(event_type)
+        
         # 用户操作事件
         if event_type == 'START_WORK':
             self._handle_start_work_event(event_data)
@@ -125,12 +224,58 @@ class EyeRestCore:
             self._handle_check_idle_event()
         elif event_type == 'CHECK_ACTIVITY':
             self._handle_check_activity_event()
+        elif event_type == 'USER_ACTIVE':
+            self._handle_user_active_event()
         elif event_type == 'UPDATE_DISPLAY':
             self._handle_update_display_event()
         
         # 配置事件
         elif event_type == 'UPDATE_CONFIG':
             self._handle_update_config_event(event_data)
+        
+        # 看门狗心跳
+        elif event_type == 'HEARTBEAT':
+            event_data['callback']()
+        
+        # 性能采集（cProfile 记录事件循环线程，开始和结束都在这里处理）
+        elif event_type == 'PROFILE_START':
+            self._handle_profile_start_event(event_data)
+        elif event_type == 'PROFILE_STOP':
+            self._handle_profile_stop_event()
+    
+    def _handle_profile_start_event(self, data):
+        """处理开始性能采集事件"""
+        seconds = data.get('seconds', DEFAULT_SECONDS)
+        on_timeout = lambda: self.event_queue.put({'type': 'PROFILE_STOP'})
+        if not self.profiler.start(seconds, on_timeout=on_timeout):
+            self.logger.warning("性能采集正在进行中")
+            return
+        self.events.notice('profile_started', {'seconds': seconds})
+    
+    def _handle_profile_stop_event(self):
+        """处理结束性能采集事件"""
+        result = self.profiler.stop()
+        if result:
+            self.events.notice('profile_saved', result)
+    
+    def _stop_profiling_in_loop(self, timeout=5.0):
+        """退出时正在采集则交给事件循环结束采集并保存已采集的部分（cProfile 只能在开始采集的线程中停止）
+        Args:
+            timeout: 等待事件循环处理的最长时间（秒），超时则放弃本次采集结果
+        """
+        if not self.profiler.running:
+            return
+        if threading.current_thread() is self.event_loop_thread:
+            self._handle_profile_stop_event()
+            return
+        if not self.event_loop_thread.is_alive():
+            self.logger.warning("事件循环不可用，放弃本次性能采集结果")
+            return
+        stopped = threading.Event()
+        self.event_queue.put({'type': 'PROFILE_STOP'})
+        self.event_queue.put({'type': 'HEARTBEAT', 'data': {'callback': stopped.set}})
+        if not stopped.wait(timeout):
+            self.logger.warning("等待事件循环结束性能采集超时，放弃本次采集结果")
     
     def _handle_start_work_event(self, data):
         """处理开始工作事件"""
@@ -138,26 +283,35 @@ class EyeRestCore:
             self.logger.warning("当前不是空闲状态，无法开始工作")
             return
         
-        # 更新配置
-        self.config.work_time = data['work_time']
-        self.config.rest_time = data['rest_time']
-        self.config.play_sound_after_rest = data['play_sound']
-        self.config.allow_password_skip = data['allow_password']
-        self.config.idle_detection_enabled = data.get('idle_detection_enabled', False)
-        self.config.idle_threshold_minutes = data.get('idle_threshold_minutes', 5)
-        self.config.temp_pause_enabled = data.get('temp_pause_enabled', True)
-        self.config.temp_pause_duration = data.get('temp_pause_duration', 20)
-        self.config.work_end_reminder_enabled = data.get('work_end_reminder_enabled', False)
+        # 更新配置（终端界面、命令行等来源的参数先检查，无效时不写入配置文件）
+        settings = {
+            'work_time': data['work_time'],
+            'rest_time': data['rest_time'],
+            'play_sound_after_rest': data['play_sound'],
+            'allow_password_skip': data['allow_password'],
+            'idle_detection_enabled': data.get('idle_detection_enabled', False),
+            'idle_threshold_minutes': data.get('idle_threshold_minutes', 5),
+            'temp_pause_enabled': data.get('temp_pause_enabled', True),
+            'temp_pause_duration': data.get('temp_pause_duration', 20),
+            'work_end_reminder_enabled': data.get('work_end_reminder_enabled', False),
+            'adaptive_schedule_enabled': data.get('adaptive_schedule_enabled', False),
+        }
+        try:
+            for key, value in settings.items():
+                self.config.validate(key, value)
+        except ValueError as e:
+            self.logger.warning(f"开始工作的参数无效，未开始工作: {str(e)}")
+            return
+        for key, value in settings.items():
+            setattr(self.config, key, value)
         self.config.save()
         
         # 更新空闲检测阈值
         self.idle_threshold = self.config.idle_threshold_minutes * 60
         
-        # 转换到工作状态
-        self._transition_to(AppState.WORKING)
-        
-        # 启动工作相关定时器
+        # 先启动工作相关定时器（确定本轮工作时长），再转换到工作状态，状态通知中的剩余时间与定时器一致
         self._start_work_timers()
+        self._transition_to(AppState.WORKING)
         
         self.logger.info(f"开始工作会话: {data['work_time']}分钟工作, {data['rest_time']}分钟休息")
     
@@ -182,15 +336,13 @@ class EyeRestCore:
         if self.current_state == AppState.RESTING:
             # 如果当前正在休息，增加1分钟休息时间
             self.logger.info("当前正在休息，增加休息时间")
-            if self.on_work_complete:
-                wx.CallAfter(self.on_work_complete, "add_time")
+            self._notify('work_complete', self.on_work_complete, "add_time")
         elif self.current_state == AppState.TEMP_PAUSED:
             # 从临时暂停状态立即恢复到休息状态
             self.logger.info("临时暂停中，强制恢复休息")
             self._cancel_timer('temp_pause_timer')
             self._transition_to(AppState.RESTING)
-            if self.on_temp_resume:
-                wx.CallAfter(self.on_temp_resume)
+            self._notify('temp_resume', self.on_temp_resume)
         elif self.current_state in [AppState.WORKING, AppState.AWAY]:
             # 开始新的休息
             self.logger.info("强制开始休息")
@@ -213,39 +365,85 @@ class EyeRestCore:
     def _handle_check_idle_event(self):
         """处理检查用户空闲事件"""
         if self.current_state == AppState.WORKING:
+            idle_seconds = self.activity_detector.get_idle_seconds()
+            # 探测结果同时记入活动历史，每过一分钟刷新统计界面的疲劳度
+            if self.activity_history.record(idle_seconds, self.idle_check_interval):
+                self.statistics_view.invalidate()
+            
             if (self.config.idle_detection_enabled and 
-                self.activity_detector.is_user_idle(self.idle_threshold)):
+                idle_seconds >= self.idle_threshold):
                 # 用户空闲，暂停工作计时器并转换状态
+                self.idle_since = time.time() - idle_seconds
                 self._pause_work_timer()
                 self._transition_to(AppState.AWAY)
-                # 启动活动检测定时器
-                self._start_timer('activity_check', 2, 'CHECK_ACTIVITY')
+                if self.activity_watcher:
+                    # 等待输入设备推送，离开期间没有周期唤醒
+                    self.activity_watcher.arm()
+                else:
+                    # 启动活动检测定时器
+                    self._start_timer('activity_check', self.activity_check_interval, 'CHECK_ACTIVITY')
             else:
                 # 用户活跃，继续检查
-                self._start_timer('idle_check', 5, 'CHECK_IDLE')
+                self._start_timer('idle_check', self.idle_check_interval, 'CHECK_IDLE')
     
     def _handle_check_activity_event(self):
         """处理检查用户活动事件"""
         if self.current_state == AppState.AWAY:
             if not self.activity_detector.is_user_idle(self.idle_threshold):
                 # 用户回来了，恢复工作
-                self._cancel_timer('activity_check')
-                self._resume_work_timer()
-                self._transition_to(AppState.WORKING)
-                # 重新启动相关定时器
-                if self.config.idle_detection_enabled:
-                    self._start_timer('idle_check', 5, 'CHECK_IDLE')
-                self._start_timer('display_update', 1, 'UPDATE_DISPLAY')
+                self._return_from_away()
             else:
                 # 用户仍然离开，继续检查
-                self._start_timer('activity_check', 2, 'CHECK_ACTIVITY')
+                self._start_timer('activity_check', self.activity_check_interval, 'CHECK_ACTIVITY')
+    
+    def _handle_user_active_event(self):
+        """处理活动监视线程推送的用户输入事件"""
+        if self.current_state == AppState.AWAY:
+            self._return_from_away()
+    
+    def _return_from_away(self):
+        """用户回来，从离开状态恢复工作"""
+        self._cancel_timer('activity_check')
+        self._credit_natural_break()
+        self._resume_work_timer()
+        self._transition_to(AppState.WORKING)
+        # 重新启动相关定时器
+        self._start_idle_check_timer()
+        self._start_timer('display_update', self.display_update_interval, 'UPDATE_DISPLAY')
+    
+    def _credit_natural_break(self):
+        """离开时长达到休息时间时记为一次自然休息，并重新开始完整的工作周期
+        Returns:
+            bool: 是否记为自然休息
+        """
+        if not self.idle_since:
+            return False
+        start, end = self.away_log.add(self.idle_since, time.time())
+        self.idle_since = 0
+        # 与已记为自然休息的时段合并时，只有超出已记部分的时长达到休息时间才再记一次
+        credited_from = start
+        if self.natural_break_end is not None and start <= self.natural_break_end:
+            credited_from = max(start, self.natural_break_end)
+        if end - credited_from < self.config.rest_time * 60:
+            return False
+        
+        self.natural_break_end = end
+        self.remaining_work_time = 0  # 不再恢复离开前的剩余时间
+        self.statistics.record_completed_rest(natural=True)
+        self.statistics_view.invalidate()
+        self.logger.info(f"离开 {int(end - start)} 秒，记为自然休息")
+        return True
+    
+    def _on_user_active(self):
+        """活动监视线程回调 - 发送事件"""
+        self.event_queue.put({'type': 'USER_ACTIVE'})
     
     def _handle_update_display_event(self):
         """处理更新显示事件"""
         if self.current_state == AppState.WORKING:
             self._notify_status_change()
             # 继续定时更新显示
-            self._start_timer('display_update', 1, 'UPDATE_DISPLAY')
+            self._start_timer('display_update', self.display_update_interval, 'UPDATE_DISPLAY')
         elif self.current_state == AppState.AWAY:
             self._notify_status_change()
     
@@ -254,18 +452,19 @@ class EyeRestCore:
         if self.current_state == AppState.RESTING:
             # 记录统计数据 - 休息正常完成
             self.statistics.record_completed_rest()
+            self.statistics_view.invalidate()
             
-            # 转换到工作状态，开始新的工作周期
-            self._transition_to(AppState.WORKING)
+            # 开始新的工作周期并转换到工作状态
             self._start_work_timers()
+            self._transition_to(AppState.WORKING)
             self.logger.info("休息完成，开始新的工作周期")
     
     def _handle_rest_cancel_event(self):
         """处理休息取消事件"""
         if self.current_state == AppState.RESTING:
-            # 转换到工作状态，重置工作计时
-            self._transition_to(AppState.WORKING)
+            # 重置工作计时并转换到工作状态
             self._start_work_timers()
+            self._transition_to(AppState.WORKING)
             self.logger.info("休息被取消，重新开始工作")
     
     def _handle_temp_pause_event(self):
@@ -281,8 +480,7 @@ class EyeRestCore:
             self._start_timer('temp_pause_timer', self.config.temp_pause_duration, 'TEMP_PAUSE_TIMEOUT')
             
             # 通知UI隐藏休息屏幕（UI层会保存实际剩余时间）
-            if self.on_temp_pause:
-                wx.CallAfter(self.on_temp_pause)
+            self._notify('temp_pause', self.on_temp_pause)
             
             self.logger.info(f"临时暂停休息 {self.config.temp_pause_duration} 秒")
     
@@ -296,8 +494,7 @@ class EyeRestCore:
             self._transition_to(AppState.RESTING)
             
             # 通知UI恢复休息屏幕（不传递时间，由UI层自己管理）
-            if self.on_temp_resume:
-                wx.CallAfter(self.on_temp_resume)
+            self._notify('temp_resume', self.on_temp_resume)
             
             self.logger.info("恢复休息状态")
     
@@ -309,19 +506,57 @@ class EyeRestCore:
     
     def _handle_update_config_event(self, data):
         """处理配置更新事件"""
-        for key, value in data.items():
-            if hasattr(self.config, key):
-                setattr(self.config, key, value)
+        for key, value in list(data.items()):
+            try:
+                self.config.validate(key, value)
+            except ValueError as e:
+                self.logger.warning(f"忽略无效的配置: {str(e)}")
+                del data[key]
+                continue
+            setattr(self.config, key, value)
         self.config.save()
         
         # 更新空闲检测阈值
         if 'idle_threshold_minutes' in data:
             self.idle_threshold = self.config.idle_threshold_minutes * 60
+        
+        # 临时暂停开关等影响热键的配置变化后重新注册热键
+        if self.hotkey_manager and any(key in data for key in self.HOTKEY_CONFIG_KEYS):
+            try:
+                self.hotkey_manager.set_bindings(self.hotkey_bindings())
+            except Exception as e:
+                self.logger.error(f"重新注册热键失败: {str(e)}")
+        
+        self._notify('config_changed', self.on_config_change, dict(data))
+    
+    def _work_seconds(self):
+        """本轮工作时长（秒），启用自适应时按疲劳度缩短"""
+        work_seconds = self.config.work_time * 60
+        if self.config.adaptive_schedule_enabled:
+            work_seconds = adjust_work_seconds(work_seconds, self.activity_history.fatigue(),
+                                               self.config.adaptive_max_adjust_percent)
+        return work_seconds
+    
+    def _rest_minutes(self):
+        """本轮休息时长（分钟），启用自适应时按疲劳度延长"""
+        if not self.config.adaptive_schedule_enabled:
+            return self.config.rest_time
+        rest_seconds = adjust_rest_seconds(self.config.rest_time * 60, self.activity_history.fatigue(),
+                                           self.config.adaptive_max_adjust_percent)
+        return rest_seconds / 60
+    
+    def _start_idle_check_timer(self):
+        """启动空闲探测定时器（离开检测或自适应调度需要时）"""
+        if self.config.idle_detection_enabled or self.config.adaptive_schedule_enabled:
+            self._start_timer('idle_check', self.idle_check_interval, 'CHECK_IDLE')
     
     def _start_work_timers(self):
         """启动工作相关的定时器"""
         # 工作倒计时定时器
-        work_seconds = self.config.work_time * 60
+        work_seconds = self._work_seconds()
+        self.work_duration = work_seconds
+        self.work_start_time = time.time()
+        self.work_end_time = self.work_start_time + work_seconds
         self._start_timer('work_countdown', work_seconds, 'WORK_TIMEOUT')
         
         # 工作结束前40秒提醒定时器（如果启用且工作时间大于40秒）
@@ -330,11 +565,10 @@ class EyeRestCore:
             self._start_timer('work_end_reminder', reminder_seconds, 'WORK_END_REMINDER')
         
         # 用户活动检测定时器（如果启用）
-        if self.config.idle_detection_enabled:
-            self._start_timer('idle_check', 5, 'CHECK_IDLE')
+        self._start_idle_check_timer()
         
         # 显示更新定时器
-        self._start_timer('display_update', 1, 'UPDATE_DISPLAY')
+        self._start_timer('display_update', self.display_update_interval, 'UPDATE_DISPLAY')
     
     def _start_timer(self, timer_id, delay_seconds, event_type):
         """启动定时器
@@ -398,11 +632,13 @@ class EyeRestCore:
             self.logger.debug(f"恢复工作计时器，剩余时间: {self.remaining_work_time}秒")
         else:
             # 如果没有剩余时间，开始新的工作周期
-            self.work_end_time = time.time() + self.config.work_time * 60
-            self._start_timer('work_countdown', self.config.work_time * 60, 'WORK_TIMEOUT')
+            work_seconds = self._work_seconds()
+            self.work_duration = work_seconds
+            self.work_start_time = time.time()
+            self.work_end_time = self.work_start_time + work_seconds
+            self._start_timer('work_countdown', work_seconds, 'WORK_TIMEOUT')
             
             # 重新设置工作结束提醒定时器（如果启用）
-            work_seconds = self.config.work_time * 60
             if self.config.work_end_reminder_enabled and work_seconds > 40:
                 reminder_seconds = work_seconds - 40
                 self._start_timer('work_end_reminder', reminder_seconds, 'WORK_END_REMINDER')
@@ -410,11 +646,12 @@ class EyeRestCore:
     def _start_rest(self):
         """开始休息"""
         self._transition_to(AppState.RESTING)
-        if self.on_start_rest:
-            wx.CallAfter(self.on_start_rest, self.config.rest_time)
+        self._notify('rest_started', self.on_start_rest, self._rest_minutes())
 
     def _play_work_end_reminder_sound(self):
         """播放工作结束前提醒音效"""
+        if winsound is None:
+            return
         try:
             def play_sound():
                 # 播放简单的提醒音（两次短音）
@@ -442,17 +679,21 @@ class EyeRestCore:
         
         # 日志记录
         self.logger.info(f"状态转换: {old_state.value} → {new_state.value}")
+        self.events.transition(old_state.value, new_state.value)
         
         # 通知UI更新
         self._notify_status_change()
 
     def _on_state_enter(self, state):
         """状态进入处理"""
-        if state == AppState.WORKING:
-            if not hasattr(self, 'remaining_work_time') or self.remaining_work_time <= 0:
-                self.work_start_time = time.time()
-                self.work_end_time = self.work_start_time + self.config.work_time * 60
-        elif state == AppState.AWAY:
+        self.watchdog.set_active('core', state not in self.UNWATCHED_STATES)
+        
+        # 离开AWAY状态时停止等待用户输入
+        if state != AppState.AWAY and self.activity_watcher:
+            self.activity_watcher.disarm()
+        
+        # 进入工作状态时的 work_end_time/work_duration 由启动或恢复工作定时器时设置（含自适应调整）
+        if state == AppState.AWAY:
             self.away_start_time = time.time()
         elif state == AppState.TEMP_PAUSED:
             self.temp_pause_start_time = time.time()
@@ -463,65 +704,37 @@ class EyeRestCore:
         """重置计时器"""
         self.work_start_time = 0
         self.work_end_time = 0
+        self.work_duration = 0
         self.remaining_work_time = 0
         self.away_start_time = 0
+        self.idle_since = 0
         self.temp_pause_start_time = 0
         self.saved_rest_time = 0
 
     def _init_hotkey(self):
         """初始化全局热键"""
         try:
-            # 收集所有需要注册的热键
-            hotkeys_to_register = [
-                (self.config.hotkey, self.force_rest)
-            ]
-            
-            # 添加临时暂停热键
-            if self.config.temp_pause_enabled:
-                hotkeys_to_register.append((self.config.temp_pause_hotkey, self.temp_pause))
-            
-            # 批量注册所有热键
-            self._batch_register_hotkeys(hotkeys_to_register)
+            # 设置所有热键绑定
+            self.hotkey_manager.set_bindings(self.hotkey_bindings())
                 
             self.logger.info("热键初始化成功")
         except Exception as e:
             self.logger.error(f"热键初始化失败: {str(e)}")
     
-    def _batch_register_hotkeys(self, hotkey_list):
-        """批量注册热键，避免重复注册问题"""
-        try:
-            # 停止现有监听
-            if self.hotkey_manager.is_running:
-                self.hotkey_manager.stop()
-            
-            # 清空现有绑定
-            self.hotkey_manager._bindings.clear()
-            
-            # 批量添加所有热键绑定
-            for hotkey_str, callback in hotkey_list:
-                normalized_hotkey = self.hotkey_manager._normalize_hotkey(hotkey_str)
-                self.hotkey_manager._bindings[normalized_hotkey] = callback
-                self.logger.debug(f"添加热键绑定: {normalized_hotkey}")
-            
-            # 构建绑定列表
-            from global_hotkeys import register_hotkeys, start_checking_hotkeys
-            bindings = [
-                [key, None, func, True]
-                for key, func in self.hotkey_manager._bindings.items()
-            ]
-            
-            # 一次性注册所有热键
-            register_hotkeys(bindings)
-            
-            # 开始监听
-            start_checking_hotkeys()
-            self.hotkey_manager.is_running = True
-            
-            self.logger.info(f"批量注册热键成功，共 {len(hotkey_list)} 个热键")
-            
-        except Exception as e:
-            self.logger.error(f"批量注册热键失败: {str(e)}")
-            raise
+    def hotkey_bindings(self, hotkey=None, temp_pause_hotkey=None):
+        """需要注册的全部热键
+        Args:
+            hotkey: 强制休息热键，None时使用配置
+            temp_pause_hotkey: 临时暂停热键，None时使用配置
+        Returns:
+            list: [(热键字符串, 回调), ...]
+        """
+        bindings = [(hotkey or self.config.hotkey, self._force_rest_hotkey)]
+        if self.config.temp_pause_enabled:
+            bindings.append((temp_pause_hotkey or self.config.temp_pause_hotkey, self._temp_pause_hotkey))
+        if self.config.profile_hotkey:
+            bindings.append((self.config.profile_hotkey, self.start_profiling))
+        return bindings
     
     # 公共API - 发送事件到状态机
     def start_work_session(self, work_time, rest_time, play_sound, allow_password, **kwargs):
@@ -538,24 +751,96 @@ class EyeRestCore:
         }
         self.event_queue.put(event)
     
+    def start_work_session_from_config(self, work_time=None, rest_time=None):
+        """按当前配置发送开始工作事件（静默启动、命令行和终端前端使用）
+        Args:
+            work_time: 工作时长（分钟），None时使用配置
+            rest_time: 休息时长（分钟），None时使用配置
+        """
+        config = self.config
+        self.start_work_session(
+            work_time if work_time is not None else config.work_time,
+            rest_time if rest_time is not None else config.rest_time,
+            config.play_sound_after_rest,
+            config.allow_password_skip,
+            idle_detection_enabled=config.idle_detection_enabled,
+            idle_threshold_minutes=config.idle_threshold_minutes,
+            temp_pause_enabled=config.temp_pause_enabled,
+            temp_pause_duration=config.temp_pause_duration,
+            work_end_reminder_enabled=config.work_end_reminder_enabled,
+            adaptive_schedule_enabled=config.adaptive_schedule_enabled
+        )
+    
     def stop_work_session(self):
         """发送停止工作事件"""
         event = {'type': 'STOP_WORK'}
         self.event_queue.put(event)
     
-    def force_rest(self, event=None):
-        """发送强制休息事件"""
-        event = {'type': 'FORCE_REST'}
-        self.event_queue.put(event)
-        return True  # 总是返回True，因为事件已发送
+    def force_rest(self, event=None, source=None):
+        """发送强制休息事件
+        Args:
+            event: 界面事件（绑定到按钮时传入），未使用
+            source: 'hotkey' 表示由热键触发，经过输入限流（按住热键时不会堆积事件）；
+                    按钮、托盘菜单和控制通道的每次请求都会入队
+        Returns:
+            str: 'queued' 已放入事件队列，'coalesced' 热键触发已并入队列中的同一事件或被限流丢弃
+        """
+        return self._put_input({'type': 'FORCE_REST'}, 'force_rest', source == 'hotkey')
     
-    def temp_pause(self, event=None):
-        """发送临时暂停事件 - 只在休息状态时响应"""
+    def temp_pause(self, event=None, source=None):
+        """发送临时暂停事件 - 只在休息状态时响应
+        Args:
+            event: 界面事件，未使用
+            source: 'hotkey' 表示由热键触发，经过输入限流
+        """
         if self.current_state == AppState.RESTING:
-            event = {'type': 'TEMP_PAUSE'}
-            self.event_queue.put(event)
+            self._put_input({'type': 'TEMP_PAUSE'}, 'temp_pause', source == 'hotkey')
         return True  # 总是返回True，因为热键需要
     
+    def _force_rest_hotkey(self):
+        """强制休息热键回调"""
+        return self.force_rest(source='hotkey')
+    
+    def _temp_pause_hotkey(self):
+        """临时暂停热键回调"""
+        return self.temp_pause(source='hotkey')
+    
+    def _put_input(self, event, name, limited):
+        """把用户输入事件放入队列
+        Args:
+            event: 事件
+            name: 新追踪的名称
+            limited: 是否经过输入限流
+        Returns:
+            str: 'queued' 或 'coalesced'
+        """
+        if limited:
+            if not self.input_limiter.allow(event['type']):
+                tracer.mark(tracer.current(), 'coalesced')
+                return 'coalesced'
+            event['limited'] = True  # 出队时通知限流器
+        self._put_traced(event, name)
+        return 'queued'
+
+    def _put_traced(self, event, name):
+        """把用户输入事件放入队列，带上当前线程的追踪ID（热键回调中已开始），没有时开始新的追踪
+        Args:
+            event: 事件
+            name: 新追踪的名称
+        """
+        trace_id = tracer.current() or tracer.begin(name)
+        event['trace'] = trace_id
+        tracer.mark(trace_id, 'enqueue')
+        self.event_queue.put(event)
+    
+    def start_profiling(self, seconds=DEFAULT_SECONDS):
+        """发送开始性能采集事件，结果写入日志目录，完成时发布 profile_saved 通知
+        Args:
+            seconds: 采集时长（秒）
+        """
+        self.event_queue.put({'type': 'PROFILE_START', 'data': {'seconds': seconds}})
+        return True
+    
     def on_rest_complete(self):
         """休息完成回调 - 发送事件"""
         event = {'type': 'REST_COMPLETE'}
@@ -577,26 +862,13 @@ class EyeRestCore:
     def update_hotkey(self, new_hotkey):
         """更新热键设置"""
         try:
-            # 标准化新热键格式进行比较
-            normalized_new_hotkey = self.hotkey_manager._normalize_hotkey(new_hotkey)
-            normalized_current_hotkey = self.hotkey_manager._normalize_hotkey(self.config.hotkey)
-            
-            # 如果新热键和当前热键相同，跳过设置
-            if normalized_new_hotkey == normalized_current_hotkey:
+            # 解析结果是缓存的，直接比较组合
+            if Chord.parse(new_hotkey) == Chord.parse(self.config.hotkey):
                 self.logger.info(f"热键未改变，跳过设置: {new_hotkey}")
                 return True
             
-            # 收集所有需要重新注册的热键
-            hotkeys_to_register = [
-                (new_hotkey, self.force_rest)
-            ]
-            
-            # 添加临时暂停热键
-            if self.config.temp_pause_enabled:
-                hotkeys_to_register.append((self.config.temp_pause_hotkey, self.temp_pause))
-            
-            # 批量重新注册热键
-            self._batch_register_hotkeys(hotkeys_to_register)
+            # 只替换有变化的热键，不重启监听；与临时暂停热键冲突时抛出HotkeyConflictError
+            self.hotkey_manager.set_bindings(self.hotkey_bindings(hotkey=new_hotkey))
             
             self.config.hotkey = new_hotkey
             self.config.save()
@@ -606,6 +878,26 @@ class EyeRestCore:
             self.logger.error(f"热键更新失败: {str(e)}")
             return False
     
+    def _start_control_server(self):
+        """启动本机控制通道，供第二个实例转发命令和命令行客户端（lib.ctl）控制当前实例"""
+        api = ControlApi(self)
+        server = ControlServer(api.methods(), api.streams())
+        try:
+            server.start()
+        except OSError as e:
+            self.logger.warning(f"控制通道启动失败，第二个实例将无法转发命令: {str(e)}")
+            return None
+        return server
+    
+    def _show_settings(self):
+        """控制请求：显示设置窗口"""
+        self._notify('show_window', self.on_show_window)
+        return True
+    
+    def get_input_limiter_stats(self):
+        """热键输入事件的放行、丢弃和合并次数"""
+        return self.input_limiter.get_stats()
+    
     def get_remaining_time(self):
         """获取剩余工作时间"""
         if self.current_state != AppState.WORKING:
@@ -616,9 +908,16 @@ class EyeRestCore:
     
     def _notify_status_change(self, custom_status=None):
         """通知状态变化"""
+        status = custom_status if custom_status else self._get_status_text()
+        self.events.tick(self.current_state.value, self.get_remaining_time(), status)
         if self.on_status_change:
-            status = custom_status if custom_status else self._get_status_text()
-            wx.CallAfter(self.on_status_change, status)
+            self.dispatch(self.on_status_change, status)
+    
+    def _notify(self, name, callback, *args):
+        """发布通知事件，并在界面线程中调用对应的回调"""
+        self.events.notice(name, args[0] if args else None)
+        if callback:
+            self.dispatch(tracer.bind(tracer.current(), name, callback), *args)
 
     def _get_status_text(self):
         """根据当前状态返回显示文案"""
@@ -660,13 +959,35 @@ class EyeRestCore:
         """获取统计管理器"""
         return self.statistics
     
+    def get_statistics_view_model(self):
+        """获取最近一次构建的统计视图模型，尚未构建完成时返回None"""
+        return self.statistics_view.latest
+    
+    def reset_statistics(self):
+        """重置统计数据并刷新视图模型"""
+        self.statistics.reset_statistics()
+        self.statistics_view.invalidate()
+    
     def cleanup(self):
         """清理资源"""
+        self._stop_profiling_in_loop()
         self._cancel_all_timers()
         self.running = False  # 设置退出标志
+        self.event_queue.put(None)  # 唤醒阻塞等待的事件循环
+        self.watchdog.stop()
+        self.logger.info(f"输入限流统计: {self.input_limiter.get_stats()}")
+        self.statistics_view.stop()
+        if self.activity_watcher:
+            self.activity_watcher.stop()
+        self.activity_detector.close()
         if self.hotkey_manager:
             self.hotkey_manager.stop()
             self.hotkey_manager = None
+        if self.control_server:
+            self.control_server.stop()
+        # 写入尚未保存的配置、统计数据和活动历史
+        self.activity_history.save()
+        self.persistence.stop()
         # 删除锁文件
         remove_lock_file()
         self.logger.info("核心逻辑清理完成") 
\ No newline at end of file
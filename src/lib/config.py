@@ -1,9 +1,24 @@
 import json
 import os
+from .persistence import atomic_write_text
+
+# 数值配置项的取值范围（含两端），与设置界面输入框的范围一致，修改和加载配置时按此校验
+VALUE_RANGES = {
+    "work_time": (1, 100),
+    "rest_time": (1, 100),
+    "idle_threshold_minutes": (1, 30),
+    "temp_pause_duration": (5, 300),
+    "adaptive_max_adjust_percent": (0, 100),
+}
 
 class Config:
-    def __init__(self):
+    def __init__(self, persistence=None):
+        """初始化配置
+        Args:
+            persistence: 后台持久化线程，为None时save()同步写盘
+        """
         self.config_path = "eye_rest_config.json"
+        self.persistence = persistence
         self.default_config = {
             "work_time": 10,
             "rest_time": 1,
@@ -15,7 +30,10 @@ class Config:
             "temp_pause_enabled": True,
             "temp_pause_duration": 20,
             "temp_pause_hotkey": "ctrl+shift+e",
-            "work_end_reminder_enabled": False
+            "profile_hotkey": "",
+            "work_end_reminder_enabled": False,
+            "adaptive_schedule_enabled": False,
+            "adaptive_max_adjust_percent": 30
         }
         self.load()
 
@@ -34,12 +52,43 @@ class Config:
                     self.temp_pause_enabled = config.get("temp_pause_enabled", self.default_config["temp_pause_enabled"])
                     self.temp_pause_duration = config.get("temp_pause_duration", self.default_config["temp_pause_duration"])
                     self.temp_pause_hotkey = config.get("temp_pause_hotkey", self.default_config["temp_pause_hotkey"])
+                    self.profile_hotkey = config.get("profile_hotkey", self.default_config["profile_hotkey"])
                     self.work_end_reminder_enabled = config.get("work_end_reminder_enabled", self.default_config["work_end_reminder_enabled"])
+                    self.adaptive_schedule_enabled = config.get("adaptive_schedule_enabled", self.default_config["adaptive_schedule_enabled"])
+                    self.adaptive_max_adjust_percent = config.get("adaptive_max_adjust_percent", self.default_config["adaptive_max_adjust_percent"])
             except:
                 self._set_defaults()
+            else:
+                self._reset_invalid()
         else:
             self._set_defaults()
 
+    def validate(self, key, value):
+        """检查配置值：类型必须与默认值相同（整数不能是小数，开关不能是数字），数值项还要在 VALUE_RANGES 范围内
+        Args:
+            key: 配置项
+            value: 新的值
+        Raises:
+            ValueError: 未知配置项或值无效
+        """
+        if key not in self.default_config:
+            raise ValueError(f"未知配置项: {key}")
+        default = self.default_config[key]
+        if type(value) is not type(default):
+            raise ValueError(f"配置项 {key} 的值类型应为 {type(default).__name__}: {value!r}")
+        if key in VALUE_RANGES:
+            low, high = VALUE_RANGES[key]
+            if not low <= value <= high:
+                raise ValueError(f"配置项 {key} 必须在 {low}-{high} 之间: {value!r}")
+
+    def _reset_invalid(self):
+        """配置文件中无效的值（手工修改或旧版本写入）恢复为默认值"""
+        for key, default in self.default_config.items():
+            try:
+                self.validate(key, getattr(self, key))
+            except ValueError:
+                setattr(self, key, default)
+
     def _set_defaults(self):
         self.work_time = self.default_config["work_time"]
         self.rest_time = self.default_config["rest_time"]
@@ -51,9 +100,20 @@ class Config:
         self.temp_pause_enabled = self.default_config["temp_pause_enabled"]
         self.temp_pause_duration = self.default_config["temp_pause_duration"]
         self.temp_pause_hotkey = self.default_config["temp_pause_hotkey"]
+        self.profile_hotkey = self.default_config["profile_hotkey"]
         self.work_end_reminder_enabled = self.default_config["work_end_reminder_enabled"]
+        self.adaptive_schedule_enabled = self.default_config["adaptive_schedule_enabled"]
+        self.adaptive_max_adjust_percent = self.default_config["adaptive_max_adjust_percent"]
 
     def save(self):
+        """保存配置，有持久化线程时只标记为脏并立即返回"""
+        if self.persistence:
+            self.persistence.mark_dirty(self)
+        else:
+            self.persist()
+
+    def persist(self):
+        """同步写入配置文件"""
         config = {
             "work_time": self.work_time,
             "rest_time": self.rest_time,
@@ -65,7 +125,9 @@ class Config:
             "temp_pause_enabled": self.temp_pause_enabled,
             "temp_pause_duration": self.temp_pause_duration,
             "temp_pause_hotkey": self.temp_pause_hotkey,
-            "work_end_reminder_enabled": self.work_end_reminder_enabled
+            "profile_hotkey": self.profile_hotkey,
+            "work_end_reminder_enabled": self.work_end_reminder_enabled,
+            "adaptive_schedule_enabled": self.adaptive_schedule_enabled,
+            "adaptive_max_adjust_percent": self.adaptive_max_adjust_percent
         }
-        with open(self.config_path, "w") as f:
-            json.dump(config, f)
+        atomic_write_text(self.config_path, json.dumps(config))
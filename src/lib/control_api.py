@@ -0,0 +1,170 @@
+import os
+import time
+from datetime import datetime
+from .app_states import AppState
+from .event_bus import EVENT_KINDS
+from .ipc import ControlError, INVALID_PARAMS, INVALID_STATE
+from .logger_manager import LoggerManager
+from .profiler import DEFAULT_SECONDS, MAX_SECONDS
+from .tracing import tracer
+
+# 不能通过 update_config 修改的配置项（热键需要重新注册，走 update_hotkey）
+READONLY_CONFIG_KEYS = ("hotkey", "temp_pause_hotkey", "profile_hotkey")
+
+
+class ControlApi:
+    """控制通道对外提供的方法
+
+    方法在控制服务线程中调用，只读取核心的状态或把事件放入核心的事件队列，
+    不直接修改状态机。status 只读内存中的字段，可以被状态栏小部件高频轮询。
+    """
+
+    def __init__(self, core):
+        self.core = core
+
+    def methods(self):
+        """供 ControlServer 使用的方法表"""
+        return {
+            "ping": self.ping,
+            "status": self.status,
+            "show_settings": self.show_settings,
+            "force_rest": self.force_rest,
+            "start_work_session": self.start_work_session,
+            "stop_work_session": self.stop_work_session,
+            "get_config": self.get_config,
+            "update_config": self.update_config,
+            "statistics": self.statistics,
+            "metrics": self.metrics,
+            "profile": self.profile,
+            "trace_export": self.trace_export,
+        }
+
+    def streams(self):
+        """供 ControlServer 使用的订阅方法表"""
+        return {"watch": self.watch}
+
+    def watch(self, kinds=None, maxlen=256):
+        """订阅核心事件（状态转换、每秒状态刷新和通知）
+        Args:
+            kinds: 只接收这些类型，如 ["transition", "notice"]，默认全部
+            maxlen: 服务端为该连接保留的事件数，客户端读得慢时丢弃最旧的
+        """
+        if kinds is not None and (not isinstance(kinds, list) or not set(kinds) <= set(EVENT_KINDS)):
+            raise ControlError(INVALID_PARAMS, f"kinds 只能包含 {', '.join(EVENT_KINDS)}")
+        if not isinstance(maxlen, int) or not 1 <= maxlen <= 4096:
+            raise ControlError(INVALID_PARAMS, "maxlen 必须是 1-4096 的整数")
+        return self.core.events.subscribe(maxlen, kinds)
+
+    def ping(self):
+        return True
+
+    def status(self):
+        """当前状态
+        Returns:
+            dict: state、status_text、remaining_seconds（工作剩余秒数）和 state_seconds（进入当前状态的秒数）
+        """
+        core = self.core
+        return {
+            "state": core.current_state.value,
+            "status_text": core._get_status_text(),
+            "remaining_seconds": core.get_remaining_time(),
+            "state_seconds": int(time.time() - core.state_start_time),
+            "work_time": core.config.work_time,
+            "rest_time": core.config.rest_time,
+        }
+
+    def show_settings(self):
+        return self.core._show_settings()
+
+    def force_rest(self):
+        """请求强制休息（不经过热键的输入限流）
+        Returns:
+            dict: {"result": "queued"}；"coalesced" 表示已并入队列中的同一请求
+        """
+        return {"result": self.core.force_rest()}
+
+    def start_work_session(self, work_time=None, rest_time=None):
+        """开始工作会话，未指定的参数使用当前配置"""
+        core = self.core
+        for key, value in (("work_time", work_time), ("rest_time", rest_time)):
+            if value is not None:
+                self._validate_config(key, value)
+        if core.current_state != AppState.IDLE:
+            raise ControlError(INVALID_STATE, f"当前状态为 {core.current_state.value}，无法开始工作")
+        core.start_work_session_from_config(work_time, rest_time)
+        return True
+
+    def stop_work_session(self):
+        if self.core.current_state == AppState.IDLE:
+            return False
+        self.core.stop_work_session()
+        return True
+
+    def get_config(self):
+        config = self.core.config
+        return {key: getattr(config, key) for key in config.default_config}
+
+    def update_config(self, **changes):
+        """修改配置，每个值的类型必须与默认值一致，数值项还要在设置界面允许的范围内"""
+        for key, value in changes.items():
+            if key in READONLY_CONFIG_KEYS:
+                raise ControlError(INVALID_PARAMS, f"配置项 {key} 不能通过控制通道修改")
+            self._validate_config(key, value)
+        if changes:
+            self.core.update_config(**changes)
+        return True
+
+    def _validate_config(self, key, value):
+        """按 Config.validate 检查配置值，无效时抛出 ControlError"""
+        try:
+            self.core.config.validate(key, value)
+        except ValueError as e:
+            raise ControlError(INVALID_PARAMS, str(e))
+
+    def statistics(self, days=7):
+        """休息统计快照，内容与统计页相同"""
+        if not isinstance(days, int) or not 1 <= days <= 366:
+            raise ControlError(INVALID_PARAMS, "days 必须是 1-366 的整数")
+        return self.core.statistics.get_snapshot(days)
+
+    def metrics(self):
+        """热键延迟、输入限流、控制通道、事件订阅、界面更新合并、看门狗和追踪的运行指标"""
+        core = self.core
+        return {
+            "hotkey_latency": core.hotkey_manager.get_latency_stats() if core.hotkey_manager else None,
+            "input_limiter": core.get_input_limiter_stats(),
+            "control_requests": core.control_server.requests if core.control_server else 0,
+            "events": core.events.get_stats(),
+            "ui_dispatch": core.dispatch.get_stats() if hasattr(core.dispatch, "get_stats") else None,
+            "watchdog": core.watchdog.get_stats(),
+            "loop_errors": core.loop_errors,
+            "tracing": tracer.get_stats(),
+        }
+
+    def profile(self, seconds=DEFAULT_SECONDS):
+        """在运行中的实例上采集性能数据，完成时发布 profile_saved 通知（含结果文件路径）
+        Args:
+            seconds: 采集时长（秒）
+        """
+        if not isinstance(seconds, int) or isinstance(seconds, bool) or not 1 <= seconds <= MAX_SECONDS:
+            raise ControlError(INVALID_PARAMS, f"seconds 必须是 1-{MAX_SECONDS} 的整数")
+        if self.core.profiler.running:
+            raise ControlError(INVALID_STATE, "性能采集正在进行中")
+        self.core.start_profiling(seconds)
+        return {"seconds": seconds}
+
+    def trace_export(self, path=None):
+        """把最近的追踪事件写成 Chrome trace-event JSON（chrome://tracing 或 Perfetto 打开）
+        Args:
+            path: 输出文件路径，None时写入日志目录下的 trace_<时间>.json
+        """
+        if path is None:
+            path = os.path.join(LoggerManager.get_logs_dir(),
+                                f"trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        elif not isinstance(path, str):
+            raise ControlError(INVALID_PARAMS, "path 必须是字符串")
+        try:
+            count = tracer.export(path)
+        except OSError as e:
+            raise ControlError(INVALID_PARAMS, f"无法写入 {path}: {e}")
+        return {"path": path, "events": count}
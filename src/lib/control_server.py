@@ -0,0 +1,284 @@
+"""本机控制通道服务端，协议和端点见 ipc"""
+import json
+import os
+import selectors
+import socket
+import struct
+import threading
+from .logger_manager import LoggerManager
+from .persistence import atomic_write_text
+from .event_bus import event_to_dict
+from .ipc import (ControlError, PORT_FILE_PATH, SOCKET_PATH, MAX_REQUEST_BYTES,
+                  PARSE_ERROR, INVALID_REQUEST, METHOD_NOT_FOUND, INVALID_PARAMS, INTERNAL_ERROR,
+                  _abstract_address, _use_abstract_socket, _use_unix_socket)
+
+# 订阅连接的待发送数据超过该值时暂停取出事件，由订阅缓冲区丢弃最旧的事件
+MAX_PENDING_BYTES = 64 * 1024
+
+
+class _Connection:
+    __slots__ = ("sock", "inbuf", "outbuf", "subscriptions")
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.inbuf = bytearray()
+        self.outbuf = bytearray()
+        self.subscriptions = []
+
+
+class ControlServer:
+    """控制通道服务端
+
+    单个线程用 selectors 处理所有连接，请求在该线程中同步调用对应的方法，
+    方法应当很快返回（读取状态、把事件放入队列等）。
+
+    订阅方法（streams）返回 event_bus.Subscription，之后该连接上会持续收到
+    {"jsonrpc": "2.0", "method": "event", "params": {...}} 通知。事件由
+    服务线程取出发送，客户端不读取时只会在它自己的订阅缓冲区中丢弃旧事件。
+    """
+
+    def __init__(self, methods, streams=None):
+        """初始化控制服务
+        Args:
+            methods: {方法名: 可调用对象}，params 作为关键字参数传入，返回值需可JSON序列化；
+                     方法抛出 ControlError 时返回对应错误
+            streams: {方法名: 返回 Subscription 的可调用对象}，连接关闭时自动取消订阅
+        """
+        self.logger = LoggerManager.get_logger()
+        self.methods = methods
+        self.streams = streams or {}
+        self._signatures = {}
+        self.token = None
+        self.requests = 0
+        self._selector = selectors.DefaultSelector()
+        self._listener = None
+        self._running = False
+        self._thread = None
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_pending = False
+        self._stream_connections = set()
+
+    def start(self):
+        """绑定端点并启动服务线程
+        Raises:
+            OSError: 端点已被占用（已有实例在运行）
+        """
+        self._listener = self._bind()
+        self._listener.setblocking(False)
+        self._selector.register(self._listener, selectors.EVENT_READ, None)
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="ControlServer")
+        self._thread.daemon = True
+        self._thread.start()
+        self.logger.info("控制通道已启动")
+
+    def _bind(self):
+        if _use_unix_socket():
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            if _use_abstract_socket():
+                sock.bind(_abstract_address())
+            else:
+                # 调用方已持有实例锁，残留的套接字文件可以直接删除
+                if os.path.exists(SOCKET_PATH):
+                    os.remove(SOCKET_PATH)
+                old_umask = os.umask(0o177)
+                try:
+                    sock.bind(SOCKET_PATH)
+                finally:
+                    os.umask(old_umask)
+        else:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.bind(("127.0.0.1", 0))
+            import secrets  # 只有TCP端点需要令牌，secrets会导入hashlib/hmac
+            self.token = secrets.token_hex(16)
+            atomic_write_text(PORT_FILE_PATH, json.dumps({"port": sock.getsockname()[1], "token": self.token}))
+        sock.listen(16)
+        return sock
+
+    def stop(self):
+        """停止服务并关闭所有连接"""
+        if not self._running:
+            return
+        self._running = False
+        self._wake()
+        if self._thread and threading.current_thread() != self._thread:
+            self._thread.join(timeout=1)
+        for conn in list(self._stream_connections):
+            self._close(conn)
+        for key in list(self._selector.get_map().values()):
+            key.fileobj.close()
+        self._selector.close()
+        self._wake_w.close()
+        if _use_unix_socket() and not _use_abstract_socket() and os.path.exists(SOCKET_PATH):
+            os.remove(SOCKET_PATH)
+        self.logger.info(f"控制通道已停止，共处理 {self.requests} 个请求")
+
+    def _wake(self):
+        """唤醒服务线程（订阅有新事件或停止服务），可在任意线程调用"""
+        if self._wake_pending:
+            return
+        self._wake_pending = True
+        try:
+            self._wake_w.send(b"\0")
+        except OSError:
+            pass
+
+    def _run(self):
+        """服务线程主循环"""
+        while self._running:
+            for key, mask in self._selector.select():
+                if key.fileobj is self._wake_r:
+                    if not self._running:
+                        return
+                    self._drain_wake()
+                    self._pump_events()
+                    continue
+                if key.fileobj is self._listener:
+                    self._accept()
+                    continue
+                conn = key.data
+                try:
+                    if mask & selectors.EVENT_READ:
+                        self._read(conn)
+                    if mask & selectors.EVENT_WRITE and conn.outbuf:
+                        self._flush(conn)
+                except OSError:
+                    self._close(conn)
+
+    def _drain_wake(self):
+        self._wake_pending = False
+        try:
+            while self._wake_r.recv(4096):
+                pass
+        except OSError:
+            pass
+
+    def _pump_events(self):
+        """把订阅缓冲区中的事件写入各订阅连接"""
+        for conn in list(self._stream_connections):
+            if len(conn.outbuf) >= MAX_PENDING_BYTES:
+                continue  # 客户端读得慢，事件留在订阅缓冲区中（满了丢弃最旧的）
+            for subscription in conn.subscriptions:
+                for event in subscription.drain():
+                    notification = {"jsonrpc": "2.0", "method": "event", "params": event_to_dict(event)}
+                    conn.outbuf += json.dumps(notification, ensure_ascii=False).encode("utf-8") + b"\n"
+            if conn.outbuf:
+                try:
+                    self._flush(conn)
+                except OSError:
+                    self._close(conn)
+
+    def _accept(self):
+        try:
+            sock, _ = self._listener.accept()
+        except OSError:
+            return
+        if _use_abstract_socket() and not self._same_user(sock):
+            sock.close()
+            return
+        sock.setblocking(False)
+        conn = _Connection(sock)
+        self._selector.register(sock, selectors.EVENT_READ, conn)
+
+    def _same_user(self, sock):
+        """抽象套接字没有文件权限，检查对端进程的用户"""
+        try:
+            creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+            _, uid, _ = struct.unpack("3i", creds)
+            return uid == os.getuid()
+        except OSError:
+            return False
+
+    def _close(self, conn):
+        for subscription in conn.subscriptions:
+            subscription.notify = None
+            subscription.close()
+        conn.subscriptions = []
+        self._stream_connections.discard(conn)
+        try:
+            self._selector.unregister(conn.sock)
+        except (KeyError, ValueError):
+            pass
+        conn.sock.close()
+
+    def _read(self, conn):
+        data = conn.sock.recv(65536)
+        if not data:
+            self._close(conn)
+            return
+        conn.inbuf += data
+        if len(conn.inbuf) > MAX_REQUEST_BYTES and b"\n" not in conn.inbuf:
+            self._close(conn)
+            return
+        while True:
+            index = conn.inbuf.find(b"\n")
+            if index < 0:
+                break
+            line = bytes(conn.inbuf[:index])
+            del conn.inbuf[:index + 1]
+            if line.strip():
+                conn.outbuf += self._dispatch(conn, line)
+        if conn.outbuf:
+            self._flush(conn)
+
+    def _flush(self, conn):
+        backlogged = len(conn.outbuf) >= MAX_PENDING_BYTES
+        sent = conn.sock.send(conn.outbuf)
+        del conn.outbuf[:sent]
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if conn.outbuf else 0)
+        self._selector.modify(conn.sock, events, conn)
+        if backlogged and len(conn.outbuf) < MAX_PENDING_BYTES and conn.subscriptions:
+            # 积压已减少，继续取出订阅缓冲区中暂停取出的事件
+            self._wake()
+
+    def _dispatch(self, conn, line):
+        """处理一行请求，返回编码好的响应行"""
+        self.requests += 1
+        request_id = None
+        try:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                raise ControlError(PARSE_ERROR, "请求不是有效的JSON")
+            if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+                raise ControlError(INVALID_REQUEST, "缺少method")
+            request_id = request.get("id")
+            if self.token and request.get("token") != self.token:
+                raise ControlError(INVALID_REQUEST, "令牌无效")
+            params = request.get("params") or {}
+            if not isinstance(params, dict):
+                raise ControlError(INVALID_PARAMS, "params必须是对象")
+            result = self._call(conn, request["method"], params)
+            response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+        except ControlError as e:
+            response = {"jsonrpc": "2.0", "id": request_id, "error": {"code": e.code, "message": e.message}}
+        except Exception as e:
+            self.logger.error(f"控制请求处理失败: {str(e)}")
+            response = {"jsonrpc": "2.0", "id": request_id, "error": {"code": INTERNAL_ERROR, "message": str(e)}}
+        return json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n"
+
+    def _call(self, conn, name, params):
+        """校验参数后调用方法；订阅方法把订阅挂到连接上"""
+        stream = self.streams.get(name)
+        method = stream or self.methods.get(name)
+        if method is None:
+            raise ControlError(METHOD_NOT_FOUND, f"未知方法: {name}")
+        signature = self._signatures.get(name)
+        if signature is None:
+            import inspect  # 导入较慢，第一次请求时才需要
+            signature = self._signatures[name] = inspect.signature(method)
+        try:
+            signature.bind(**params)
+        except TypeError as e:
+            raise ControlError(INVALID_PARAMS, str(e))
+        if stream is None:
+            return method(**params)
+
+        subscription = stream(**params)
+        subscription.notify = self._wake
+        conn.subscriptions.append(subscription)
+        self._stream_connections.add(conn)
+        return {"subscribed": name}
@@ -0,0 +1,204 @@
+"""护眼助手命令行客户端
+
+通过本机控制通道控制正在运行的实例，不依赖 wx，只导入标准库（在 src 目录下）:
+
+    python -m lib.ctl status                 # 一行状态文本，适合状态栏小部件
+    python -m lib.ctl status --json
+    python -m lib.ctl status --watch 5       # 保持一个连接，每5秒输出一行
+    python -m lib.ctl force-rest
+    python -m lib.ctl start --work 45 --rest 5
+    python -m lib.ctl stop
+    python -m lib.ctl config get
+    python -m lib.ctl config set work_time=45 play_sound_after_rest=false
+    python -m lib.ctl stats --days 7
+    python -m lib.ctl watch                  # 持续输出状态转换、状态刷新和通知
+    python -m lib.ctl watch --kinds transition notice --json
+    python -m lib.ctl profile --seconds 30   # 采集性能数据，完成后输出结果文件路径
+    python -m lib.ctl trace                  # 导出最近的追踪事件（热键到休息窗口显示的各跳）
+    python -m lib.ctl call metrics
+
+退出码: 0 成功，1 实例返回错误，3 没有运行中的实例
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from .ipc import ControlClient, ControlError
+
+EXIT_ERROR = 1
+EXIT_NOT_RUNNING = 3
+
+
+def parse_value(text):
+    """命令行上的值按JSON解析（true/45/0.5），解析失败时作为字符串"""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def format_status(status):
+    remaining = status["remaining_seconds"]
+    if status["state"] == "working" and remaining > 0:
+        return f"{status['state']} {remaining // 60}:{remaining % 60:02d}"
+    return status["state"]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="护眼助手命令行客户端")
+    parser.add_argument("--timeout", type=float, default=1.0, help="连接和请求超时（秒）")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    status = commands.add_parser("status", help="显示当前状态")
+    status.add_argument("--json", action="store_true", help="输出完整的JSON")
+    status.add_argument("--watch", type=float, metavar="SECONDS", help="每隔SECONDS秒输出一次，直到中断")
+
+    commands.add_parser("force-rest", help="立即开始休息")
+    commands.add_parser("show", help="显示设置窗口")
+
+    start = commands.add_parser("start", help="开始工作会话")
+    start.add_argument("--work", type=int, help="工作时长（分钟），默认使用当前配置")
+    start.add_argument("--rest", type=float, help="休息时长（分钟），默认使用当前配置")
+
+    commands.add_parser("stop", help="停止工作会话")
+
+    config = commands.add_parser("config", help="查看或修改配置")
+    config_commands = config.add_subparsers(dest="config_command", required=True)
+    config_commands.add_parser("get", help="显示当前配置")
+    config_set = config_commands.add_parser("set", help="修改配置项")
+    config_set.add_argument("items", nargs="+", metavar="KEY=VALUE")
+
+    stats = commands.add_parser("stats", help="显示休息统计")
+    stats.add_argument("--days", type=int, default=7, help="每日记录的天数")
+
+    watch = commands.add_parser("watch", help="持续输出核心事件，直到中断")
+    watch.add_argument("--kinds", nargs="+", choices=["transition", "tick", "notice"], help="只输出这些类型")
+    watch.add_argument("--json", action="store_true", help="每个事件输出一行JSON")
+
+    profile = commands.add_parser("profile", help="采集运行中实例的性能数据（cProfile和调用栈采样）")
+    profile.add_argument("--seconds", type=int, default=10, help="采集时长（秒），默认10")
+
+    trace = commands.add_parser("trace", help="导出最近的追踪事件为 Chrome trace-event JSON")
+    trace.add_argument("--output", help="输出文件路径，默认写入实例的日志目录")
+
+    call = commands.add_parser("call", help="调用任意控制方法")
+    call.add_argument("method")
+    call.add_argument("params", nargs="*", metavar="KEY=VALUE")
+    return parser
+
+
+def parse_items(items):
+    params = {}
+    for item in items:
+        key, sep, value = item.partition("=")
+        if not sep or not key:
+            raise ValueError(f"参数格式应为 KEY=VALUE: {item}")
+        params[key] = parse_value(value)
+    return params
+
+
+def watch_status(client, args):
+    try:
+        while True:
+            status = client.call("status")
+            line = json.dumps(status, ensure_ascii=False) if args.json else format_status(status)
+            print(line, flush=True)
+            time.sleep(args.watch)
+    except KeyboardInterrupt:
+        return 0
+
+
+def format_event(event):
+    clock = time.strftime("%H:%M:%S", time.localtime(event["timestamp"]))
+    if event["kind"] == "transition":
+        return f"{clock} {event['old_state']} -> {event['new_state']}"
+    if event["kind"] == "tick":
+        return f"{clock} {event['status_text']}"
+    data = "" if event["data"] is None else f" {event['data']}"
+    return f"{clock} {event['name']}{data}"
+
+
+def watch_events(client, args):
+    params = {"kinds": args.kinds} if args.kinds else {}
+    try:
+        for event in client.subscribe("watch", **params):
+            print(json.dumps(event, ensure_ascii=False) if args.json else format_event(event), flush=True)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def run_profile(client, args):
+    """开始采集并等待 profile_saved 通知"""
+    events = client.subscribe("watch", kinds=["notice"])
+    client.call("profile", seconds=args.seconds)
+    client.sock.settimeout(args.seconds + 10)
+    for event in events:
+        if event["name"] == "profile_saved":
+            return event["data"]
+
+
+def run(client, args):
+    """执行一条命令，返回要输出的内容"""
+    if args.command == "status":
+        status = client.call("status")
+        return status if args.json else format_status(status)
+    if args.command == "force-rest":
+        return client.call("force_rest")
+    if args.command == "show":
+        return client.call("show_settings")
+    if args.command == "start":
+        params = {}
+        if args.work is not None:
+            params["work_time"] = args.work
+        if args.rest is not None:
+            params["rest_time"] = args.rest
+        return client.call("start_work_session", **params)
+    if args.command == "stop":
+        return client.call("stop_work_session")
+    if args.command == "config":
+        if args.config_command == "get":
+            return client.call("get_config")
+        return client.call("update_config", **parse_items(args.items))
+    if args.command == "stats":
+        return client.call("statistics", days=args.days)
+    if args.command == "profile":
+        return run_profile(client, args)
+    if args.command == "trace":
+        params = {"path": os.path.abspath(args.output)} if args.output else {}
+        return client.call("trace_export", **params)
+    return client.call(args.method, **parse_items(args.params))
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        client = ControlClient(args.timeout)
+    except (OSError, ValueError, KeyError):
+        print("护眼助手没有在运行", file=sys.stderr)
+        return EXIT_NOT_RUNNING
+
+    with client:
+        try:
+            if args.command == "status" and args.watch:
+                return watch_status(client, args)
+            if args.command == "watch":
+                return watch_events(client, args)
+            result = run(client, args)
+        except ControlError as e:
+            print(f"错误 ({e.code}): {e.message}", file=sys.stderr)
+            return EXIT_ERROR
+        except (OSError, ValueError) as e:
+            print(f"错误: {e}", file=sys.stderr)
+            return EXIT_ERROR
+
+    if isinstance(result, str):
+        print(result)
+    else:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""核心状态变化的发布/订阅
+
+核心线程把状态转换、每秒的状态刷新和各种通知发布到 EventBus，
+每个订阅者有自己的固定长度环形缓冲区。缓冲区满时丢弃最旧的事件并计数，
+发布方从不等待订阅者，慢的订阅者（界面线程繁忙、网络客户端不读取）
+不会拖慢核心。
+
+订阅者可以:
+    - 在自己的线程中阻塞读取: for event in subscription
+    - 在 asyncio 中读取:      async for event in subscription.aiter()
+    - 设置 notify 回调，在有新事件时得到通知后自行 drain()
+"""
+import itertools
+import threading
+import time
+from collections import deque, namedtuple
+
+
+class Transition(namedtuple("Transition", "seq timestamp old_state new_state")):
+    """状态转换，old_state/new_state 为状态值字符串（AppState.value）"""
+    __slots__ = ()
+    kind = "transition"
+
+
+class Tick(namedtuple("Tick", "seq timestamp state remaining_seconds status_text")):
+    """状态刷新：工作和离开状态下每秒一次，状态转换后立即一次"""
+    __slots__ = ()
+    kind = "tick"
+
+
+class Notice(namedtuple("Notice", "seq timestamp name data")):
+    """其他通知，name 如 rest_started、work_complete、temp_pause、temp_resume、show_window、config_changed"""
+    __slots__ = ()
+    kind = "notice"
+
+
+EVENT_KINDS = (Transition.kind, Tick.kind, Notice.kind)
+
+
+def event_to_dict(event):
+    """转换为可JSON序列化的字典"""
+    result = event._asdict()
+    result["kind"] = event.kind
+    return result
+
+
+class Subscription:
+    """一个订阅者的有界事件缓冲区"""
+
+    def __init__(self, bus, maxlen, kinds=None):
+        self.bus = bus
+        self.kinds = frozenset(kinds) if kinds else None
+        self.notify = None  # 有新事件时调用（在发布线程中），不能阻塞
+        self.dropped = 0
+        self.closed = False
+        self._buffer = deque(maxlen=maxlen)
+        self._cond = threading.Condition(threading.Lock())
+
+    def _put(self, event):
+        """由 EventBus 在发布线程中调用"""
+        if self.kinds is not None and event.kind not in self.kinds:
+            return
+        with self._cond:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+            self._buffer.append(event)
+            self._cond.notify()
+        notify = self.notify
+        if notify:
+            notify()
+
+    def get(self, timeout=None):
+        """取出最早的事件
+        Args:
+            timeout: 最长等待秒数，None表示一直等待
+        Returns:
+            事件，超时或订阅已关闭且缓冲区为空时返回None
+        """
+        with self._cond:
+            if not self._buffer and not self.closed:
+                self._cond.wait(timeout)
+            return self._buffer.popleft() if self._buffer else None
+
+    def drain(self):
+        """取出缓冲区中的全部事件（不等待）"""
+        with self._cond:
+            events = list(self._buffer)
+            self._buffer.clear()
+        return events
+
+    def close(self):
+        """取消订阅，阻塞在 get() 中的读取方会返回"""
+        self.bus.unsubscribe(self)
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+        notify = self.notify
+        if notify:
+            notify()
+
+    def __iter__(self):
+        while True:
+            event = self.get()
+            if event is None:
+                return
+            yield event
+
+    async def aiter(self):
+        """异步迭代器，事件到达时通过 call_soon_threadsafe 唤醒当前事件循环"""
+        import asyncio  # 只有异步订阅者需要，避免核心启动时导入
+        loop = asyncio.get_running_loop()
+        ready = asyncio.Event()
+        self.notify = lambda: loop.call_soon_threadsafe(ready.set)
+        try:
+            while True:
+                for event in self.drain():
+                    yield event
+                if self.closed:
+                    return
+                await ready.wait()
+                ready.clear()
+        finally:
+            self.notify = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class EventBus:
+    """核心事件的发布/订阅通道"""
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self._subscribers = ()  # 发布时直接读取，订阅变化时整体替换
+        self._lock = threading.Lock()
+        self._seq = itertools.count(1)
+        self.published = 0
+
+    def subscribe(self, maxlen=256, kinds=None):
+        """新建订阅
+        Args:
+            maxlen: 缓冲区长度，满时丢弃最旧的事件
+            kinds: 只接收这些类型（"transition"、"tick"、"notice"），None表示全部
+        Returns:
+            Subscription
+        """
+        subscription = Subscription(self, maxlen, kinds)
+        with self._lock:
+            self._subscribers = self._subscribers + (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers = tuple(s for s in self._subscribers if s is not subscription)
+
+    def _publish(self, event):
+        self.published += 1
+        for subscription in self._subscribers:
+            subscription._put(event)
+        return event
+
+    def transition(self, old_state, new_state):
+        return self._publish(Transition(next(self._seq), self.clock(), old_state, new_state))
+
+    def tick(self, state, remaining_seconds, status_text):
+        return self._publish(Tick(next(self._seq), self.clock(), state, remaining_seconds, status_text))
+
+    def notice(self, name, data=None):
+        return self._publish(Notice(next(self._seq), self.clock(), name, data))
+
+    def get_stats(self):
+        """发布数量、订阅者数量和各订阅者累计丢弃的事件数"""
+        subscribers = self._subscribers
+        return {
+            "published": self.published,
+            "subscribers": len(subscribers),
+            "dropped": sum(s.dropped for s in subscribers),
+        }
@@ -0,0 +1,119 @@
+"""界面前端适配器
+
+核心不依赖任何界面工具包，前端通过订阅 core.events 获得状态转换、
+状态刷新和通知，在自己的线程中处理。wx界面仍然使用核心的 on_* 回调
+（核心用 wx.CallAfter 作为 dispatch），其他前端继承 Frontend。
+"""
+import sys
+import time
+from .app_states import AppState
+from .rest_manager import RestManager
+
+STOP_CHECK_INTERVAL = 0.5   # run() 检查停止请求的间隔（秒）
+
+
+class Frontend:
+    """前端基类
+
+    子类按需覆盖 on_transition(event)、on_tick(event) 和 on_<通知名>(data)，
+    如 on_rest_started(minutes)、on_temp_pause(None)。
+    """
+
+    def __init__(self, core, maxlen=64):
+        self.core = core
+        self.subscription = core.events.subscribe(maxlen)
+        self.stop_requested = False
+
+    def run(self):
+        """在当前线程中处理事件，直到 stop() 或 request_stop()"""
+        while not self.stop_requested:
+            event = self.subscription.get(timeout=STOP_CHECK_INTERVAL)
+            if event is not None:
+                self.handle(event)
+            elif self.subscription.closed:
+                return
+        self.subscription.close()
+
+    def stop(self):
+        """结束 run()，可在任意线程调用（不能在信号处理函数中调用）"""
+        self.subscription.close()
+
+    def request_stop(self):
+        """请求结束 run()，只设置标志，可在信号处理函数中调用
+
+        信号处理函数在主线程中执行，主线程可能正持有订阅的锁（阻塞在 get() 中），
+        这时调用 stop() 获取同一把锁会死锁；run() 最多 STOP_CHECK_INTERVAL 秒后自行退出。
+        """
+        self.stop_requested = True
+
+    def handle(self, event):
+        if event.kind == "transition":
+            self.on_transition(event)
+        elif event.kind == "tick":
+            self.on_tick(event)
+        else:
+            handler = getattr(self, "on_" + event.name, None)
+            if handler:
+                handler(event.data)
+
+    def on_transition(self, event):
+        pass
+
+    def on_tick(self, event):
+        pass
+
+    def close(self):
+        """释放前端资源（run() 返回后调用）"""
+        pass
+
+
+class HeadlessFrontend(Frontend):
+    """没有窗口的前端：自己计时休息，并按行输出状态变化
+
+    休息屏幕在wx界面中负责计时和通知核心休息结束，这里由 RestManager 完成，
+    休息期间按热键增加时间、临时暂停和恢复的行为与wx界面一致。
+    """
+
+    def __init__(self, core, output=sys.stdout, maxlen=64):
+        super().__init__(core, maxlen)
+        self.output = output
+        self.rest = RestManager()
+
+    def write(self, text):
+        if self.output is not None:
+            self.output.write(f"{time.strftime('%H:%M:%S')} {text}\n")
+            self.output.flush()
+
+    def on_transition(self, event):
+        if event.new_state == AppState.IDLE.value and self.rest.is_resting:
+            # 休息中停止工作会话，结束计时（核心在空闲状态下忽略取消事件）
+            self.rest.stop_rest(cancelled=True)
+        self.write(f"{event.old_state} -> {event.new_state}")
+
+    def on_rest_started(self, minutes):
+        self.rest.start_rest(
+            minutes,
+            config=self.core.config,
+            on_complete=self.core.on_rest_complete,
+            on_cancel=self.core.on_rest_cancel,
+            on_update_display=self.on_rest_display
+        )
+        self.write(f"开始休息 {minutes:g} 分钟")
+
+    def on_rest_display(self, data):
+        """休息计时线程每秒调用"""
+        pass
+
+    def on_work_complete(self, action):
+        if action == "add_time":
+            self.rest.add_rest_time()
+
+    def on_temp_pause(self, data):
+        self.rest.pause()
+
+    def on_temp_resume(self, data):
+        self.rest.resume()
+
+    def close(self):
+        if self.rest.is_resting:
+            self.rest.pause()
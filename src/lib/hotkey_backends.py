@@ -0,0 +1,287 @@
+import glob
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from .logger_manager import LoggerManager
+from .hotkey_chord import Chord, CONTROL, SHIFT, ALT, WINDOW
+
+
+class HotkeyBackend:
+    """全局热键后端接口
+
+    后端只负责监听按键，按下已绑定的热键时调用 start() 传入的
+    on_press(chord, pressed_at)，其中 chord 是绑定时传入的 Chord，
+    pressed_at 是按键发生的时间戳（time.time()）。
+    add()/remove() 可以在监听过程中随时调用，只影响对应的一个绑定。
+    """
+    name = "base"
+
+    def __init__(self):
+        self.logger = LoggerManager.get_logger()
+        self.on_press = None
+        self.is_running = False
+
+    def start(self, on_press):
+        """开始监听"""
+        self.on_press = on_press
+        self.is_running = True
+
+    def stop(self):
+        """停止监听"""
+        self.is_running = False
+
+    def add(self, chord):
+        """增加一个绑定（Chord）"""
+        raise NotImplementedError
+
+    def remove(self, chord):
+        """删除一个绑定"""
+        raise NotImplementedError
+
+    def _fire(self, chord, pressed_at):
+        if self.on_press:
+            self.on_press(chord, pressed_at)
+
+
+class GlobalHotkeysBackend(HotkeyBackend):
+    """global_hotkeys 库后端（Windows）
+
+    使用库的单个热键注册接口，增删绑定时不停止库的检测线程。
+    与原来的注册方式一致，热键在松开时触发；库只在回调时通知，
+    按键时间取回调开始的时间。
+    """
+    name = "global_hotkeys"
+
+    def __init__(self):
+        super().__init__()
+        import global_hotkeys
+        self._lib = global_hotkeys
+        self._started = False
+
+    def start(self, on_press):
+        super().start(on_press)
+        if not self._started:
+            self._lib.start_checking_hotkeys()
+            self._started = True
+
+    def stop(self):
+        if self._started:
+            self._lib.stop_checking_hotkeys()
+            self._started = False
+        super().stop()
+
+    def add(self, chord):
+        self._lib.register_hotkey(str(chord), None, lambda: self._fire(chord, time.time()), True)
+
+    def remove(self, chord):
+        self._lib.remove_hotkey(str(chord))
+
+
+def _build_key_codes():
+    """Linux输入事件键码到按键名的映射（字母、数字、功能键和常用键）"""
+    codes = {}
+    for code, name in enumerate("1234567890", start=2):
+        codes[code] = name
+    for start, row in ((16, "qwertyuiop"), (30, "asdfghjkl"), (44, "zxcvbnm")):
+        for offset, name in enumerate(row):
+            codes[start + offset] = name
+    for index in range(10):
+        codes[59 + index] = f"f{index + 1}"
+    codes.update({87: "f11", 88: "f12", 1: "escape", 14: "backspace", 15: "tab",
+                  28: "enter", 57: "space"})
+    return codes
+
+
+class EvdevHotkeyBackend(HotkeyBackend):
+    """Linux evdev后端：epoll等待键盘事件，没有按键时线程不会被唤醒
+
+    按键时间使用内核事件的时间戳，需要对输入设备有读权限（通常是input组）。
+    """
+    name = "evdev"
+
+    # struct input_event { struct timeval time; __u16 type; __u16 code; __s32 value; }
+    EVENT_FORMAT = "llHHi"
+    EVENT_SIZE = struct.calcsize(EVENT_FORMAT)
+    EV_KEY = 0x01
+
+    MODIFIER_CODES = {
+        29: CONTROL, 97: CONTROL,
+        42: SHIFT, 54: SHIFT,
+        56: ALT, 100: ALT,
+        125: WINDOW, 126: WINDOW,
+    }
+    KEY_CODES = _build_key_codes()
+
+    def __init__(self, device_paths=None):
+        super().__init__()
+        paths = device_paths if device_paths is not None else sorted(glob.glob("/dev/input/event*"))
+        self._fds = []
+        for path in paths:
+            try:
+                self._fds.append(os.open(path, os.O_RDONLY | os.O_NONBLOCK))
+            except OSError:
+                continue
+        if not self._fds:
+            raise RuntimeError("没有可读取的输入设备")
+
+        self._bindings = {}             # {(修饰键位掩码, 按键): Chord}，整体替换，监听线程无锁读取
+        self._pressed = {}              # {code: 修饰键位}，左右两侧的修饰键分别记录
+        self._mask = 0                  # 当前按住的修饰键位掩码
+        self._wake_r, self._wake_w = os.pipe()
+        self._thread = None
+
+    def start(self, on_press):
+        super().start(on_press)
+        if self._thread is None:
+            self._epoll = select.epoll()
+            self._epoll.register(self._wake_r, select.EPOLLIN)
+            for fd in self._fds:
+                self._epoll.register(fd, select.EPOLLIN)
+            self._thread = threading.Thread(target=self._run, name="EvdevHotkeys")
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self):
+        super().stop()
+        if self._thread is not None:
+            os.write(self._wake_w, b"\x00")
+            if threading.current_thread() != self._thread:
+                self._thread.join(timeout=1)
+            self._thread = None
+            self._epoll.close()
+            for fd in self._fds + [self._wake_r, self._wake_w]:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+            self._fds = []
+
+    def add(self, chord):
+        bindings = dict(self._bindings)
+        bindings[(chord.modifiers, chord.key)] = chord
+        self._bindings = bindings
+
+    def remove(self, chord):
+        bindings = dict(self._bindings)
+        bindings.pop((chord.modifiers, chord.key), None)
+        self._bindings = bindings
+
+    def _run(self):
+        """监听线程主循环"""
+        while self.is_running:
+            try:
+                ready = self._epoll.poll()
+            except OSError as e:
+                self.logger.error(f"热键监听等待失败: {str(e)}")
+                break
+            for fd, _ in ready:
+                if fd == self._wake_r:
+                    return
+                try:
+                    data = os.read(fd, self.EVENT_SIZE * 64)
+                except (BlockingIOError, OSError):
+                    continue
+                for sec, usec, ev_type, code, value in struct.iter_unpack(
+                        self.EVENT_FORMAT, data[:len(data) - len(data) % self.EVENT_SIZE]):
+                    if ev_type == self.EV_KEY:
+                        self._on_key(code, value, sec + usec / 1e6)
+
+    def _on_key(self, code, value, timestamp):
+        """处理一次按键事件：value 1按下，0松开，2自动重复"""
+        bit = self.MODIFIER_CODES.get(code)
+        if bit:
+            if value == 1:
+                self._pressed[code] = bit
+            elif value == 0:
+                self._pressed.pop(code, None)
+            else:
+                return
+            mask = 0
+            for held in self._pressed.values():
+                mask |= held
+            self._mask = mask
+            return
+        if value != 1:
+            return
+        # 热路径：一次字典查找
+        chord = self._bindings.get((self._mask, self.KEY_CODES.get(code)))
+        if chord is not None:
+            self._fire(chord, timestamp)
+
+
+class FakeHotkeyBackend(HotkeyBackend):
+    """假后端，用于测试和压测：press() 直接在调用线程中触发热键"""
+    name = "fake"
+
+    def __init__(self):
+        super().__init__()
+        self.bindings = set()
+        self.presses = 0
+        self.add_calls = 0
+        self.remove_calls = 0
+
+    def add(self, chord):
+        self.add_calls += 1
+        self.bindings.add(chord)
+
+    def remove(self, chord):
+        self.remove_calls += 1
+        self.bindings.discard(chord)
+
+    def press(self, hotkey_str, pressed_at=None):
+        """模拟按下一次热键
+        Returns:
+            bool: 热键是否已绑定并被触发
+        """
+        chord = Chord.parse(hotkey_str)
+        if not self.is_running or chord not in self.bindings:
+            return False
+        self.presses += 1
+        self._fire(chord, pressed_at if pressed_at is not None else time.time())
+        return True
+
+
+class NullHotkeyBackend(HotkeyBackend):
+    """没有可用后端时的兜底实现，记录绑定但不会触发"""
+    name = "null"
+
+    def add(self, chord):
+        pass
+
+    def remove(self, chord):
+        pass
+
+
+HOTKEY_BACKENDS = {
+    "global_hotkeys": GlobalHotkeysBackend,
+    "evdev": EvdevHotkeyBackend,
+    "fake": FakeHotkeyBackend,
+    "null": NullHotkeyBackend,
+}
+
+
+def create_hotkey_backend(name=None):
+    """创建热键后端
+    Args:
+        name: 后端名称，None时读取环境变量 EYE_REST_HOTKEY_BACKEND，仍为空则按平台自动选择
+    Returns:
+        HotkeyBackend: 后端实例
+    """
+    logger = LoggerManager.get_logger()
+    name = name or os.environ.get("EYE_REST_HOTKEY_BACKEND")
+    if name:
+        return HOTKEY_BACKENDS[name]()
+
+    candidates = ["global_hotkeys"] if sys.platform == "win32" else ["evdev"]
+    for candidate in candidates:
+        try:
+            backend = HOTKEY_BACKENDS[candidate]()
+            logger.info(f"热键后端: {candidate}")
+            return backend
+        except Exception as e:
+            logger.warning(f"热键后端 {candidate} 不可用: {str(e)}")
+    logger.warning("没有可用的热键后端，全局热键将不会触发")
+    return NullHotkeyBackend()
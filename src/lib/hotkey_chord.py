@@ -0,0 +1,136 @@
+"""热键组合（Chord）模型
+
+热键字符串只在第一次出现时解析，得到的 Chord 对象按 (修饰键位掩码, 按键)
+驻留，同一个组合无论写成 "ctrl+shift+r" 还是 "Shift + Control + R" 都是
+同一个对象。Chord 可哈希，以它为键的字典就是 (位掩码, 按键) → 动作 的查找表，
+按键匹配只需要一次字典查找。
+"""
+
+CONTROL = 1
+SHIFT = 2
+ALT = 4
+WINDOW = 8
+
+# 修饰键名称（含常见别名）到位的映射
+MODIFIER_BITS = {
+    "ctrl": CONTROL, "control": CONTROL,
+    "shift": SHIFT,
+    "alt": ALT,
+    "win": WINDOW, "window": WINDOW, "super": WINDOW, "meta": WINDOW,
+}
+
+# 标准化输出时的修饰键顺序和名称（与 global_hotkeys 的写法一致）
+MODIFIER_NAMES = ((CONTROL, "control"), (SHIFT, "shift"), (ALT, "alt"), (WINDOW, "window"))
+
+
+class HotkeyConflictError(ValueError):
+    """同一个热键组合被绑定到不同的动作"""
+    pass
+
+
+class Chord:
+    """解析后的热键组合，不可修改，相同组合只有一个实例"""
+
+    __slots__ = ("modifiers", "key", "text")
+
+    _by_parts = {}  # {(modifiers, key): Chord}
+    _by_text = {}   # {原始字符串: Chord}
+
+    def __init__(self, modifiers, key, text):
+        object.__setattr__(self, "modifiers", modifiers)
+        object.__setattr__(self, "key", key)
+        object.__setattr__(self, "text", text)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Chord 不可修改")
+
+    @classmethod
+    def of(cls, modifiers, key):
+        """按修饰键位掩码和按键获取驻留的实例"""
+        chord = cls._by_parts.get((modifiers, key))
+        if chord is None:
+            names = [name for bit, name in MODIFIER_NAMES if modifiers & bit]
+            chord = cls(modifiers, key, " + ".join(names + [key]))
+            chord = cls._by_parts.setdefault((modifiers, key), chord)
+        return chord
+
+    @classmethod
+    def parse(cls, hotkey_str):
+        """解析热键字符串，结果按原始字符串缓存
+
+        Args:
+            hotkey_str: 如 "ctrl+shift+z"、"win+1"，大小写和空格不敏感
+
+        Returns:
+            Chord: 驻留的组合实例
+
+        Raises:
+            ValueError: 热键字符串格式无效
+        """
+        if isinstance(hotkey_str, Chord):
+            return hotkey_str
+        chord = cls._by_text.get(hotkey_str)
+        if chord is not None:
+            return chord
+
+        modifiers = 0
+        key = None
+        for part in hotkey_str.lower().split("+"):
+            part = part.strip()
+            if not part:
+                raise ValueError(f"热键格式无效: {hotkey_str!r}")
+            bit = MODIFIER_BITS.get(part)
+            if bit is not None:
+                modifiers |= bit
+            elif key is None:
+                key = part
+            else:
+                raise ValueError(f"热键只能包含一个非修饰键: {hotkey_str!r}")
+        if key is None:
+            raise ValueError(f"热键缺少非修饰键: {hotkey_str!r}")
+
+        chord = cls.of(modifiers, key)
+        cls._by_text[hotkey_str] = chord
+        return chord
+
+    def __eq__(self, other):
+        if isinstance(other, Chord):
+            return self.modifiers == other.modifiers and self.key == other.key
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.modifiers, self.key))
+
+    def __str__(self):
+        return self.text
+
+    def __repr__(self):
+        return f"Chord({self.text!r})"
+
+
+def check_conflicts(bindings):
+    """检查绑定列表中是否有同一个组合对应不同的动作
+
+    Args:
+        bindings: [(hotkey_str 或 Chord, action), ...]
+
+    Returns:
+        dict: {Chord: action}
+
+    Raises:
+        HotkeyConflictError: 同一个组合绑定了不同的动作
+        ValueError: 热键字符串格式无效
+    """
+    table = {}
+    for hotkey, action in bindings:
+        chord = Chord.parse(hotkey)
+        existing = table.get(chord)
+        if existing is not None and existing != action:
+            raise HotkeyConflictError(
+                f"热键冲突: {chord} 同时绑定到 {_action_name(existing)} 和 {_action_name(action)}")
+        table[chord] = action
+    return table
+
+
+def _action_name(action):
+    return getattr(action, "__name__", repr(action))
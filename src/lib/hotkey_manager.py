@@ -1,129 +1,163 @@
+import threading
+import time
 from .logger_manager import LoggerManager
-from global_hotkeys import *
+from .hotkey_backends import create_hotkey_backend
+from .hotkey_chord import Chord, check_conflicts
+from .metrics import LatencyStats
+from .tracing import tracer
 
 class HotkeyManager:
-    """全局热键管理器"""
-    
-    def __init__(self):
-        """初始化热键管理器"""
-        self.logger = LoggerManager.get_logger()
-        self.is_running = False
-        self._bindings = {}  # 存储热键绑定 {hotkey_str: callback}
-    
-    def _normalize_hotkey(self, hotkey_str):
-        """标准化热键字符串格式
-        
+    """全局热键管理器
+
+    按键监听由可替换的后端完成（见 hotkey_backends），绑定的增删只影响
+    对应的一个热键，不会停止和重启监听。每次触发都会记录从按键到回调
+    返回（回调把事件放入核心事件队列）的延迟。
+
+    绑定表以 Chord 为键，按键匹配是一次字典查找；set_bindings() 中
+    同一个组合绑定到不同的动作时抛出 HotkeyConflictError，现有绑定保持不变。
+    绑定的修改会在核心线程和界面线程中调用，比较和增删在同一把锁中完成；
+    按键回调只读取绑定表，不加锁。
+    """
+
+    def __init__(self, backend=None):
+        """初始化热键管理器
         Args:
-            hotkey_str: 原始热键字符串，如 "ctrl+shift+z" 或 "win+1"
-            
-        Returns:
-            str: 标准化后的热键字符串，如 "control + shift + z" 或 "window + 1"
+            backend: HotkeyBackend 实例，None时按平台自动选择
         """
-        # 转换为小写以统一处理
-        hotkey_str = hotkey_str.lower()
-        
-        # 替换常见的缩写
-        replacements = {
-            'ctrl': 'control',
-            'win': 'window'
-        }
-        
-        # 分割并处理每个部分
-        parts = [part.strip() for part in hotkey_str.split('+')]
-        converted_parts = [replacements.get(part, part) for part in parts]
-        
-        # 用 " + " 连接所有部分
-        return " + ".join(converted_parts)
-    
+        self.logger = LoggerManager.get_logger()
+        self.backend = backend or create_hotkey_backend()
+        self._bindings = {}  # 存储热键绑定 {Chord: callback}
+        self._lock = threading.Lock()  # 串行化绑定表和后端注册的修改
+        self.latency = LatencyStats()  # 按键到进入事件队列的延迟
+
+    @property
+    def is_running(self):
+        """后端是否正在监听"""
+        return self.backend.is_running
+
+    def _normalize_hotkey(self, hotkey_str):
+        """标准化热键字符串格式（兼容旧接口），如 "ctrl+shift+z" → "control + shift + z" """
+        return str(Chord.parse(hotkey_str))
+
+    def _ensure_started(self):
+        if not self.backend.is_running:
+            self.backend.start(self._on_press)
+
+    def _on_press(self, chord, pressed_at):
+        """后端回调：执行绑定的回调并记录延迟"""
+        callback = self._bindings.get(chord)
+        if callback is None:
+            return
+        # 追踪从按下开始，回调放入核心队列的事件带上追踪ID
+        trace_id = tracer.begin(f"hotkey {chord}", pressed_at)
+        tracer.mark(trace_id, "hotkey_callback")
+        try:
+            with tracer.activate(trace_id):
+                callback()
+        except Exception as e:
+            self.logger.error(f"热键回调失败 {chord}: {str(e)}")
+        self.latency.record(time.time() - pressed_at)
+
     def register_hotkey(self, hotkey_str, callback):
         """注册全局热键
-        
+
         Args:
             hotkey_str: 热键字符串，如 "ctrl+shift+z"
             callback: 热键触发时的回调函数
-            
+
         Returns:
             bool: 注册是否成功
-            
+
         Raises:
             ValueError: 热键字符串格式无效
             RuntimeError: 热键注册失败
         """
+        if not hotkey_str or not callback:
+            raise ValueError("热键字符串和回调函数不能为空")
+
+        chord = Chord.parse(hotkey_str)
+
         try:
-            if not hotkey_str or not callback:
-                raise ValueError("热键字符串和回调函数不能为空")
-            
-            # 标准化热键字符串
-            normalized_hotkey = self._normalize_hotkey(hotkey_str)
-            
-            # 如果已经在运行，需要先停止当前的热键监听
-            if self.is_running:
-                self.stop()
-            
-            # 存储绑定关系
-            self._bindings[normalized_hotkey] = callback
-            
-            # 构建绑定列表
-            bindings = [
-                [key, None, func, True]
-                for key, func in self._bindings.items()
-            ]
-            
-            # 注册热键
-            register_hotkeys(bindings)
-            
-            # 开始监听
-            start_checking_hotkeys()
-            self.is_running = True
-            
-            self.logger.info(f"注册热键成功: {normalized_hotkey}")
+            # 只增加（或替换）这一个绑定，其他热键的监听不受影响
+            with self._lock:
+                if chord not in self._bindings:
+                    self.backend.add(chord)
+                self._bindings[chord] = callback
+                self._ensure_started()
+
+            self.logger.info(f"注册热键成功: {chord}")
             return True
-            
+
         except Exception as e:
             self.logger.error(f"注册热键失败: {str(e)}")
             raise RuntimeError(f"注册热键失败: {str(e)}")
-    
+
     def unregister_hotkey(self, hotkey_str):
         """取消注册指定的热键
-        
+
         Args:
             hotkey_str: 要取消注册的热键字符串
-            
+
         Returns:
             bool: 取消注册是否成功
         """
         try:
-            normalized_hotkey = self._normalize_hotkey(hotkey_str)
-            if normalized_hotkey in self._bindings:
-                del self._bindings[normalized_hotkey]
-                
-                # 如果还有其他热键，重新注册
-                if self._bindings:
-                    self.stop()
-                    bindings = [
-                        [key, None, func, True]
-                        for key, func in self._bindings.items()
-                    ]
-                    register_hotkeys(bindings)
-                    start_checking_hotkeys()
-                    self.is_running = True
-                else:
-                    self.stop()
-                
-                self.logger.info(f"取消注册热键成功: {normalized_hotkey}")
-                return True
-            return False
+            chord = Chord.parse(hotkey_str)
+            with self._lock:
+                if chord not in self._bindings:
+                    return False
+                del self._bindings[chord]
+                self.backend.remove(chord)
+            self.logger.info(f"取消注册热键成功: {chord}")
+            return True
         except Exception as e:
             self.logger.error(f"取消注册热键失败: {str(e)}")
             return False
-    
+
+    def set_bindings(self, hotkey_list):
+        """把绑定整体设置为 hotkey_list，只增删有变化的热键
+
+        Args:
+            hotkey_list: [(hotkey_str, callback), ...]
+
+        Raises:
+            ValueError: 热键字符串格式无效
+            HotkeyConflictError: 同一个组合绑定了不同的动作（此时不修改现有绑定）
+            RuntimeError: 热键注册失败
+        """
+        wanted = check_conflicts(hotkey_list)
+        try:
+            with self._lock:
+                for chord in [key for key in self._bindings if key not in wanted]:
+                    del self._bindings[chord]
+                    self.backend.remove(chord)
+                    self.logger.debug(f"删除热键绑定: {chord}")
+                for chord, callback in wanted.items():
+                    if chord not in self._bindings:
+                        self.backend.add(chord)
+                        self.logger.debug(f"添加热键绑定: {chord}")
+                    self._bindings[chord] = callback
+
+                self._ensure_started()
+                count = len(self._bindings)
+            self.logger.info(f"热键绑定已更新，共 {count} 个热键")
+        except Exception as e:
+            self.logger.error(f"设置热键绑定失败: {str(e)}")
+            raise RuntimeError(f"设置热键绑定失败: {str(e)}")
+
+    def get_latency_stats(self):
+        """热键按下到进入事件队列的延迟统计（毫秒）"""
+        return self.latency.snapshot()
+
     def stop(self):
         """停止所有热键监听"""
-        if self.is_running:
-            stop_checking_hotkeys()
-            self.is_running = False
-            self.logger.info("停止所有热键监听")
-    
+        if self.backend.is_running:
+            self.backend.stop()
+            self.logger.info(f"停止所有热键监听，触发延迟: {self.latency.snapshot()}")
+
     def __del__(self):
         """清理资源"""
-        self.stop()
+        try:
+            self.stop()
+        except Exception:
+            pass
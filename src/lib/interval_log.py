@@ -0,0 +1,80 @@
+from bisect import bisect_left, bisect_right
+
+
+class IntervalLog:
+    """按开始时间排序、互不重叠的时间段记录
+
+    开始和结束时间分别存放在两个有序列表中，新加入的时间段用二分查找
+    定位与之重叠（或间隔不超过 merge_gap）的已有时间段并合并。查找是
+    O(log n) 的；插入、合并和清理用列表的 insert/del，最坏情况 O(n)。
+    时间段通常按时间顺序追加在末尾（插入位置在最后，清理只删除开头少数几个），
+    记录数又受 retention_seconds 限制，实际开销很小。
+    """
+
+    def __init__(self, merge_gap=0, retention_seconds=None):
+        """初始化时间段记录
+        Args:
+            merge_gap: 相隔不超过该秒数的两个时间段合并为一个
+            retention_seconds: 只保留最近多少秒内结束的时间段，None表示不清理
+        """
+        self.merge_gap = merge_gap
+        self.retention_seconds = retention_seconds
+        self.starts = []
+        self.ends = []
+
+    def __len__(self):
+        return len(self.starts)
+
+    def add(self, start, end):
+        """加入一个时间段并与相邻的时间段合并
+        Returns:
+            tuple: 合并后包含该时间段的 (start, end)
+        """
+        if end < start:
+            start, end = end, start
+        gap = self.merge_gap
+        # 第一个可能重叠的时间段：结束时间 >= start - gap
+        lo = bisect_left(self.ends, start - gap)
+        # 最后一个可能重叠的时间段之后：开始时间 > end + gap
+        hi = bisect_right(self.starts, end + gap)
+        if lo < hi:
+            start = min(start, self.starts[lo])
+            end = max(end, self.ends[hi - 1])
+            del self.starts[lo:hi]
+            del self.ends[lo:hi]
+        self.starts.insert(lo, start)
+        self.ends.insert(lo, end)
+
+        if self.retention_seconds is not None:
+            self.prune(end - self.retention_seconds)
+        return start, end
+
+    def find(self, timestamp):
+        """查找包含指定时间点的时间段
+        Returns:
+            tuple: (start, end)，不在任何时间段内时返回None
+        """
+        index = bisect_right(self.starts, timestamp) - 1
+        if index >= 0 and self.ends[index] >= timestamp:
+            return self.starts[index], self.ends[index]
+        return None
+
+    def covered(self, since, until):
+        """[since, until] 范围内被时间段覆盖的总秒数"""
+        total = 0
+        index = max(0, bisect_right(self.starts, since) - 1)
+        while index < len(self.starts) and self.starts[index] < until:
+            total += max(0, min(self.ends[index], until) - max(self.starts[index], since))
+            index += 1
+        return total
+
+    def prune(self, before):
+        """删除在 before 之前结束的时间段"""
+        count = bisect_left(self.ends, before)
+        if count:
+            del self.starts[:count]
+            del self.ends[:count]
+
+    def spans(self):
+        """所有时间段 [(start, end), ...]"""
+        return list(zip(self.starts, self.ends))
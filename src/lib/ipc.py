@@ -0,0 +1,160 @@
+"""本机控制通道
+
+运行中的实例监听一个只有当前用户能连接的本地端点，消息格式是
+按行分隔的 JSON-RPC 2.0:
+
+    → {"jsonrpc": "2.0", "id": 1, "method": "force_rest", "params": {}}
+    ← {"jsonrpc": "2.0", "id": 1, "result": true}
+
+端点按平台选择:
+    Linux    抽象命名空间的Unix套接字（不落盘，进程退出即释放），用 SO_PEERCRED 校验对端用户
+    其他Unix 用户目录下权限为600的Unix套接字文件
+    Windows  127.0.0.1 上的随机端口，端口和随机令牌写入用户目录下的文件，请求必须携带令牌
+
+本模块不依赖wx，第二个实例和命令行客户端导入它的开销很小。
+"""
+import itertools
+import json
+import os
+import socket
+import sys
+
+APP_NAME = "eye_rest"
+SOCKET_PATH = os.path.join(os.path.expanduser("~"), ".eye_rest.sock")
+PORT_FILE_PATH = os.path.join(os.path.expanduser("~"), ".eye_rest_port.json")
+MAX_REQUEST_BYTES = 64 * 1024
+
+# JSON-RPC 错误码
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+INVALID_STATE = -32000  # 应用错误：当前状态下不能执行该操作
+
+
+class ControlError(Exception):
+    """控制请求失败（服务端返回错误或无法连接）"""
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def _use_abstract_socket():
+    return sys.platform.startswith("linux")
+
+
+def _use_unix_socket():
+    return sys.platform != "win32" and hasattr(socket, "AF_UNIX")
+
+
+def _abstract_address():
+    return f"\0{APP_NAME}-{os.getuid()}"
+
+
+def _read_port_file():
+    with open(PORT_FILE_PATH, "r", encoding="utf-8") as f:
+        info = json.load(f)
+    return info["port"], info["token"]
+
+
+def connect(timeout=1.0):
+    """连接运行中实例的控制端点
+    Returns:
+        tuple: (socket, token)，token只在Windows上使用，其余平台为None
+    Raises:
+        OSError: 没有实例在监听
+    """
+    if _use_unix_socket():
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        address = _abstract_address() if _use_abstract_socket() else SOCKET_PATH
+        token = None
+    else:
+        port, token = _read_port_file()
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        address = ("127.0.0.1", port)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(address)
+    except OSError:
+        sock.close()
+        raise
+    return sock, token
+
+
+class ControlClient:
+    """控制通道客户端，一个连接上可以连续发送多个请求"""
+
+    def __init__(self, timeout=1.0):
+        self.sock, self.token = connect(timeout)
+        self._reader = self.sock.makefile("rb")
+        self._ids = itertools.count(1)
+        self._events = []  # 等待响应时收到的订阅通知
+
+    def call(self, method, **params):
+        """调用一个方法并等待结果
+        Raises:
+            ControlError: 服务端返回错误
+            OSError: 连接中断或超时
+        """
+        request = {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params}
+        if self.token:
+            request["token"] = self.token
+        self.sock.sendall(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+        while True:
+            response = self._read_message()
+            if "id" in response:
+                break
+            self._events.append(response.get("params"))
+        if "error" in response:
+            error = response["error"]
+            raise ControlError(error.get("code", INTERNAL_ERROR), error.get("message", ""))
+        return response.get("result")
+
+    def _read_message(self):
+        line = self._reader.readline()
+        if not line:
+            raise ControlError(INTERNAL_ERROR, "连接已关闭")
+        return json.loads(line)
+
+    def subscribe(self, method="watch", **params):
+        """调用订阅方法（立即生效），返回逐个产生服务端推送事件（字典）的迭代器
+        Raises:
+            ControlError: 服务端返回错误；迭代时连接关闭
+        """
+        self.call(method, **params)
+        self.sock.settimeout(None)
+        return self._iter_events()
+
+    def _iter_events(self):
+        while True:
+            while self._events:
+                yield self._events.pop(0)
+            message = self._read_message()
+            if "id" not in message:
+                yield message.get("params")
+
+    def close(self):
+        try:
+            self._reader.close()
+        finally:
+            self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def send_command(method, params=None, timeout=1.0):
+    """向运行中的实例发送一个请求并返回结果
+    Raises:
+        ControlError: 服务端返回错误
+        OSError: 没有实例在监听
+    """
+    with ControlClient(timeout) as client:
+        return client.call(method, **(params or {}))
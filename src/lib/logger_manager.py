@@ -21,9 +21,14 @@ class LoggerManager:
         self.logger.setLevel(logging.DEBUG)
         
         # 创建logs目录
-        logs_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'logs')
+        base_dir = os.path.dirname(os.path.dirname(__file__))
+        if os.path.isfile(base_dir):
+            # 从zipapp运行时代码在 .pyz 文件中，日志放在 .pyz 旁边
+            base_dir = os.path.dirname(base_dir)
+        logs_dir = os.path.join(base_dir, 'logs')
         if not os.path.exists(logs_dir):
             os.makedirs(logs_dir)
+        self.logs_dir = logs_dir
             
         # 日志文件路径
         log_file = os.path.join(logs_dir, f'chat_app_{datetime.now().strftime("%Y%m%d")}.log')
@@ -40,6 +45,7 @@ class LoggerManager:
         # 创建控制台处理器
         console_handler = logging.StreamHandler()
         console_handler.setLevel(logging.INFO)
+        self.console_handler = console_handler
         
         # 设置日志格式
         formatter = logging.Formatter(
@@ -56,6 +62,17 @@ class LoggerManager:
     def get_logger():
         """获取logger实例"""
         return LoggerManager().logger
+    
+    @staticmethod
+    def get_logs_dir():
+        """获取日志目录（诊断文件也写在这里）"""
+        return LoggerManager().logs_dir
+    
+    @staticmethod
+    def set_console_enabled(enabled):
+        """开关控制台日志输出（终端界面运行时关闭，避免打乱屏幕），文件日志不受影响"""
+        handler = LoggerManager().console_handler
+        handler.setLevel(logging.INFO if enabled else logging.CRITICAL + 1)
 
 # 使用示例:
 # from logger_manager import LoggerManager
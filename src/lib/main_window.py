@@ -1,22 +1,28 @@
 import wx
 import wx.adv
-from .rest_screen import RestScreen
 from .taskbar import TaskBarIcon
 from .app_core import EyeRestCore
 from .app_states import AppState
 from .statistics_chart import StatisticsChart
 from .hourly_chart import HourlyChart
+from .config import VALUE_RANGES
 from .process_checker import remove_lock_file
+from .ui_dispatcher import UiDispatcher
+from .tracing import tracer
 
 class MainFrame(wx.Frame):
     def __init__(self):
         super().__init__(None, title="护眼助手", size=(400, 550))
         
+        # 核心、休息计时和统计线程的界面回调都经过合并器，每批只调用一次 wx.CallAfter
+        self.ui_dispatcher = UiDispatcher(wx.CallAfter)
+        
         # 创建核心业务逻辑
-        self.core = EyeRestCore()
+        self.core = EyeRestCore(dispatch=self.ui_dispatcher)
         
-        # 创建休息窗口时传入core
-        self.rest_screen = RestScreen(core=self.core)
+        # 休息窗口和设置/统计界面在第一次用到时才创建，静默启动只需要托盘图标
+        self._rest_screen = None
+        self.ui_built = False
         self.real_close = False
         
         # 创建系统托盘图标
@@ -28,44 +34,46 @@ class MainFrame(wx.Frame):
         self.core.on_work_complete = self.on_work_complete
         self.core.on_temp_pause = self.on_temp_pause
         self.core.on_temp_resume = self.on_temp_resume
+        self.core.on_show_window = self.show_and_raise
+        self.core.on_config_change = self.on_config_change
+        # 状态文字每秒刷新，积压时只需要最新的一次
+        self.ui_dispatcher.latest_only(self.on_status_change)
+        self.ui_dispatcher.latest_only(self.update_statistics_display)
         
-        self._init_ui()
+        # 看门狗同时监测wx主循环（模态对话框、阻塞的join等）
+        self.core.watchdog.watch('gui', wx.CallAfter)
         
-        # 初始化统计显示
-        self.update_statistics_display()
+        # 订阅统计视图模型，统计数据变化后由后台线程构建好再投递过来
+        self.core.statistics_view.subscribe(self.update_statistics_display)
         
         # 绑定关闭事件
         self.Bind(wx.EVT_CLOSE, self.on_close)
-        
-        # 居中显示
+
+    @property
+    def rest_screen(self):
+        """休息窗口，第一次休息时创建"""
+        if self._rest_screen is None:
+            # 休息窗口依赖pywin32（win32com导入较慢），不在启动时导入
+            from .rest_screen import RestScreen
+            self._rest_screen = RestScreen(core=self.core, ui_dispatcher=self.ui_dispatcher)
+        return self._rest_screen
+
+    def ensure_ui(self):
+        """第一次打开主窗口时创建设置和统计界面"""
+        if self.ui_built:
+            return
+        self.ui_built = True
+        self._init_ui()
         self.Center()
+        self.status.SetLabel(self.core._get_status_text())
+        # 显示最近一次构建好的统计数据
+        self.update_statistics_display()
 
     def start_silent_mode(self):
         """静默模式启动 - 不显示窗口，直接使用配置文件启动工作会话"""
         if not self.core.is_running:
-            # 使用配置文件中的设置启动工作会话
-            work_time = self.core.config.work_time
-            rest_time = self.core.config.rest_time
-            play_sound = self.core.config.play_sound_after_rest
-            allow_password = self.core.config.allow_password_skip
-            idle_detection_enabled = self.core.config.idle_detection_enabled
-            idle_threshold_minutes = self.core.config.idle_threshold_minutes
-            
-            # 获取临时暂停配置
-            temp_pause_enabled = self.temp_pause_checkbox.GetValue()
-            temp_pause_duration = self.temp_pause_duration_spin.GetValue()
-            
-            # 获取工作结束提醒配置
-            work_end_reminder_enabled = self.work_end_reminder_checkbox.GetValue()
-            
-            self.core.start_work_session(
-                work_time, rest_time, play_sound, allow_password,
-                idle_detection_enabled=idle_detection_enabled,
-                idle_threshold_minutes=idle_threshold_minutes,
-                temp_pause_enabled=temp_pause_enabled,
-                temp_pause_duration=temp_pause_duration,
-                work_end_reminder_enabled=work_end_reminder_enabled
-            )
+            # 使用配置文件中的设置启动工作会话，不需要创建设置界面
+            self.core.start_work_session_from_config()
             
             # 显示托盘通知
             wx.adv.NotificationMessage(
@@ -81,14 +89,46 @@ class MainFrame(wx.Frame):
         else:
             self.toggle_btn.SetLabel("开始")
 
+    def refresh_settings(self):
+        """用当前配置刷新设置界面（配置可能已通过控制通道修改）"""
+        if not self.ui_built:
+            return  # 界面创建时直接读取配置
+        config = self.core.config
+        self.work_spin.SetValue(config.work_time)
+        self.rest_spin.SetValue(config.rest_time)
+        self.hotkey_text.SetValue(config.hotkey)
+        self.idle_detection_checkbox.SetValue(config.idle_detection_enabled)
+        self.idle_threshold_spin.SetValue(config.idle_threshold_minutes)
+        self.sound_checkbox.SetValue(config.play_sound_after_rest)
+        self.password_checkbox.SetValue(config.allow_password_skip)
+        self.temp_pause_checkbox.SetValue(config.temp_pause_enabled)
+        self.temp_pause_duration_spin.SetValue(config.temp_pause_duration)
+        self.temp_pause_hotkey_text.SetValue(config.temp_pause_hotkey)
+        self.work_end_reminder_checkbox.SetValue(config.work_end_reminder_enabled)
+        self.adaptive_schedule_checkbox.SetValue(config.adaptive_schedule_enabled)
+
+    def on_config_change(self, changes):
+        """配置被修改回调 - 刷新设置界面，避免下次开始时用旧值覆盖"""
+        self.refresh_settings()
+
     def Show(self, show=True):
         """重写Show方法，在显示窗口时同步UI状态"""
+        if show:
+            self.ensure_ui()
         result = super().Show(show)
         if show:
             # 同步UI状态
             self.sync_ui_state()
+            self.refresh_settings()
         return result
 
+    def show_and_raise(self):
+        """显示窗口并置于前台（再次启动程序时由控制通道调用）"""
+        if self.IsIconized():
+            self.Iconize(False)
+        self.Show()
+        self.Raise()
+
     def _init_ui(self):
         """初始化UI界面"""
         panel = wx.Panel(self)
@@ -120,13 +160,15 @@ class MainFrame(wx.Frame):
         vbox = wx.BoxSizer(wx.VERTICAL)
         
         # 添加配置控件
-        grid = wx.FlexGridSizer(11, 2, 5, 5)
+        grid = wx.FlexGridSizer(12, 2, 5, 5)
         grid.Add(wx.StaticText(panel, label="工作时间(分钟):"))
-        self.work_spin = wx.SpinCtrl(panel, value=str(self.core.config.work_time))
+        self.work_spin = wx.SpinCtrl(panel, value=str(self.core.config.work_time),
+                                     min=VALUE_RANGES["work_time"][0], max=VALUE_RANGES["work_time"][1])
         grid.Add(self.work_spin)
         
         grid.Add(wx.StaticText(panel, label="休息时间(分钟):"))
-        self.rest_spin = wx.SpinCtrl(panel, value=str(self.core.config.rest_time))
+        self.rest_spin = wx.SpinCtrl(panel, value=str(self.core.config.rest_time),
+                                     min=VALUE_RANGES["rest_time"][0], max=VALUE_RANGES["rest_time"][1])
         grid.Add(self.rest_spin)
         
         # 添加快捷键配置
@@ -146,7 +188,9 @@ class MainFrame(wx.Frame):
         grid.Add(self.idle_detection_checkbox)
         
         grid.Add(wx.StaticText(panel, label="离开检测时间(分钟):"))
-        self.idle_threshold_spin = wx.SpinCtrl(panel, value=str(self.core.config.idle_threshold_minutes), min=1, max=30)
+        self.idle_threshold_spin = wx.SpinCtrl(panel, value=str(self.core.config.idle_threshold_minutes),
+                                               min=VALUE_RANGES["idle_threshold_minutes"][0],
+                                               max=VALUE_RANGES["idle_threshold_minutes"][1])
         grid.Add(self.idle_threshold_spin)
 
         # 添加声音和密码选项
@@ -167,7 +211,9 @@ class MainFrame(wx.Frame):
         grid.Add(self.temp_pause_checkbox)
         
         grid.Add(wx.StaticText(panel, label="临时暂停时长(秒):"))
-        self.temp_pause_duration_spin = wx.SpinCtrl(panel, value=str(self.core.config.temp_pause_duration), min=5, max=300)
+        self.temp_pause_duration_spin = wx.SpinCtrl(panel, value=str(self.core.config.temp_pause_duration),
+                                                   min=VALUE_RANGES["temp_pause_duration"][0],
+                                                   max=VALUE_RANGES["temp_pause_duration"][1])
         grid.Add(self.temp_pause_duration_spin)
         
         grid.Add(wx.StaticText(panel, label="临时暂停快捷键:"))
@@ -185,6 +231,12 @@ class MainFrame(wx.Frame):
         self.work_end_reminder_checkbox.SetValue(self.core.config.work_end_reminder_enabled)
         grid.Add(self.work_end_reminder_checkbox)
         
+        # 添加自适应调度配置
+        grid.Add(wx.StaticText(panel, label="按疲劳度调整工作/休息:"))
+        self.adaptive_schedule_checkbox = wx.CheckBox(panel)
+        self.adaptive_schedule_checkbox.SetValue(self.core.config.adaptive_schedule_enabled)
+        grid.Add(self.adaptive_schedule_checkbox)
+        
         # 布局
         vbox.Add(grid, 0, wx.ALL|wx.CENTER, 10)
         
@@ -249,6 +301,18 @@ class MainFrame(wx.Frame):
         average_box.Add(self.average_count_label, 0, wx.CENTER)
         stats_grid.Add(average_box, 0, wx.ALL|wx.CENTER, 5)
         
+        # 活动强度：当前疲劳度和今日活跃时长
+        activity_box = wx.BoxSizer(wx.HORIZONTAL)
+        activity_box.Add(wx.StaticText(panel, label="当前疲劳度:"), 0, wx.RIGHT, 5)
+        self.fatigue_label = wx.StaticText(panel, label="-")
+        activity_box.Add(self.fatigue_label, 0, wx.RIGHT, 20)
+        activity_box.Add(wx.StaticText(panel, label="今日活跃:"), 0, wx.RIGHT, 5)
+        self.active_time_label = wx.StaticText(panel, label="-")
+        activity_box.Add(self.active_time_label, 0, wx.RIGHT, 20)
+        activity_box.Add(wx.StaticText(panel, label="自然休息:"), 0, wx.RIGHT, 5)
+        self.natural_count_label = wx.StaticText(panel, label="0次")
+        activity_box.Add(self.natural_count_label, 0)
+        
         # 图表区域
         self.statistics_chart = StatisticsChart(panel)
         self.statistics_chart.SetMinSize((300, 150))
@@ -259,6 +323,7 @@ class MainFrame(wx.Frame):
         
         # 布局
         vbox.Add(stats_grid, 0, wx.ALL|wx.CENTER, 10)
+        vbox.Add(activity_box, 0, wx.ALL|wx.CENTER, 5)
         vbox.Add(self.statistics_chart, 1, wx.ALL|wx.EXPAND, 10)
         vbox.Add(self.reset_stats_btn, 0, wx.ALL|wx.CENTER, 5)
         
@@ -267,12 +332,11 @@ class MainFrame(wx.Frame):
 
     def on_status_change(self, status):
         """状态变化回调 - 更新UI显示"""
-        self.status.SetLabel(status)
-        # 更新托盘图标状态
-        if hasattr(self.core, 'current_state'):
-            self.taskbar_icon.update_icon_by_state(self.core.current_state)
-        # 更新统计显示（可能有新的完成记录）
-        self.update_statistics_display()
+        if self.ui_built:
+            self.status.SetLabel(status)
+        # 更新托盘图标状态（只有进度环帧或提示文字变化时才会重设图标）
+        self.taskbar_icon.update_status(
+            self.core.current_state, self.core.get_remaining_time(), self.core.work_duration)
 
     def on_start_rest(self, rest_minutes):
         """开始休息回调 - 显示休息界面"""
@@ -288,6 +352,7 @@ class MainFrame(wx.Frame):
         if action == "add_time":
             # 增加休息时间
             self.rest_screen.add_rest_time()
+            tracer.finish(tracer.current(), "rest_time_added")
 
     def on_temp_pause(self):
         """临时暂停回调 - 隐藏休息屏幕"""
@@ -302,62 +367,56 @@ class MainFrame(wx.Frame):
         success = self.core.force_rest()
         if not success:
             # 如果程序未运行，自动启动
-            work_time = self.work_spin.GetValue()
-            rest_time = self.rest_spin.GetValue()
-            play_sound = self.sound_checkbox.GetValue()
-            allow_password = self.password_checkbox.GetValue()
-            idle_detection_enabled = self.idle_detection_checkbox.GetValue()
-            idle_threshold_minutes = self.idle_threshold_spin.GetValue()
-            
-            # 获取工作结束提醒配置
-            work_end_reminder_enabled = self.work_end_reminder_checkbox.GetValue()
-            
-            self.core.start_work_session(
-                work_time, rest_time, play_sound, allow_password,
-                idle_detection_enabled=idle_detection_enabled,
-                idle_threshold_minutes=idle_threshold_minutes,
-                temp_pause_enabled=self.core.config.temp_pause_enabled,
-                temp_pause_duration=self.core.config.temp_pause_duration,
-                work_end_reminder_enabled=work_end_reminder_enabled
-            )
-            self.toggle_btn.SetLabel("停止")
+            self._start_work_session()
             self.Hide()
             
             # 再次尝试强制休息
             self.core.force_rest()
             
+    def _start_work_session(self):
+        """开始工作会话：设置界面已创建时使用界面上的值，否则直接使用配置"""
+        if not self.ui_built:
+            self.core.start_work_session_from_config()
+            return
+        work_time = self.work_spin.GetValue()
+        rest_time = self.rest_spin.GetValue()
+        play_sound = self.sound_checkbox.GetValue()
+        allow_password = self.password_checkbox.GetValue()
+        idle_detection_enabled = self.idle_detection_checkbox.GetValue()
+        idle_threshold_minutes = self.idle_threshold_spin.GetValue()
+        
+        # 获取临时暂停配置
+        temp_pause_enabled = self.temp_pause_checkbox.GetValue()
+        temp_pause_duration = self.temp_pause_duration_spin.GetValue()
+        
+        # 获取工作结束提醒配置
+        work_end_reminder_enabled = self.work_end_reminder_checkbox.GetValue()
+        adaptive_schedule_enabled = self.adaptive_schedule_checkbox.GetValue()
+        
+        self.core.start_work_session(
+            work_time, rest_time, play_sound, allow_password,
+            idle_detection_enabled=idle_detection_enabled,
+            idle_threshold_minutes=idle_threshold_minutes,
+            temp_pause_enabled=temp_pause_enabled,
+            temp_pause_duration=temp_pause_duration,
+            work_end_reminder_enabled=work_end_reminder_enabled,
+            adaptive_schedule_enabled=adaptive_schedule_enabled
+        )
+        self.toggle_btn.SetLabel("停止")
+
     def on_toggle(self, event):
         """处理开始/停止按钮"""
         if not self.core.is_running:
             # 开始工作会话
-            work_time = self.work_spin.GetValue()
-            rest_time = self.rest_spin.GetValue()
-            play_sound = self.sound_checkbox.GetValue()
-            allow_password = self.password_checkbox.GetValue()
-            idle_detection_enabled = self.idle_detection_checkbox.GetValue()
-            idle_threshold_minutes = self.idle_threshold_spin.GetValue()
-            
-            # 获取临时暂停配置
-            temp_pause_enabled = self.temp_pause_checkbox.GetValue()
-            temp_pause_duration = self.temp_pause_duration_spin.GetValue()
-            
-            # 获取工作结束提醒配置
-            work_end_reminder_enabled = self.work_end_reminder_checkbox.GetValue()
-            
-            self.core.start_work_session(
-                work_time, rest_time, play_sound, allow_password,
-                idle_detection_enabled=idle_detection_enabled,
-                idle_threshold_minutes=idle_threshold_minutes,
-                temp_pause_enabled=temp_pause_enabled,
-                temp_pause_duration=temp_pause_duration,
-                work_end_reminder_enabled=work_end_reminder_enabled
-            )
-            self.toggle_btn.SetLabel("停止")
+            self._start_work_session()
             self.Hide()  # 隐藏主窗口
         else:
             # 停止工作会话
             self.core.stop_work_session()
-            self.toggle_btn.SetLabel("开始")
+            if self.ui_built:
+                self.toggle_btn.SetLabel("开始")
+            if self._rest_screen is None:
+                return  # 还没有休息过，没有休息界面需要处理
             # 只有在休息状态时才调用stop_rest，避免错误的回调
             if self.core.current_state == AppState.RESTING:
                 self.rest_screen.stop_rest(cancelled=True)
@@ -382,17 +441,9 @@ class MainFrame(wx.Frame):
         new_hotkey = self.temp_pause_hotkey_text.GetValue().strip()
         if new_hotkey:
             try:
-                # 收集所有需要重新注册的热键
-                hotkeys_to_register = [
-                    (self.core.config.hotkey, self.core.force_rest)
-                ]
-                
-                # 添加新的临时暂停热键
-                if self.core.config.temp_pause_enabled:
-                    hotkeys_to_register.append((new_hotkey, self.core.temp_pause))
-                
-                # 批量重新注册热键
-                self.core._batch_register_hotkeys(hotkeys_to_register)
+                # 只替换有变化的热键，不重启监听
+                self.core.hotkey_manager.set_bindings(
+                    self.core.hotkey_bindings(temp_pause_hotkey=new_hotkey))
                 
                 # 保存配置
                 self.core.config.temp_pause_hotkey = new_hotkey
@@ -418,7 +469,8 @@ class MainFrame(wx.Frame):
         if self.real_close:  # 如果是真正的关闭操作
             self.core.cleanup()  # 清理核心逻辑资源
             self.taskbar_icon.Destroy()
-            self.rest_screen.Destroy()
+            if self._rest_screen is not None:
+                self._rest_screen.Destroy()
             # 删除锁文件
             remove_lock_file()
             event.Skip()
@@ -429,22 +481,31 @@ class MainFrame(wx.Frame):
                 "程序已最小化到系统托盘，双击图标可以重新打开主窗口",
                 parent=None).Show()
     
-    def update_statistics_display(self):
-        """更新统计显示"""
+    def update_statistics_display(self, view_model=None):
+        """更新统计显示
+        Args:
+            view_model: 后台构建好的StatisticsViewModel，为None时使用最近一次的结果
+        """
+        view_model = view_model or self.core.get_statistics_view_model()
+        if view_model is None:
+            return
+        # 休息窗口的小时统计图同样由订阅刷新（静默模式下主窗口界面可能尚未创建）
+        if self._rest_screen is not None:
+            self._rest_screen.update_hourly_chart(view_model.hourly_records)
+        if not self.ui_built:
+            return  # 界面尚未创建，打开时会使用最近一次的视图模型
         try:
-            stats = self.core.get_statistics_manager()
-            self.today_count_label.SetLabel(f"{stats.get_today_count()}次")
-            self.week_count_label.SetLabel(f"{stats.get_week_count()}次")
-            self.total_count_label.SetLabel(f"{stats.get_total_count()}次")
-            self.average_count_label.SetLabel(f"{stats.get_average_daily_count()}次")
-            
-            # 更新图表数据
-            daily_records = stats.get_daily_records(7)  # 获取最近7天数据
-            self.statistics_chart.set_data(daily_records)
+            self.today_count_label.SetLabel(view_model.today_label)
+            self.week_count_label.SetLabel(view_model.week_label)
+            self.total_count_label.SetLabel(view_model.total_label)
+            self.average_count_label.SetLabel(view_model.average_label)
+            self.fatigue_label.SetLabel(view_model.fatigue_label)
+            self.active_time_label.SetLabel(view_model.active_label)
+            self.natural_count_label.SetLabel(view_model.natural_label)
             
-            # 更新小时图表数据
-            hourly_records = stats.get_today_hourly_records()
-            self.hourly_chart.set_data(hourly_records)
+            # 更新图表数据（最近7天和今日小时）
+            self.statistics_chart.set_data(view_model.daily_records)
+            self.hourly_chart.set_data(view_model.hourly_records)
         except Exception as e:
             self.core.logger.error(f"更新统计显示失败: {str(e)}")
     
@@ -454,8 +515,8 @@ class MainFrame(wx.Frame):
                               "确认重置", wx.YES_NO | wx.NO_DEFAULT | wx.ICON_QUESTION)
         if dlg.ShowModal() == wx.ID_YES:
             try:
-                self.core.get_statistics_manager().reset_statistics()
-                self.update_statistics_display()
+                # 重置后视图模型会在后台重新构建并自动刷新显示
+                self.core.reset_statistics()
                 wx.MessageBox("统计数据已成功重置", "提示", wx.OK | wx.ICON_INFORMATION)
             except Exception as e:
                 wx.MessageBox(f"重置统计数据失败: {str(e)}", "错误", wx.OK | wx.ICON_ERROR)
@@ -0,0 +1,53 @@
+import math
+import threading
+from collections import deque
+
+
+class LatencyStats:
+    """延迟统计：累计次数、平均值、最大值，以及最近若干个样本的分位数"""
+
+    def __init__(self, window=1024):
+        """初始化延迟统计
+        Args:
+            window: 计算分位数时保留的最近样本数
+        """
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        """记录一个样本（秒）"""
+        if seconds < 0:
+            seconds = 0.0  # 不同来源的时钟可能有微小偏差
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+            self._recent.append(seconds)
+
+    def percentile(self, fraction):
+        """最近样本的分位数（秒），没有样本时返回0"""
+        with self._lock:
+            samples = sorted(self._recent)
+        if not samples:
+            return 0.0
+        rank = max(1, math.ceil(len(samples) * fraction))
+        return samples[rank - 1]
+
+    def snapshot(self):
+        """当前统计结果（毫秒）
+        Returns:
+            dict: {"count", "mean_ms", "p50_ms", "p99_ms", "max_ms"}
+        """
+        with self._lock:
+            count, total, maximum = self.count, self.total, self.max
+        return {
+            "count": count,
+            "mean_ms": round(total / count * 1000, 3) if count else 0.0,
+            "p50_ms": round(self.percentile(0.5) * 1000, 3),
+            "p99_ms": round(self.percentile(0.99) * 1000, 3),
+            "max_ms": round(maximum * 1000, 3)
+        }
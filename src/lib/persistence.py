@@ -0,0 +1,142 @@
+import os
+import threading
+import time
+from .logger_manager import LoggerManager
+
+
+def atomic_write_text(path, text, encoding="utf-8"):
+    """原子写入文本文件：先写临时文件并刷盘，再替换目标文件"""
+    _atomic_write(path, text, "w", encoding)
+
+
+def atomic_write_bytes(path, data):
+    """原子写入二进制文件"""
+    _atomic_write(path, data, "wb", None)
+
+
+def _atomic_write(path, content, mode, encoding):
+    directory = os.path.dirname(os.path.abspath(path))
+    tmp_path = os.path.join(directory, f".{os.path.basename(path)}.tmp")
+    with open(tmp_path, mode, encoding=encoding) as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class PersistenceWorker:
+    """后台持久化线程（write-behind）
+
+    调用方只把对象标记为脏，由独立线程在合并窗口结束后统一写盘，
+    短时间内对同一对象的多次保存只会写一次。被管理的对象需要提供
+    persist() 方法执行实际的同步写入。
+
+    所有写入（包括 flush 超时后在调用线程中的兜底写入）串行执行，
+    同一对象不会同时写同一个临时文件。
+    """
+
+    def __init__(self, coalesce_window=0.5):
+        """初始化持久化线程
+        Args:
+            coalesce_window: 合并窗口（秒），窗口内的重复保存合并为一次写入
+        """
+        self.logger = LoggerManager.get_logger()
+        self.coalesce_window = coalesce_window
+
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()  # 串行化实际写入
+        self._dirty = {}        # {id(obj): obj}，保持标记顺序
+        self._writing = False   # 是否有写入正在进行
+        self._flush_requested = False
+        self._running = True
+
+        # 统计信息
+        self.save_requests = 0
+        self.writes = 0
+
+        self._thread = threading.Thread(target=self._run, name="PersistenceWorker")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def mark_dirty(self, obj):
+        """标记对象需要保存，立即返回"""
+        with self._cond:
+            running = self._running
+            if running:
+                self.save_requests += 1
+                self._dirty[id(obj)] = obj
+                self._cond.notify_all()
+        if not running:
+            # 线程已停止，直接同步写入
+            self._persist(obj)
+
+    def flush(self, timeout=5.0):
+        """立即写入所有待保存的对象，并等待写入完成
+        Returns:
+            bool: 是否在超时前全部写完
+        """
+        deadline = time.time() + timeout
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._dirty or self._writing:
+                remaining = deadline - time.time()
+                if remaining <= 0 or not self._thread.is_alive():
+                    break
+                self._cond.wait(remaining)
+            self._flush_requested = False
+            pending = list(self._dirty.values())
+            self._dirty.clear()
+
+        # 线程无法完成时在当前线程中兜底写入（等待线程中正在进行的写入结束后再写）
+        for obj in pending:
+            self._persist(obj)
+        return not pending
+
+    def stop(self, timeout=5.0):
+        """写入剩余数据并停止线程"""
+        self.flush(timeout)
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread.is_alive() and threading.current_thread() != self._thread:
+            self._thread.join(timeout=timeout)
+        self.logger.info(f"持久化线程已停止，保存请求 {self.save_requests} 次，实际写入 {self.writes} 次")
+
+    def _run(self):
+        """持久化线程主循环"""
+        while True:
+            with self._cond:
+                while self._running and not self._dirty:
+                    self._cond.wait()
+                if not self._running and not self._dirty:
+                    return
+
+                # 合并窗口：等待更多保存请求，flush时立即写入
+                deadline = time.time() + self.coalesce_window
+                while self._running and not self._flush_requested:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                batch = list(self._dirty.values())
+                self._dirty.clear()
+                self._writing = True
+
+            try:
+                for obj in batch:
+                    self._persist(obj)
+            finally:
+                with self._cond:
+                    self._writing = False
+                    self._cond.notify_all()
+
+    def _persist(self, obj):
+        """执行一次同步写入"""
+        with self._write_lock:
+            try:
+                obj.persist()
+                self.writes += 1
+            except Exception as e:
+                self.logger.error(f"后台保存失败 {type(obj).__name__}: {str(e)}")
@@ -2,133 +2,101 @@ import json
 import os
 import sys
 import time
-import psutil
-from pathlib import Path
 
-# 锁文件路径
-LOCK_FILE_PATH = os.path.join(os.path.expanduser("~"), ".eye_rest_lock.json")
+# 锁文件路径（文件本身只是加锁的对象，内容仅用于调试）
+LOCK_FILE_PATH = os.path.join(os.path.expanduser("~"), ".eye_rest.lock")
+
+# 持有实例锁的文件描述符，进程退出时由内核自动释放
+_lock_fd = None
+
+def _try_lock(fd):
+    """对文件加非阻塞的排他锁，失败时抛出OSError"""
+    if sys.platform == "win32":
+        import msvcrt
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+def _unlock(fd):
+    if sys.platform == "win32":
+        import msvcrt
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(fd, fcntl.LOCK_UN)
 
 def check_duplicate_process():
     """
-    使用文件锁定方式检测是否已有程序实例运行
+    尝试获取实例锁（Unix上为flock，Windows上为msvcrt文件锁）检测是否已有程序实例运行
+
+    锁由操作系统持有，进程无论如何退出都会自动释放，不会留下僵尸锁；
+    获取成功后当前进程一直持有锁，直到 remove_lock_file()。
     返回: True表示有重复进程，False表示无重复进程
     """
-    try:
-        if os.path.exists(LOCK_FILE_PATH):
-            # 读取锁文件内容
-            with open(LOCK_FILE_PATH, 'r', encoding='utf-8') as f:
-                lock_data = json.load(f)
-            
-            pid = lock_data.get('pid')
-            if pid:
-                # 检查进程是否仍在运行
-                if is_process_running(pid):
-                    # 进一步验证是否是同一个程序
-                    if is_same_program(pid):
-                        print(f"检测到重复进程，PID: {pid}")
-                        return True
-                    else:
-                        print(f"PID {pid} 存在但不是同一个程序，清理锁文件")
-                        _remove_lock_file()
-                else:
-                    print(f"锁文件中的进程 {pid} 已不存在，清理僵尸锁文件")
-                    _remove_lock_file()
-        
+    global _lock_fd
+    if _lock_fd is not None:
         return False
-        
-    except Exception as e:
-        print(f"检测重复进程时出现异常: {e}")
-        # 出现异常时清理可能损坏的锁文件
-        _remove_lock_file()
+    try:
+        fd = os.open(LOCK_FILE_PATH, os.O_RDWR | os.O_CREAT, 0o600)
+    except OSError as e:
+        print(f"打开锁文件失败: {e}")
         return False
 
+    try:
+        _try_lock(fd)
+    except OSError:
+        os.close(fd)
+        return True
+
+    _lock_fd = fd
+    return False
+
 def create_lock_file():
     """
-    创建锁文件，记录当前进程信息
+    确保持有实例锁，并在锁文件中记录当前进程信息（仅用于调试）
     """
+    if _lock_fd is None and check_duplicate_process():
+        print("实例锁已被其他进程持有")
+        return False
     try:
-        current_pid = os.getpid()
-        current_time = time.strftime("%Y-%m-%d %H:%M:%S")
-        exe_path = sys.executable if hasattr(sys, 'executable') else ""
-        
         lock_data = {
-            "pid": current_pid,
-            "start_time": current_time,
-            "exe_path": exe_path,
+            "pid": os.getpid(),
+            "start_time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "exe_path": sys.executable if hasattr(sys, 'executable') else "",
             "program_name": "eye_rest"
         }
-        
-        # 确保目录存在
-        os.makedirs(os.path.dirname(LOCK_FILE_PATH), exist_ok=True)
-        
-        with open(LOCK_FILE_PATH, 'w', encoding='utf-8') as f:
-            json.dump(lock_data, f, ensure_ascii=False, indent=2)
-        
-        print(f"创建锁文件成功，PID: {current_pid}")
+        # Windows的锁占用第一个字节，进程信息写在其后
+        offset = 1 if sys.platform == "win32" else 0
+        os.ftruncate(_lock_fd, offset)
+        os.lseek(_lock_fd, offset, os.SEEK_SET)
+        os.write(_lock_fd, json.dumps(lock_data, ensure_ascii=False).encode("utf-8"))
         return True
-        
-    except Exception as e:
-        print(f"创建锁文件失败: {e}")
-        return False
+    except OSError as e:
+        print(f"写入锁文件失败: {e}")
+        return True  # 锁已持有，只是没有写入调试信息
 
 def remove_lock_file():
     """
-    删除锁文件（程序退出时调用）
-    """
-    return _remove_lock_file()
+    释放实例锁（程序退出时调用）
 
-def _remove_lock_file():
-    """
-    内部方法：删除锁文件
+    锁文件本身保留：删除被锁定的文件会让下一个实例锁到另一个文件上。
     """
-    try:
-        if os.path.exists(LOCK_FILE_PATH):
-            os.remove(LOCK_FILE_PATH)
-            print("删除锁文件成功")
-            return True
+    global _lock_fd
+    if _lock_fd is None:
         return True
-    except Exception as e:
-        print(f"删除锁文件失败: {e}")
-        return False
-
-def is_process_running(pid):
-    """
-    检查指定PID的进程是否正在运行
-    """
     try:
-        return psutil.pid_exists(pid)
-    except Exception:
-        # 如果psutil不可用，使用系统特定的方法
-        try:
-            if sys.platform == "win32":
-                import subprocess
-                result = subprocess.run(
-                    ['tasklist', '/FI', f'PID eq {pid}'],
-                    capture_output=True,
-                    text=True,
-                    creationflags=subprocess.CREATE_NO_WINDOW
-                )
-                return str(pid) in result.stdout
-            else:
-                # Linux/Mac
-                os.kill(pid, 0)
-                return True
-        except (OSError, subprocess.SubprocessError):
-            return False
-
-def is_same_program(pid):
-    """
-    检查指定PID的进程是否是同一个程序
-    """
+        _unlock(_lock_fd)
+    except OSError:
+        pass
     try:
-        process = psutil.Process(pid)
-        process_name = process.name().lower()
-        
-        # 检查进程名是否包含eye相关关键词
-        return any(keyword in process_name for keyword in ['eye', 'python', 'pythonw'])
-    except Exception:
-        # 如果无法获取进程信息，保守地认为是同一个程序
-        return True
+        os.close(_lock_fd)
+    except OSError:
+        pass
+    _lock_fd = None
+    return True
 
 def get_lock_info():
     """
@@ -136,9 +104,10 @@ def get_lock_info():
     """
     try:
         if os.path.exists(LOCK_FILE_PATH):
-            with open(LOCK_FILE_PATH, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with open(LOCK_FILE_PATH, 'rb') as f:
+                content = f.read().lstrip(b"\0 ")
+            return json.loads(content) if content else None
         return None
     except Exception as e:
         print(f"读取锁文件信息失败: {e}")
-        return None 
\ No newline at end of file
+        return None
@@ -0,0 +1,129 @@
+"""运行时性能采集
+
+在运行中的实例上采集一段时间的性能数据，不需要重启:
+    - cProfile：记录核心事件循环线程中所有函数的调用次数和耗时，保存为 pstats 文件
+      （python -m pstats logs/profile_xxx.pstats 或 snakeviz 查看）
+    - 采样：每隔几毫秒读取所有线程的调用栈（sys._current_frames），保存为折叠栈文件
+      （每行 "线程;外层函数;...;内层函数 次数"，可以直接交给 flamegraph.pl 或 speedscope）
+"""
+import cProfile
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from .logger_manager import LoggerManager
+
+DEFAULT_SECONDS = 10
+MAX_SECONDS = 300
+SAMPLE_INTERVAL = 0.005     # 采样间隔（秒）
+
+
+class ProfilerCapture:
+    """一次只进行一个采集；start() 和 stop() 必须在同一线程中调用（cProfile按线程记录）"""
+
+    def __init__(self, output_dir=None, sample_interval=SAMPLE_INTERVAL):
+        """初始化
+        Args:
+            output_dir: 结果文件目录，None时使用日志目录
+            sample_interval: 采样间隔（秒）
+        """
+        self.logger = LoggerManager.get_logger()
+        self.output_dir = output_dir or LoggerManager.get_logs_dir()
+        self.sample_interval = sample_interval
+        self.running = False
+        self.last_result = None
+        self._profile = None
+        self._sampler = None
+        self._stop_event = threading.Event()
+        self._stacks = Counter()
+        self._samples = 0
+        self._started_at = 0
+        self._labels = {}  # code对象 -> 折叠栈中的函数名
+
+    def start(self, seconds, on_timeout=None):
+        """开始采集
+        Args:
+            seconds: 采集时长（秒）
+            on_timeout: 时长到达时在采样线程中调用，应安排在本线程中调用 stop()
+        Returns:
+            bool: 是否开始（已在采集时返回False）
+        """
+        if self.running:
+            return False
+        self.running = True
+        self._stacks = Counter()
+        self._samples = 0
+        self._started_at = time.time()
+        self._stop_event.clear()
+        self._sampler = threading.Thread(target=self._sample, args=(seconds, on_timeout), name="ProfilerSampler")
+        self._sampler.daemon = True
+        self._sampler.start()
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+        self.logger.info(f"开始性能采集: {seconds}秒")
+        return True
+
+    def stop(self):
+        """结束采集并写入结果文件
+        Returns:
+            dict: {"pstats": 路径, "collapsed": 路径, "seconds": 实际时长, "samples": 采样次数}，
+                  没有在采集时为None
+        """
+        if not self.running:
+            return None
+        self._profile.disable()
+        self._stop_event.set()
+        if self._sampler is not threading.current_thread():
+            self._sampler.join(timeout=2)
+        self.running = False
+
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        pstats_path = os.path.join(self.output_dir, f"profile_{stamp}.pstats")
+        collapsed_path = os.path.join(self.output_dir, f"profile_{stamp}.collapsed")
+        self._profile.dump_stats(pstats_path)
+        with open(collapsed_path, "w", encoding="utf-8") as f:
+            for stack, count in self._stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        self._profile = None
+
+        self.last_result = {
+            "pstats": pstats_path,
+            "collapsed": collapsed_path,
+            "seconds": round(time.time() - self._started_at, 2),
+            "samples": self._samples,
+        }
+        self.logger.info(f"性能采集完成: {self.last_result}")
+        return self.last_result
+
+    def _sample(self, seconds, on_timeout):
+        """采样线程：记录除自己以外所有线程的调用栈"""
+        own = threading.get_ident()
+        deadline = time.monotonic() + seconds
+        names = {}
+        while not self._stop_event.wait(self.sample_interval):
+            if time.monotonic() >= deadline:
+                if on_timeout:
+                    on_timeout()
+                return
+            frames = sys._current_frames()
+            if any(ident not in names for ident in frames):
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in frames.items():
+                if ident != own:
+                    self._stacks[self._collapse(names.get(ident, str(ident)), frame)] += 1
+            self._samples += 1
+
+    def _collapse(self, thread_name, frame):
+        """把调用栈转成 "线程;外层;...;内层" """
+        labels = []
+        while frame is not None:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                label = self._labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            labels.append(label)
+            frame = frame.f_back
+        labels.append(thread_name)
+        return ";".join(reversed(labels))
@@ -0,0 +1,100 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """令牌桶：平均每秒最多 rate 次，允许 burst 次的突发"""
+
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = float(burst)
+        self.updated = clock()
+
+    def take(self, now=None):
+        """取一个令牌
+        Returns:
+            bool: 是否取到
+        """
+        now = self.clock() if now is None else now
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+
+class ActionRateLimiter:
+    """按动作限制输入事件进入核心事件队列的频率
+
+    每个动作依次经过三道检查:
+        1. 合并：同一动作已有事件在队列中尚未处理时，新的触发并入该事件
+        2. 重复抑制：距离上一次放行不足 repeat_interval 秒的触发直接丢弃
+        3. 令牌桶：超过平均频率的触发丢弃
+    按住或连续敲击热键时，队列中同一动作最多只有一个事件，
+    代价不随按键重复频率增长。核心线程开始处理事件时调用 done()。
+    """
+
+    def __init__(self, rate=2.0, burst=4, repeat_interval=0.2, clock=time.monotonic):
+        """初始化限流器
+        Args:
+            rate: 每个动作每秒平均放行次数
+            burst: 每个动作允许的突发次数
+            repeat_interval: 重复抑制间隔（秒）
+            clock: 单调时钟，测试时可替换
+        """
+        self.rate = rate
+        self.burst = burst
+        self.repeat_interval = repeat_interval
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._last_accepted = {}
+        self._pending = set()
+        self._counters = {}  # {action: {"accepted": n, "dropped": n, "merged": n}}
+
+    def _count(self, action, key):
+        counters = self._counters.get(action)
+        if counters is None:
+            counters = self._counters[action] = {"accepted": 0, "dropped": 0, "merged": 0}
+        counters[key] += 1
+
+    def allow(self, action):
+        """判断这次触发是否应当放入事件队列
+        Returns:
+            bool: True表示放行（调用方负责入队），False表示已合并或丢弃
+        """
+        now = self.clock()
+        with self._lock:
+            if action in self._pending:
+                self._count(action, "merged")
+                return False
+            last = self._last_accepted.get(action)
+            if last is not None and now - last < self.repeat_interval:
+                self._count(action, "dropped")
+                return False
+            bucket = self._buckets.get(action)
+            if bucket is None:
+                bucket = self._buckets[action] = TokenBucket(self.rate, self.burst, self.clock)
+            if not bucket.take(now):
+                self._count(action, "dropped")
+                return False
+            self._last_accepted[action] = now
+            self._pending.add(action)
+            self._count(action, "accepted")
+            return True
+
+    def done(self, action):
+        """该动作的事件已被取出处理，之后的触发可以再次入队"""
+        with self._lock:
+            self._pending.discard(action)
+
+    def get_stats(self):
+        """各动作的放行、丢弃和合并次数
+        Returns:
+            dict: {action: {"accepted": n, "dropped": n, "merged": n}}
+        """
+        with self._lock:
+            return {action: dict(counters) for action, counters in self._counters.items()}
@@ -1,14 +1,27 @@
 import time
-import winsound
 import threading
+try:
+    import winsound
+except ImportError:  # 非Windows平台没有winsound
+    winsound = None
 from .logger_manager import LoggerManager
 
+
+def _call_now(func, *args):
+    func(*args)
+
 class RestManager:
     """休息管理器，处理休息相关的业务逻辑"""
     
-    def __init__(self):
-        """初始化休息管理器"""
+    def __init__(self, dispatch=None, tick_seconds=1):
+        """初始化休息管理器
+        Args:
+            dispatch: 计时结束时用来调用完成回调的函数（如 wx.CallAfter），None时在计时线程中直接调用
+            tick_seconds: 倒计时每减一秒实际等待的时间（秒），长时间压测时缩短以加速
+        """
         self.logger = LoggerManager.get_logger()
+        self.dispatch = dispatch or _call_now
+        self.tick_seconds = tick_seconds
         
         # 状态管理
         self.is_resting = False
@@ -40,7 +53,7 @@ class RestManager:
             on_update_display: 更新显示的回调函数
         """
         self.config = config
-        self.rest_seconds = minutes * 60
+        self.rest_seconds = int(round(minutes * 60))  # 自适应调度时分钟数可能带小数
         self.remaining_seconds = self.rest_seconds
         self.on_complete = on_complete
         self.on_cancel = on_cancel
@@ -95,6 +108,21 @@ class RestManager:
         
         return True, "已增加1分钟休息时间"
     
+    def pause(self):
+        """暂停计时（临时暂停），剩余时间保留"""
+        self.timer_running = False
+        # 等待计时器线程结束
+        if self.timer_thread and self.timer_thread.is_alive() and threading.current_thread() != self.timer_thread:
+            self.timer_thread.join(timeout=1)
+    
+    def resume(self):
+        """从暂停处继续计时"""
+        if not self.is_resting or self.timer_running:
+            return
+        self._start_timer()
+        # 立即更新一次显示
+        self._update_display()
+    
     def check_password(self, password):
         """验证密码
         Args:
@@ -170,16 +198,15 @@ class RestManager:
                 
                 self.remaining_seconds -= 1
                 self._update_display()
-                time.sleep(1)
+                time.sleep(self.tick_seconds)
             else:
                 # 时间到，结束休息 - 不直接调用stop_rest避免join当前线程
                 self.is_resting = False
                 self.timer_running = False
                 
-                # 使用wx.CallAfter在主线程中执行完成回调
+                # 通过dispatch在界面线程中执行完成回调
                 if self.on_complete:
-                    import wx
-                    wx.CallAfter(self._finish_rest_from_timer)
+                    self.dispatch(self._finish_rest_from_timer)
                 break
     
     def _finish_rest_from_timer(self):
@@ -195,6 +222,8 @@ class RestManager:
     
     def _play_end_sound(self):
         """播放结束音效"""
+        if winsound is None:
+            return
         try:
             def play_sound():
                 # 播放do-re-mi音阶
@@ -5,8 +5,8 @@ import win32api
 import win32com.client
 from .rest_manager import RestManager
 from .hourly_chart import DarkHourlyChart
-from .statistics_manager import StatisticsManager
-import threading
+from .ui_dispatcher import UiDispatcher
+from .tracing import tracer
 
 class PasswordDialog(wx.Dialog):
     """密码输入对话框"""
@@ -80,13 +80,19 @@ class PasswordDialog(wx.Dialog):
 class RestScreen(wx.Frame):
     """休息界面，只负责UI显示"""
     
-    def __init__(self, core=None):
-        """初始化休息界面"""
+    def __init__(self, core=None, ui_dispatcher=None):
+        """初始化休息界面
+        Args:
+            core: 核心业务逻辑
+            ui_dispatcher: 与主窗口共用的界面更新合并器，为None时单独创建
+        """
         style = (wx.FRAME_NO_TASKBAR | wx.STAY_ON_TOP | wx.BORDER_NONE)
         super().__init__(None, style=style)
         
+        self.ui_dispatcher = ui_dispatcher or UiDispatcher(wx.CallAfter)
+        
         # 创建休息管理器
-        self.rest_manager = RestManager()
+        self.rest_manager = RestManager(dispatch=self.ui_dispatcher)
         
         # 使用传入的core获取统计管理器，而不是创建新实例
         self.core = core
@@ -227,15 +233,16 @@ class RestScreen(wx.Frame):
         """
         # 设置休息管理器的回调
         def on_update_display(data):
-            wx.CallAfter(self._update_display, data)
+            # 倒计时每秒刷新，界面卡顿时只显示最新的一次
+            self.ui_dispatcher.post("rest_display", self._update_display, data)
         
         def on_rest_complete():
-            wx.CallAfter(self.Hide)
+            self.ui_dispatcher(self.Hide)
             if on_complete:
                 on_complete()
         
         def on_rest_cancel():
-            wx.CallAfter(self.Hide)
+            self.ui_dispatcher(self.Hide)
             if on_cancel:
                 on_cancel()
         
@@ -248,24 +255,27 @@ class RestScreen(wx.Frame):
             on_update_display=on_update_display
         )
         
-        # 更新小时统计图 - 使用共享的统计管理器
-        if self.core:
-            hourly_data = self.core.get_statistics_manager().get_today_hourly_records()
-        else:
-            # 如果没有core，创建临时实例作为后备
-            from .statistics_manager import StatisticsManager
-            temp_stats = StatisticsManager()
-            hourly_data = temp_stats.get_today_hourly_records()
-        
-        wx.CallAfter(self.hourly_chart.set_data, hourly_data)
+        # 更新小时统计图 - 使用后台构建好的统计视图模型，不在界面线程读取统计文件
+        # 视图模型尚未构建完成（刚启动时）先显示空图表，构建完成后由主窗口的订阅刷新
+        view_model = self.core.get_statistics_view_model() if self.core else None
+        self.update_hourly_chart(view_model.hourly_records if view_model is not None else [])
         
-        # 显示窗口
+        # 显示窗口，由热键等触发时在窗口显示后结束追踪
+        trace_id = tracer.current()
         def show_and_setup():
             self.Show()
             self.Maximize(True)
             self._set_window_style()
+            tracer.finish(trace_id, "overlay_visible")
         
-        wx.CallAfter(show_and_setup)
+        self.ui_dispatcher(show_and_setup)
+        
+    def update_hourly_chart(self, hourly_data):
+        """更新今日每小时休息统计图
+        Args:
+            hourly_data: 统计视图模型中的 hourly_records
+        """
+        self.ui_dispatcher(self.hourly_chart.set_data, hourly_data)
         
     def stop_rest(self, cancelled=False):
         """停止休息
@@ -273,7 +283,7 @@ class RestScreen(wx.Frame):
             cancelled: 是否是被取消的（True表示提前退出，False表示正常完成）
         """
         self.rest_manager.stop_rest(cancelled=cancelled)
-        wx.CallAfter(self.Hide)
+        self.ui_dispatcher(self.Hide)
     
     def add_rest_time(self):
         """增加休息时间"""
@@ -283,34 +293,29 @@ class RestScreen(wx.Frame):
     def temp_pause(self):
         """临时暂停休息屏幕"""
         # 暂停休息管理器的计时
-        if hasattr(self, 'rest_manager') and self.rest_manager:
-            self.rest_manager.timer_running = False
-            # 等待计时器线程结束
-            if self.rest_manager.timer_thread and self.rest_manager.timer_thread.is_alive():
-                self.rest_manager.timer_thread.join(timeout=1)
+        self.rest_manager.pause()
         
-        wx.CallAfter(self.Hide)
+        trace_id = tracer.current()
+        def hide():
+            self.Hide()
+            tracer.finish(trace_id, "overlay_hidden")
+        
+        self.ui_dispatcher(hide)
     
     def temp_resume(self):
         """恢复休息屏幕"""
         # 恢复休息管理器的计时
-        if hasattr(self, 'rest_manager') and self.rest_manager and self.rest_manager.is_resting:
-            # 重新启动计时器线程
-            self.rest_manager.timer_running = True
-            self.rest_manager.timer_thread = threading.Thread(target=self.rest_manager._timer_func)
-            self.rest_manager.timer_thread.daemon = True
-            self.rest_manager.timer_thread.start()
-            
-            # 立即更新一次显示
-            self.rest_manager._update_display()
+        self.rest_manager.resume()
         
         # 重新显示窗口
+        trace_id = tracer.current()
         def show_and_setup():
             self.Show()
             self.Maximize(True)
             self._set_window_style()
+            tracer.finish(trace_id, "overlay_visible")
         
-        wx.CallAfter(show_and_setup)
+        self.ui_dispatcher(show_and_setup)
         
     def _update_display(self, data):
         """更新显示内容
@@ -0,0 +1,138 @@
+"""可合并的统计数据格式（按设备计数的 G-Counter）
+
+每台设备只增加自己名下的计数，合并时对同一设备的每个计数取最大值。
+这样合并满足交换律、结合律和幂等性，任意顺序、重复合并多个导出文件
+都会得到相同的结果。
+
+statistics.json 中的 devices 字段是唯一的数据来源:
+
+    "devices": {
+        "laptop": {
+            "total": 17,
+            "natural": 3,
+            "daily": {"2025-08-07": 5, "2025-08-08": 12},
+            "hourly": {"date": "2025-08-08", "hours": [0, ..., 0]}
+        }
+    }
+
+natural 是其中由离开时段自动记为休息（自然休息）的次数。
+
+total_completed、natural_breaks、daily_records、today_hourly 是由 devices 汇总得到的视图，
+保留这些字段是为了兼容旧版本和 lib.stats 的流式读取。
+"""
+import os
+import platform
+from datetime import date, timedelta
+
+DATE_FORMAT = "%Y-%m-%d"
+RETENTION_DAYS = 30  # 每日记录保留天数
+
+
+def get_device_id():
+    """获取当前设备标识，可通过环境变量 EYE_REST_DEVICE_ID 覆盖"""
+    return os.environ.get("EYE_REST_DEVICE_ID") or platform.node() or "local"
+
+
+def new_device_counters():
+    """创建一台设备的空计数器"""
+    return {
+        "total": 0,
+        "natural": 0,
+        "daily": {},
+        "hourly": {"date": "", "hours": [0] * 24}
+    }
+
+
+def counters_from_legacy(data):
+    """把旧格式（无 devices 字段）的统计数据转换为单台设备的计数器"""
+    counters = new_device_counters()
+    counters["total"] = int(data.get("total_completed", 0))
+    for record in data.get("daily_records", []):
+        day = record.get("date")
+        if day:
+            counters["daily"][day] = counters["daily"].get(day, 0) + int(record.get("completed", 0))
+    hourly = data.get("today_hourly") or {}
+    hours = list(hourly.get("hours", []))[:24]
+    counters["hourly"] = {
+        "date": hourly.get("date", ""),
+        "hours": hours + [0] * (24 - len(hours))
+    }
+    return counters
+
+
+def devices_from_data(data, legacy_device_id):
+    """从统计文件内容中取出按设备的计数器，旧格式归属到 legacy_device_id"""
+    devices = data.get("devices")
+    if isinstance(devices, dict):
+        return devices
+    return {legacy_device_id: counters_from_legacy(data)}
+
+
+def merge_counters(target, source):
+    """把 source 合并进 target（同一设备），逐项取最大值"""
+    target["total"] = max(target.get("total", 0), source.get("total", 0))
+    target["natural"] = max(target.get("natural", 0), source.get("natural", 0))
+
+    daily = target.setdefault("daily", {})
+    for day, count in source.get("daily", {}).items():
+        if count > daily.get(day, 0):
+            daily[day] = count
+
+    # 小时数据只保留最新的一天：日期较新的一方胜出，同一天逐小时取最大值
+    target_hourly = target.setdefault("hourly", {"date": "", "hours": [0] * 24})
+    source_hourly = source.get("hourly") or {"date": "", "hours": [0] * 24}
+    if source_hourly["date"] > target_hourly["date"]:
+        target["hourly"] = {"date": source_hourly["date"], "hours": list(source_hourly["hours"])}
+    elif source_hourly["date"] == target_hourly["date"]:
+        target_hourly["hours"] = [max(a, b) for a, b in zip(target_hourly["hours"], source_hourly["hours"])]
+    return target
+
+
+def merge_devices(target, source):
+    """把 source 中所有设备的计数器合并进 target，返回 target"""
+    for device_id, counters in source.items():
+        merge_counters(target.setdefault(device_id, new_device_counters()), counters)
+    return target
+
+
+def prune_devices(devices, today=None, retention_days=RETENTION_DAYS):
+    """删除超过保留期的每日计数"""
+    today = today or date.today()
+    cutoff = (today - timedelta(days=retention_days)).strftime(DATE_FORMAT)
+    for counters in devices.values():
+        daily = counters.get("daily", {})
+        for day in [day for day in daily if day < cutoff]:
+            del daily[day]
+
+
+def build_views(devices, today=None):
+    """由设备计数器汇总出兼容旧格式的视图字段
+    Returns:
+        dict: {"total_completed": ..., "natural_breaks": ..., "daily_records": [...], "today_hourly": {...}}
+    """
+    today_str = (today or date.today()).strftime(DATE_FORMAT)
+    total = 0
+    natural = 0
+    daily = {}
+    hours = [0] * 24
+    for counters in devices.values():
+        total += counters.get("total", 0)
+        natural += counters.get("natural", 0)
+        for day, count in counters.get("daily", {}).items():
+            daily[day] = daily.get(day, 0) + count
+        hourly = counters.get("hourly") or {}
+        if hourly.get("date") == today_str:
+            hours = [a + b for a, b in zip(hours, hourly["hours"])]
+    return {
+        "total_completed": total,
+        "natural_breaks": natural,
+        "daily_records": [{"date": day, "completed": daily[day]} for day in sorted(daily)],
+        "today_hourly": {"date": today_str, "hours": hours}
+    }
+
+
+def build_document(devices, today=None):
+    """生成完整的统计文件内容（设备计数器 + 汇总视图）"""
+    document = build_views(devices, today)
+    document["devices"] = devices
+    return document
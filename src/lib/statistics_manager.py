@@ -1,25 +1,63 @@
 import json
 import os
+import threading
 from datetime import datetime, date, timedelta
 from .logger_manager import LoggerManager
+from .persistence import atomic_write_text
+from . import statistics_crdt
 
 class StatisticsManager:
-    """统计管理器，处理休息完成次数的统计"""
+    """统计管理器，处理休息完成次数的统计
     
-    def __init__(self):
-        """初始化统计管理器"""
+    数据按设备分别计数（见 statistics_crdt），本机只增加自己的计数，
+    多台设备导出的统计文件可以无冲突地合并。
+    
+    统计文件在第一次访问数据时才加载（或由preload()在后台线程中提前加载），
+    加载和跨天重置都只修改内存，直到下一次真正的数据变化才写盘。
+    """
+    
+    def __init__(self, persistence=None, lazy=True):
+        """初始化统计管理器
+        Args:
+            persistence: 后台持久化线程，为None时save()同步写盘
+            lazy: 是否延迟到第一次访问数据时再加载统计文件
+        """
         self.logger = LoggerManager.get_logger()
         self.stats_path = "statistics.json"
-        self.data = {
-            "total_completed": 0,
-            "daily_records": [],  # [{"date": "2024-01-15", "completed": 5}, ...]
-            "today_hourly": {
-                "date": "",
-                "hours": [0] * 24  # 24小时的统计数据，索引0对应0点，索引23对应23点
-            }
-        }
-        self.load()
-        self._check_and_reset_hourly()
+        self.persistence = persistence
+        self._lock = threading.RLock()  # 保护self.data，核心线程写入时其他线程可能在读取或保存
+        self.device_id = statistics_crdt.get_device_id()
+        self._data = None
+        self._loaded = False
+        if not lazy:
+            self._ensure_loaded()
+    
+    @property
+    def data(self):
+        """统计数据，第一次访问时加载"""
+        if not self._loaded:
+            self._ensure_loaded()
+        return self._data
+    
+    @data.setter
+    def data(self, value):
+        self._data = value
+    
+    def _ensure_loaded(self):
+        """确保统计文件已加载"""
+        with self._lock:
+            if self._loaded:
+                return
+            self.load()
+            self._loaded = True
+            self._check_and_reset_hourly()
+    
+    def preload(self):
+        """在后台线程中提前加载统计文件，不阻塞调用方"""
+        thread = threading.Thread(target=self._ensure_loaded, name="StatisticsPreload")
+        thread.daemon = True
+        thread.start()
+        return thread
     
     def load(self):
         """从文件加载统计数据"""
@@ -27,14 +65,11 @@ class StatisticsManager:
             try:
                 with open(self.stats_path, "r", encoding="utf-8") as f:
                     loaded_data = json.load(f)
-                    # 合并加载的数据，保证新字段的兼容性
-                    self.data.update(loaded_data)
-                    # 确保today_hourly字段存在
-                    if "today_hourly" not in self.data:
-                        self.data["today_hourly"] = {
-                            "date": "",
-                            "hours": [0] * 24
-                        }
+                # 旧格式数据归属到本机，按设备计数器重建汇总视图
+                devices = statistics_crdt.devices_from_data(loaded_data, self.device_id)
+                devices.setdefault(self.device_id, statistics_crdt.new_device_counters())
+                statistics_crdt.prune_devices(devices)
+                self.data = statistics_crdt.build_document(devices)
                 self.logger.info("统计数据加载成功")
             except Exception as e:
                 self.logger.error(f"统计数据加载失败: {str(e)}")
@@ -43,41 +78,52 @@ class StatisticsManager:
             self._init_default_data()
     
     def _init_default_data(self):
-        """初始化默认数据"""
-        self.data = {
-            "total_completed": 0,
-            "daily_records": [],
-            "today_hourly": {
-                "date": "",
-                "hours": [0] * 24
-            }
-        }
-        self.save()
+        """初始化默认数据（只在内存中，下一次数据变化时写盘）"""
+        self.data = statistics_crdt.build_document({
+            self.device_id: statistics_crdt.new_device_counters()
+        })
+    
+    def _device_counters(self):
+        """获取本机的计数器"""
+        return self.data["devices"].setdefault(self.device_id, statistics_crdt.new_device_counters())
     
     def _check_and_reset_hourly(self):
-        """检查日期变化并重置小时数据"""
+        """检查日期变化并重置小时数据（只修改内存，随下一次记录一起保存）"""
         today_str = date.today().strftime("%Y-%m-%d")
-        if self.data["today_hourly"]["date"] != today_str:
-            self.data["today_hourly"] = {
+        with self._lock:
+            counters = self._device_counters()
+            if counters["hourly"]["date"] == today_str and self.data["today_hourly"]["date"] == today_str:
+                return
+            counters["hourly"] = {
                 "date": today_str,
                 "hours": [0] * 24
             }
-            self.save()
-            self.logger.info(f"重置小时统计数据: {today_str}")
+            # 其他设备的小时数据可能已经是今天的，重建汇总视图
+            self.data.update(statistics_crdt.build_views(self.data["devices"]))
+        self.logger.info(f"重置小时统计数据: {today_str}")
 
     def save(self):
-        """保存统计数据到文件"""
+        """保存统计数据，有持久化线程时只标记为脏并立即返回"""
+        if self.persistence:
+            self.persistence.mark_dirty(self)
+        else:
+            self.persist()
+    
+    def persist(self):
+        """同步写入统计文件"""
         try:
-            with open(self.stats_path, "w", encoding="utf-8") as f:
-                json.dump(self.data, f, ensure_ascii=False, indent=2)
+            with self._lock:
+                text = json.dumps(self.data, ensure_ascii=False, indent=2)
+            atomic_write_text(self.stats_path, text)
             self.logger.info("统计数据保存成功")
         except Exception as e:
             self.logger.error(f"统计数据保存失败: {str(e)}")
     
-    def record_completed_rest(self, timestamp=None):
+    def record_completed_rest(self, timestamp=None, natural=False):
         """记录一次完成的休息
         Args:
             timestamp: 时间戳，如果不提供则使用当前时间
+            natural: 是否为自然休息（用户离开时长达到休息时间，没有弹出休息界面）
         """
         if timestamp is None:
             timestamp = datetime.now()
@@ -85,40 +131,51 @@ class StatisticsManager:
         today_str = timestamp.strftime("%Y-%m-%d")
         current_hour = timestamp.hour
         
-        # 检查并重置小时数据（防止跨天情况）
-        self._check_and_reset_hourly()
-        
-        # 增加总计数
-        self.data["total_completed"] += 1
-        
-        # 记录小时统计
-        self.data["today_hourly"]["hours"][current_hour] += 1
-        
-        # 查找或创建今日记录
-        today_record = None
-        for record in self.data["daily_records"]:
-            if record["date"] == today_str:
-                today_record = record
-                break
-        
-        if today_record:
-            today_record["completed"] += 1
-        else:
-            self.data["daily_records"].append({
-                "date": today_str,
-                "completed": 1
-            })
-        
-        # 按日期排序
-        self.data["daily_records"].sort(key=lambda x: x["date"])
-        
-        # 清理过老的记录（保留最近30天）
-        self._cleanup_old_records()
+        with self._lock:
+            # 检查并重置小时数据（防止跨天情况）
+            self._check_and_reset_hourly()
+            
+            # 增加本机计数
+            counters = self._device_counters()
+            counters["total"] += 1
+            if natural:
+                counters["natural"] = counters.get("natural", 0) + 1
+            counters["daily"][today_str] = counters["daily"].get(today_str, 0) + 1
+            counters["hourly"]["hours"][current_hour] += 1
+            
+            # 同步更新汇总视图
+            self.data["total_completed"] += 1
+            if natural:
+                self.data["natural_breaks"] = self.data.get("natural_breaks", 0) + 1
+            
+            # 记录小时统计
+            self.data["today_hourly"]["hours"][current_hour] += 1
+            
+            # 查找或创建今日记录
+            today_record = None
+            for record in self.data["daily_records"]:
+                if record["date"] == today_str:
+                    today_record = record
+                    break
+            
+            if today_record:
+                today_record["completed"] += 1
+            else:
+                self.data["daily_records"].append({
+                    "date": today_str,
+                    "completed": 1
+                })
+            
+            # 按日期排序
+            self.data["daily_records"].sort(key=lambda x: x["date"])
+            
+            # 清理过老的记录（保留最近30天）
+            self._cleanup_old_records()
         
         # 保存数据
         self.save()
         
-        self.logger.info(f"记录休息完成: {today_str} {current_hour}点")
+        self.logger.info(f"记录{'自然休息' if natural else '休息完成'}: {today_str} {current_hour}点")
     
     def _cleanup_old_records(self):
         """清理超过30天的旧记录"""
@@ -127,6 +184,7 @@ class StatisticsManager:
             record for record in self.data["daily_records"]
             if record["date"] >= cutoff_date
         ]
+        statistics_crdt.prune_devices(self.data["devices"])
     
     def get_today_hourly_records(self):
         """获取今日每小时休息统计
@@ -167,6 +225,10 @@ class StatisticsManager:
         """获取总计完成次数"""
         return self.data["total_completed"]
     
+    def get_natural_break_count(self):
+        """获取自然休息总次数"""
+        return self.data.get("natural_breaks", 0)
+    
     def get_daily_records(self, days=7):
         """获取最近N天的记录
         Args:
@@ -206,15 +268,33 @@ class StatisticsManager:
         
         return round(total_completed / total_days, 1) if total_days > 0 else 0.0
     
-    def reset_statistics(self):
-        """重置所有统计数据"""
-        self.data = {
-            "total_completed": 0,
-            "daily_records": [],
-            "today_hourly": {
-                "date": date.today().strftime("%Y-%m-%d"),
-                "hours": [0] * 24
+    def get_snapshot(self, days=7):
+        """在同一把锁内读取界面需要的全部统计数据，保证数据前后一致
+        Args:
+            days: 每日记录的天数
+        Returns:
+            dict: 今日/本周/总计/平均次数、最近N天记录和今日小时记录
+        """
+        with self._lock:
+            return {
+                "today_count": self.get_today_count(),
+                "week_count": self.get_week_count(),
+                "total_count": self.get_total_count(),
+                "natural_count": self.get_natural_break_count(),
+                "average_daily_count": self.get_average_daily_count(),
+                "daily_records": self.get_daily_records(days),
+                "hourly_records": self.get_today_hourly_records()
             }
-        }
+    
+    def reset_statistics(self):
+        """重置所有统计数据
+        
+        只清空本地文件，之后与其他设备的旧文件合并时，旧计数会重新出现。
+        """
+        with self._lock:
+            self.data = statistics_crdt.build_document({
+                self.device_id: statistics_crdt.new_device_counters()
+            })
+            self._loaded = True
         self.save()
         self.logger.info("统计数据已重置") 
\ No newline at end of file
@@ -0,0 +1,141 @@
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+from types import MappingProxyType
+from .logger_manager import LoggerManager
+
+# 界面直接使用的统计视图模型，创建后不再修改
+StatisticsViewModel = namedtuple("StatisticsViewModel", [
+    "version",          # 递增的版本号
+    "built_at",         # 构建时间戳
+    "today_label",      # "5次"
+    "week_label",
+    "total_label",
+    "average_label",
+    "natural_label",    # 自然休息次数 "3次"
+    "daily_records",    # 最近7天记录，只读字典组成的元组，可直接传给StatisticsChart
+    "hourly_records",   # 今日小时记录，只读字典组成的元组，可直接传给HourlyChart
+    "fatigue_label",    # "42%"，没有活动历史时为"-"
+    "active_label",     # 今日活跃时长 "3小时25分钟"
+    "activity_records", # 今日每小时平均活动强度 [{"hour": 0, "intensity": 35}, ...]
+])
+
+
+def _freeze_records(records):
+    """把记录列表转换为只读字典组成的元组"""
+    return tuple(MappingProxyType(dict(record)) for record in records)
+
+
+class StatisticsViewModelService:
+    """统计视图模型服务
+
+    在后台线程中读取 StatisticsManager 并构建不可变的视图模型，
+    通过 dispatch（如 wx.CallAfter）把结果交给界面线程。
+    界面线程只使用构建好的结果，不遍历统计记录，也不会看到修改到一半的数据。
+    """
+
+    def __init__(self, statistics, dispatch=None, activity=None):
+        """初始化视图模型服务
+        Args:
+            statistics: StatisticsManager 实例
+            dispatch: 把回调投递到界面线程的函数，签名同 wx.CallAfter；为None时在工作线程中直接调用
+            activity: ActivityHistory 实例，提供疲劳度和活动强度，可为None
+        """
+        self.logger = LoggerManager.get_logger()
+        self.statistics = statistics
+        self.activity = activity
+        self.dispatch = dispatch
+        self.latest = None          # 最近一次构建的视图模型
+        self.version = 0
+
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._dirty = threading.Event()
+        self._running = True
+
+        self._thread = threading.Thread(target=self._run, name="StatisticsViewModel")
+        self._thread.daemon = True
+        self._thread.start()
+
+        # 启动后立即构建一次（同时在后台完成统计文件的加载）
+        self.invalidate()
+
+    def subscribe(self, callback):
+        """订阅视图模型更新，已有结果时立即投递一次"""
+        with self._lock:
+            self._subscribers.append(callback)
+            latest = self.latest
+        if latest is not None:
+            self._deliver(callback, latest)
+
+    def invalidate(self):
+        """统计数据发生变化，请求重新构建"""
+        self._dirty.set()
+
+    def stop(self):
+        """停止后台线程"""
+        self._running = False
+        self._dirty.set()
+
+    def _seconds_until_midnight(self):
+        """距离下一个零点的秒数，跨天时需要重建（今日数据清零）"""
+        now = datetime.now()
+        midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        return (midnight - now).total_seconds() + 1
+
+    def _run(self):
+        """后台构建循环"""
+        while self._running:
+            self._dirty.wait(timeout=self._seconds_until_midnight())
+            self._dirty.clear()
+            if not self._running:
+                break
+            try:
+                view_model = self._build()
+            except Exception as e:
+                self.logger.error(f"构建统计视图模型失败: {str(e)}")
+                continue
+
+            with self._lock:
+                self.latest = view_model
+                subscribers = list(self._subscribers)
+            for callback in subscribers:
+                self._deliver(callback, view_model)
+
+    def _build(self):
+        """读取一致的统计快照并构建视图模型"""
+        snapshot = self.statistics.get_snapshot(days=7)
+        if self.activity is not None:
+            activity = self.activity.get_snapshot()
+            fatigue_label = f"{int(round(activity['fatigue'] * 100))}%"
+            active_minutes = activity["active_minutes_today"]
+            active_label = f"{active_minutes // 60}小时{active_minutes % 60}分钟"
+            activity_records = activity["hourly_intensity"]
+        else:
+            fatigue_label, active_label, activity_records = "-", "-", []
+        self.version += 1
+        return StatisticsViewModel(
+            version=self.version,
+            built_at=time.time(),
+            today_label=f"{snapshot['today_count']}次",
+            week_label=f"{snapshot['week_count']}次",
+            total_label=f"{snapshot['total_count']}次",
+            average_label=f"{snapshot['average_daily_count']}次",
+            natural_label=f"{snapshot['natural_count']}次",
+            daily_records=_freeze_records(snapshot["daily_records"]),
+            hourly_records=_freeze_records(snapshot["hourly_records"]),
+            fatigue_label=fatigue_label,
+            active_label=active_label,
+            activity_records=_freeze_records(activity_records),
+        )
+
+    def _deliver(self, callback, view_model):
+        """把视图模型投递给订阅者"""
+        try:
+            if self.dispatch:
+                self.dispatch(callback, view_model)
+            else:
+                callback(view_model)
+        except Exception as e:
+            self.logger.error(f"投递统计视图模型失败: {str(e)}")
@@ -0,0 +1,468 @@
+"""统计数据导出与查询命令行工具
+
+不依赖 wx，可直接在命令行运行（在 src 目录下）:
+
+    python -m lib.stats export statistics.json --format csv
+    python -m lib.stats export statistics.json --kind hourly --format ndjson
+    python -m lib.stats summary a.json b.json c.json --since 2025-08-01 --target 6 --jobs 4
+    python -m lib.stats merge laptop.json desktop.json -o statistics.json
+
+记录通过生成器逐条读取和输出，不会把整个文件解析到内存中。
+多个文件的汇总通过进程池并行计算。
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from . import statistics_crdt
+
+DATE_FORMAT = "%Y-%m-%d"
+DEFAULT_TARGET = 6  # 默认每日目标休息次数
+
+DAILY_FIELDS = ["source", "date", "completed"]
+HOURLY_FIELDS = ["source", "date", "hour", "completed"]
+SUMMARY_FIELDS = [
+    "source", "since", "until", "days", "total", "mean",
+    "p50", "p90", "max", "longest_streak", "current_streak",
+    "compliant_days", "compliance", "target"
+]
+
+
+class _JsonStreamReader:
+    """按块读取JSON文件的简单流式解析器，只解析当前需要的值"""
+
+    def __init__(self, fp, chunk_size=64 * 1024):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        """读取下一块数据，返回是否读到了新内容"""
+        if self.eof:
+            return False
+        chunk = self.fp.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # 丢弃已消费的部分，避免缓冲区无限增长
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """跳过空白并返回下一个字符，文件结束时返回空字符串"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, ch):
+        """消费指定字符"""
+        if self.peek() != ch:
+            raise ValueError(f"JSON格式错误: 期望 '{ch}'，位置 {self.pos}")
+        self.pos += 1
+
+    def value(self):
+        """解码下一个完整的JSON值"""
+        self.peek()
+        while True:
+            try:
+                result, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # 值可能被块边界截断，继续读取
+                if not self._fill():
+                    raise
+                continue
+            # 数字可能恰好在块边界处被截断
+            if end == len(self.buf) and not self.eof and isinstance(result, (int, float)):
+                if self._fill():
+                    continue
+            self.pos = end
+            return result
+
+    def iter_object(self):
+        """遍历对象成员并产出键名；调用方需读取或跳过对应的值"""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            ch = self.peek()
+            self.pos += 1
+            if ch == "}":
+                return
+            if ch != ",":
+                raise ValueError(f"JSON格式错误: 对象成员之间缺少 ','，位置 {self.pos}")
+
+    def iter_array(self):
+        """逐个产出数组元素"""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            ch = self.peek()
+            self.pos += 1
+            if ch == "]":
+                return
+            if ch != ",":
+                raise ValueError(f"JSON格式错误: 数组元素之间缺少 ','，位置 {self.pos}")
+
+
+def _parse_date(value):
+    """解析 YYYY-MM-DD 日期，None 原样返回"""
+    if value is None or isinstance(value, date):
+        return value
+    return datetime.strptime(value, DATE_FORMAT).date()
+
+
+def _iter_members(path, wanted):
+    """流式遍历统计文件的顶层成员，只处理 wanted 中的字段
+
+    Args:
+        path: 统计文件路径
+        wanted: {字段名: 处理函数}，处理函数接收 reader 并产出记录
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        reader = _JsonStreamReader(f)
+        for key in reader.iter_object():
+            handler = wanted.get(key)
+            if handler:
+                yield from handler(reader)
+            else:
+                reader.value()  # 跳过不需要的字段
+
+
+def iter_rest_records(path, since=None, until=None):
+    """逐条产出每日休息记录
+    Args:
+        path: 统计文件路径
+        since: 起始日期（含），None表示不限
+        until: 结束日期（含），None表示不限
+    Yields:
+        dict: {"source": path, "date": "2024-01-15", "completed": 5}
+    """
+    since_str = since.strftime(DATE_FORMAT) if since else None
+    until_str = until.strftime(DATE_FORMAT) if until else None
+
+    def daily(reader):
+        for record in reader.iter_array():
+            record_date = record.get("date", "")
+            if since_str and record_date < since_str:
+                continue
+            if until_str and record_date > until_str:
+                continue
+            yield {"source": path, "date": record_date, "completed": record.get("completed", 0)}
+
+    yield from _iter_members(path, {"daily_records": daily})
+
+
+def iter_hourly_records(path):
+    """逐条产出小时统计记录
+    Yields:
+        dict: {"source": path, "date": "2024-01-15", "hour": 9, "completed": 1}
+    """
+    def hourly(reader):
+        today_hourly = reader.value()
+        hourly_date = today_hourly.get("date", "")
+        for hour, completed in enumerate(today_hourly.get("hours", [])):
+            yield {"source": path, "date": hourly_date, "hour": hour, "completed": completed}
+
+    yield from _iter_members(path, {"today_hourly": hourly})
+
+
+def iter_daily_series(records, since=None, until=None):
+    """把按日期排序的记录补全为连续的每日序列（缺失日期记为0次）
+    Args:
+        records: 按日期升序的记录迭代器
+        since: 序列起始日期，None时从第一条记录开始
+        until: 序列结束日期，None时到最后一条记录为止
+    Yields:
+        tuple: (date, completed)
+    """
+    current = since
+    for record in records:
+        record_date = _parse_date(record["date"])
+        if current is None:
+            current = record_date
+        if record_date < current:
+            continue
+        if until and record_date > until:
+            break
+        while current < record_date:
+            yield current, 0
+            current += timedelta(days=1)
+        yield current, record["completed"]
+        current += timedelta(days=1)
+    if until and current is not None:
+        while current <= until:
+            yield current, 0
+            current += timedelta(days=1)
+
+
+def _percentile(histogram, total_days, fraction):
+    """基于次数直方图计算百分位数（最近秩法）"""
+    if total_days == 0:
+        return 0
+    rank = max(1, math.ceil(total_days * fraction))
+    seen = 0
+    for value in sorted(histogram):
+        seen += histogram[value]
+        if seen >= rank:
+            return value
+    return 0
+
+
+def summarize(path, since=None, until=None, target=DEFAULT_TARGET):
+    """计算一个统计文件在指定区间内的汇总指标
+
+    只保留每日次数的直方图，内存占用与天数无关。
+    Args:
+        path: 统计文件路径
+        since: 起始日期（含），None时从第一条记录开始
+        until: 结束日期（含），None时为今天
+        target: 每日目标休息次数，达到即视为达标
+    Returns:
+        dict: 汇总结果，字段见 SUMMARY_FIELDS
+    """
+    since = _parse_date(since)
+    until = _parse_date(until) or date.today()
+
+    histogram = Counter()
+    days = total = max_completed = compliant_days = 0
+    longest_streak = current_streak = 0
+    first_day = None
+
+    records = iter_rest_records(path, since, until)
+    for day, completed in iter_daily_series(records, since, until):
+        if first_day is None:
+            first_day = day
+        days += 1
+        total += completed
+        histogram[completed] += 1
+        max_completed = max(max_completed, completed)
+        if completed >= target:
+            compliant_days += 1
+        # 连续天数：当天至少完成一次休息
+        if completed > 0:
+            current_streak += 1
+            longest_streak = max(longest_streak, current_streak)
+        else:
+            current_streak = 0
+
+    return {
+        "source": path,
+        "since": (since or first_day or until).strftime(DATE_FORMAT),
+        "until": until.strftime(DATE_FORMAT),
+        "days": days,
+        "total": total,
+        "mean": round(total / days, 2) if days else 0.0,
+        "p50": _percentile(histogram, days, 0.5),
+        "p90": _percentile(histogram, days, 0.9),
+        "max": max_completed,
+        "longest_streak": longest_streak,
+        "current_streak": current_streak,
+        "compliant_days": compliant_days,
+        "compliance": round(compliant_days / days, 4) if days else 0.0,
+        "target": target,
+    }
+
+
+def _summarize_safely(args):
+    """进程池任务：单个文件出错时返回错误信息而不是中断整个批次"""
+    path, since, until, target = args
+    try:
+        return summarize(path, since, until, target)
+    except Exception as e:
+        return {"source": path, "error": str(e)}
+
+
+def iter_summaries(paths, since=None, until=None, target=DEFAULT_TARGET, jobs=None):
+    """批量计算多个统计文件的汇总，按输入顺序逐个产出
+    Args:
+        paths: 统计文件路径列表
+        jobs: 进程数，None表示使用CPU核数，1表示在当前进程中串行计算
+    """
+    tasks = ((path, since, until, target) for path in paths)
+    if jobs == 1 or len(paths) <= 1:
+        yield from map(_summarize_safely, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        chunksize = max(1, len(paths) // ((jobs or os.cpu_count() or 1) * 4))
+        yield from executor.map(_summarize_safely, tasks, chunksize=chunksize)
+
+
+def merge_files(paths, legacy_device_id=None):
+    """合并多个统计文件的设备计数器
+
+    逐个读取文件并合并进同一个结果，耗时与所有文件的计数总数成正比。
+    结果与文件顺序无关，重复合并同一个文件（或它的副本）不会改变结果。
+
+    旧格式文件（无 devices 字段）与 StatisticsManager.load 一样归属到本机，
+    因此旧文件和由它迁移出的新文件、以及不同路径下的同一份旧文件都不会重复计数。
+    唯一的歧义：来自另一台设备的旧格式文件也会归属到本机，与本机的计数逐项取最大值
+    而不是相加；需要分开计数时先在那台设备上运行一次程序完成迁移，或传入 legacy_device_id。
+    Args:
+        paths: 统计文件路径列表
+        legacy_device_id: 旧格式文件归属的设备标识，None时为本机标识
+    Returns:
+        dict: {设备标识: 计数器}
+    """
+    legacy_device_id = legacy_device_id or statistics_crdt.get_device_id()
+    devices = {}
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        statistics_crdt.merge_devices(devices, statistics_crdt.devices_from_data(data, legacy_device_id))
+    return devices
+
+
+def write_csv(rows, out, fields):
+    """逐行写出CSV"""
+    writer = csv.DictWriter(out, fieldnames=fields, extrasaction="ignore", lineterminator="\n")
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+
+
+def write_ndjson(rows, out):
+    """逐行写出NDJSON"""
+    for row in rows:
+        out.write(json.dumps(row, ensure_ascii=False))
+        out.write("\n")
+
+
+def _write_rows(rows, out, fmt, fields):
+    if fmt == "csv":
+        write_csv(rows, out, fields)
+    else:
+        write_ndjson(rows, out)
+
+
+def _cmd_export(args, out):
+    since = _parse_date(args.since)
+    until = _parse_date(args.until)
+    if args.kind == "hourly":
+        rows = (row for path in args.files for row in iter_hourly_records(path))
+        fields = HOURLY_FIELDS
+    else:
+        rows = (row for path in args.files for row in iter_rest_records(path, since, until))
+        fields = DAILY_FIELDS
+    _write_rows(rows, out, args.format, fields)
+    return 0
+
+
+def _cmd_summary(args, out):
+    rows = iter_summaries(args.files, args.since, args.until, args.target, args.jobs)
+    failed = []
+
+    def checked(rows):
+        for row in rows:
+            if "error" in row:
+                failed.append(row)
+                print(f"处理失败 {row['source']}: {row['error']}", file=sys.stderr)
+                continue
+            yield row
+
+    _write_rows(checked(rows), out, args.format, SUMMARY_FIELDS)
+    return 1 if failed else 0
+
+
+def _cmd_merge(args, out):
+    document = statistics_crdt.build_document(merge_files(args.files, args.legacy_device))
+    json.dump(document, out, ensure_ascii=False, indent=2)
+    out.write("\n")
+    return 0
+
+
+def _positive_int(value):
+    """argparse 类型：大于0的整数"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"不是整数: {value}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"必须大于0: {value}")
+    return number
+
+
+def build_parser():
+    """构建命令行参数解析器"""
+    parser = argparse.ArgumentParser(prog="python -m lib.stats", description="护眼助手统计数据导出与查询")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_common(p):
+        p.add_argument("files", nargs="+", help="statistics.json 文件路径")
+        p.add_argument("--since", help="起始日期 YYYY-MM-DD（含）")
+        p.add_argument("--until", help="结束日期 YYYY-MM-DD（含）")
+        p.add_argument("-o", "--output", help="输出文件，默认标准输出")
+
+    export = sub.add_parser("export", help="导出休息记录")
+    add_common(export)
+    export.add_argument("--kind", choices=["daily", "hourly"], default="daily", help="导出每日记录或今日小时记录")
+    export.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    export.set_defaults(handler=_cmd_export)
+
+    summary = sub.add_parser("summary", help="计算连续天数、百分位数和达标率")
+    add_common(summary)
+    summary.add_argument("--target", type=int, default=DEFAULT_TARGET, help=f"每日目标休息次数，默认{DEFAULT_TARGET}")
+    summary.add_argument("--jobs", type=_positive_int, default=None, help="并行进程数，默认CPU核数")
+    summary.add_argument("--format", choices=["csv", "ndjson"], default="ndjson")
+    summary.set_defaults(handler=_cmd_summary)
+
+    merge = sub.add_parser("merge", help="合并多台设备的统计文件")
+    merge.add_argument("files", nargs="+", help="statistics.json 文件路径")
+    merge.add_argument("-o", "--output", help="输出文件，默认标准输出")
+    merge.add_argument("--legacy-device", help="旧格式文件归属的设备标识，默认为本机")
+    merge.set_defaults(handler=_cmd_merge)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return _run(args)
+    except KeyboardInterrupt:
+        print("已中断", file=sys.stderr)
+        return 130
+    except Exception as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 1
+
+
+def _run(args):
+    if not args.output:
+        return args.handler(args, sys.stdout)
+    # 先写临时文件再替换，输出文件也可以是输入文件之一
+    tmp_path = args.output + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8", newline="") as out:
+            result = args.handler(args, out)
+        os.replace(tmp_path, args.output)
+    except BaseException:
+        # 失败或被中断时不留下临时文件，已有的输出文件保持不变
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return result
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,16 @@
 import wx
 import wx.adv
 from .app_states import AppState
+from .tray_icons import TrayIconAtlas, icon_size, progress_step, tray_tooltip
 
 class TaskBarIcon(wx.adv.TaskBarIcon):
     def __init__(self, frame):
         super().__init__()
         self.frame = frame
-        self.SetIcon(wx.Icon(wx.ArtProvider.GetBitmap(wx.ART_TIP, size=(16, 16))), "护眼助手")
+        self.atlas = TrayIconAtlas()
+        self._shown = None        # 当前显示的 (状态, 帧序号, 尺寸, 提示文字)
+        self.icon_updates = 0     # SetIcon 调用次数
+        self.update_status(AppState.IDLE, 0, 0)
         self.Bind(wx.adv.EVT_TASKBAR_LEFT_DCLICK, self.on_double_click)
 
     def CreatePopupMenu(self):
@@ -73,13 +77,24 @@ class TaskBarIcon(wx.adv.TaskBarIcon):
         self.frame.real_close = True
         self.frame.Close()
 
-    def update_icon_by_state(self, state):
-        """根据状态更新托盘图标"""
-        status_map = {
-            AppState.IDLE: "就绪",
-            AppState.WORKING: "工作中", 
-            AppState.RESTING: "休息中",
-            AppState.AWAY: "用户离开"
-        }
-        status_text = status_map.get(state, "未知状态")
-        self.SetIcon(wx.Icon(wx.ArtProvider.GetBitmap(wx.ART_TIP, size=(16, 16))), f"护眼助手 - {status_text}")
+    def update_status(self, state, remaining_seconds, total_seconds):
+        """根据状态和工作剩余时间更新托盘图标，显示的帧或提示文字变化时才调用SetIcon
+        Args:
+            state: AppState
+            remaining_seconds: 工作剩余秒数
+            total_seconds: 本轮工作总秒数
+        Returns:
+            bool: 是否更新了图标
+        """
+        if state == AppState.WORKING:
+            step = progress_step(remaining_seconds, total_seconds, self.atlas.steps)
+        else:
+            step = self.atlas.steps
+        size = icon_size()
+        shown = (state, step, size, tray_tooltip(state, remaining_seconds))
+        if shown == self._shown:
+            return False
+        self._shown = shown
+        self.SetIcon(self.atlas.get(state, step, size), shown[3])
+        self.icon_updates += 1
+        return True
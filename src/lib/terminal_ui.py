@@ -0,0 +1,175 @@
+"""终端前端（ANSI）
+
+在备用屏幕上显示当前状态、休息倒计时和今日休息次数，按键直接控制核心:
+    w 开始/停止工作   r 立即休息（休息中为增加1分钟）   p 临时暂停   q 退出
+
+只使用ANSI转义序列和标准库的终端接口（Unix: termios，Windows: msvcrt），
+适合通过SSH或在平铺窗口管理器中使用。
+"""
+import os
+import sys
+import threading
+import time
+from .app_states import AppState
+from .frontend import HeadlessFrontend
+from .logger_manager import LoggerManager
+
+ENTER_SCREEN = "\033[?1049h\033[?25l"   # 切换到备用屏幕并隐藏光标
+LEAVE_SCREEN = "\033[?25h\033[?1049l"
+CLEAR = "\033[H\033[J"
+
+STATE_COLORS = {
+    AppState.IDLE.value: "\033[37m",
+    AppState.WORKING.value: "\033[32m",
+    AppState.RESTING.value: "\033[33m",
+    AppState.AWAY.value: "\033[36m",
+    AppState.TEMP_PAUSED.value: "\033[35m",
+}
+BOLD = "\033[1m"
+DIM = "\033[2m"
+RESET = "\033[0m"
+
+HELP = "[w] 开始/停止工作  [r] 立即休息  [p] 临时暂停  [q] 退出"
+
+
+class _KeyReader:
+    """在后台线程中逐个读取按键"""
+
+    def __init__(self, on_key, stream=sys.stdin):
+        self.on_key = on_key
+        self.stream = stream
+        self.running = False
+        self._saved = None
+        self._thread = None
+
+    def start(self):
+        if sys.platform != "win32":
+            import termios
+            import tty
+            fd = self.stream.fileno()
+            self._saved = termios.tcgetattr(fd)
+            tty.setcbreak(fd)
+        self.running = True
+        self._thread = threading.Thread(target=self._run, name="KeyReader")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self.running = False
+        if self._thread and threading.current_thread() != self._thread:
+            self._thread.join(timeout=1)
+        if self._saved is not None:
+            import termios
+            termios.tcsetattr(self.stream.fileno(), termios.TCSADRAIN, self._saved)
+            self._saved = None
+
+    def _run(self):
+        if sys.platform == "win32":
+            import msvcrt
+            while self.running:
+                if msvcrt.kbhit():
+                    self.on_key(msvcrt.getwch())
+                else:
+                    time.sleep(0.05)
+        else:
+            import select
+            fd = self.stream.fileno()
+            while self.running:
+                readable, _, _ = select.select([fd], [], [], 0.2)
+                if readable:
+                    data = os.read(fd, 1)
+                    if not data:
+                        return
+                    self.on_key(data.decode("utf-8", "ignore"))
+
+
+class TerminalFrontend(HeadlessFrontend):
+    """ANSI终端前端"""
+
+    def __init__(self, core, output=sys.stdout, input_stream=sys.stdin, maxlen=64):
+        super().__init__(core, output=None, maxlen=maxlen)
+        self.screen = output
+        self.keys = _KeyReader(self.on_key, input_stream)
+        self._lock = threading.Lock()
+        self.status_text = "就绪"
+        self.state = core.current_state.value
+        self.rest_display = None
+        self.today_count = 0
+        self.last_message = ""
+
+    def run(self):
+        # 日志只写文件，控制台输出会打乱屏幕
+        LoggerManager.set_console_enabled(False)
+        self.screen.write(ENTER_SCREEN)
+        self.keys.start()
+        try:
+            self._refresh_today()
+            self.render()
+            super().run()
+        finally:
+            self.keys.stop()
+            self.screen.write(LEAVE_SCREEN)
+            self.screen.flush()
+            LoggerManager.set_console_enabled(True)
+
+    def _refresh_today(self):
+        self.today_count = self.core.statistics.get_snapshot(days=1)["today_count"]
+
+    def on_key(self, key):
+        """按键线程调用，核心接口只把事件放入队列"""
+        key = key.lower()
+        core = self.core
+        if key == "q":
+            self.stop()
+        elif key == "w":
+            if core.is_running:
+                core.stop_work_session()
+            else:
+                core.start_work_session_from_config()
+        elif key == "r":
+            core.force_rest()
+        elif key == "p":
+            if core.current_state != AppState.RESTING or not core.config.temp_pause_enabled:
+                self.message("只能在休息中临时暂停（需在配置中启用）")
+            else:
+                core.temp_pause()
+
+    def message(self, text):
+        self.last_message = f"{time.strftime('%H:%M:%S')} {text}"
+        self.render()
+
+    def on_transition(self, event):
+        super().on_transition(event)
+        self.state = event.new_state
+        if event.old_state == AppState.RESTING.value:
+            self.rest_display = None
+            self._refresh_today()
+        self.last_message = f"{time.strftime('%H:%M:%S')} {event.old_state} -> {event.new_state}"
+
+    def on_tick(self, event):
+        self.state = event.state
+        self.status_text = event.status_text
+        self.render()
+
+    def on_rest_display(self, data):
+        self.rest_display = data["remaining_display"]
+        self.render()
+
+    def render(self):
+        """重绘整个屏幕，事件线程、休息计时线程和按键线程都会调用"""
+        color = STATE_COLORS.get(self.state, "")
+        status = self.status_text
+        if self.state == AppState.RESTING.value and self.rest_display:
+            status = f"休息中 {self.rest_display}"
+        lines = [
+            f"{BOLD}护眼助手{RESET}",
+            "",
+            f"  状态  {color}{BOLD}{status}{RESET}",
+            f"  今日  已休息 {self.today_count} 次",
+            "",
+            f"{DIM}{HELP}{RESET}",
+            f"{DIM}{self.last_message}{RESET}",
+        ]
+        with self._lock:
+            self.screen.write(CLEAR + "\n".join(lines))
+            self.screen.flush()
@@ -0,0 +1,169 @@
+"""跨线程的轻量追踪
+
+一次用户操作（如按下强制休息热键）经过热键线程、核心事件队列、事件处理、
+界面线程回调和休息窗口显示。每次操作分配一个追踪ID，随事件（event['trace']）
+和界面回调（bind）传递，每一跳记录时间戳，导出为 Chrome trace-event JSON，
+可以在 chrome://tracing 或 https://ui.perfetto.dev 中逐跳查看。
+
+线程内通过 activate() 设置当前追踪ID，同一线程中后续的 mark/bind 不需要显式传递。
+"""
+import itertools
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from .metrics import LatencyStats
+
+MAX_EVENTS = 20000      # 保留的追踪事件数
+MAX_OPEN_TRACES = 256   # 尚未结束的追踪数上限，超过时丢弃最旧的
+
+
+def _now_us(timestamp=None):
+    return int((time.time() if timestamp is None else timestamp) * 1000000)
+
+
+class Tracer:
+    """记录追踪事件的环形缓冲区，所有方法线程安全；追踪ID为None时各方法不做任何事"""
+
+    def __init__(self, max_events=MAX_EVENTS):
+        self._lock = threading.Lock()
+        self._events = deque(maxlen=max_events)
+        self._ids = itertools.count(1)
+        self._local = threading.local()
+        self._open = OrderedDict()      # 追踪ID -> (名称, 开始时间微秒)
+        self._thread_names = {}
+        self.latency = {}               # 追踪名称 -> LatencyStats（开始到结束）
+
+    def set_capacity(self, max_events):
+        """修改保留的事件数，保留最新的事件（长时间压测时调小，使缓冲区在预热阶段就填满）"""
+        with self._lock:
+            self._events = deque(self._events, maxlen=max_events)
+
+    def begin(self, name, timestamp=None):
+        """开始一次追踪
+        Args:
+            name: 追踪名称，如 "hotkey force_rest"
+            timestamp: 开始时间（time.time()），None时为当前时间；热键传入按下的时间
+        Returns:
+            int: 追踪ID
+        """
+        trace_id = next(self._ids)
+        ts = _now_us(timestamp)
+        with self._lock:
+            self._open[trace_id] = (name, ts)
+            if len(self._open) > MAX_OPEN_TRACES:
+                self._open.popitem(last=False)
+        self._record(trace_id, name, "s", ts)
+        return trace_id
+
+    def mark(self, trace_id, name):
+        """记录经过的一跳"""
+        if trace_id is not None:
+            self._record(trace_id, name, "t", _now_us())
+
+    def finish(self, trace_id, name):
+        """结束追踪，记录从开始到现在的总延迟"""
+        if trace_id is None:
+            return
+        ts = _now_us()
+        with self._lock:
+            opened = self._open.pop(trace_id, None)
+        self._record(trace_id, name, "f", ts)
+        if opened is not None:
+            trace_name, start = opened
+            stats = self.latency.get(trace_name)
+            if stats is None:
+                stats = self.latency.setdefault(trace_name, LatencyStats())
+            stats.record((ts - start) / 1000000)
+
+    @contextmanager
+    def span(self, trace_id, name):
+        """记录一段耗时（如一次事件处理）"""
+        if trace_id is None:
+            yield
+            return
+        start = _now_us()
+        try:
+            yield
+        finally:
+            self._append({"name": name, "ph": "X", "ts": start, "dur": max(1, _now_us() - start),
+                          "pid": os.getpid(), "tid": self._tid(), "args": {"trace_id": trace_id}})
+
+    @contextmanager
+    def activate(self, trace_id):
+        """在当前线程中设置当前追踪ID"""
+        previous = getattr(self._local, "trace_id", None)
+        self._local.trace_id = trace_id
+        try:
+            yield
+        finally:
+            self._local.trace_id = previous
+
+    def current(self):
+        """当前线程的追踪ID，没有时为None"""
+        return getattr(self._local, "trace_id", None)
+
+    def bind(self, trace_id, name, func):
+        """包装一个要交给其他线程执行的回调：执行时记录一跳并设置当前追踪ID
+        Returns:
+            包装后的函数；trace_id为None时原样返回func
+        """
+        if trace_id is None:
+            return func
+
+        def traced(*args):
+            with self.activate(trace_id), self.span(trace_id, name):
+                return func(*args)
+        return traced
+
+    def _tid(self):
+        ident = threading.get_ident()
+        if ident not in self._thread_names:
+            self._thread_names[ident] = threading.current_thread().name
+        return ident
+
+    def _record(self, trace_id, name, flow_phase, ts):
+        """记录一个瞬时事件，并用流事件（同一ID的 s/t/f）把各跳连起来"""
+        pid, tid = os.getpid(), self._tid()
+        args = {"trace_id": trace_id}
+        self._append({"name": name, "ph": "i", "s": "t", "ts": ts, "pid": pid, "tid": tid, "args": args})
+        flow = {"name": "trace", "cat": "trace", "ph": flow_phase, "id": trace_id, "ts": ts, "pid": pid, "tid": tid}
+        if flow_phase == "f":
+            flow["bp"] = "e"
+        self._append(flow)
+
+    def _append(self, event):
+        with self._lock:
+            self._events.append(event)
+
+    def export(self, path):
+        """把缓冲区中的事件写成 Chrome trace-event JSON
+        Returns:
+            int: 写入的事件数
+        """
+        with self._lock:
+            events = list(self._events)
+            names = dict(self._thread_names)
+        pid = os.getpid()
+        metadata = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                    for tid, name in names.items()]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+        return len(events)
+
+    def get_stats(self):
+        """各类追踪从开始到结束的延迟（毫秒）"""
+        with self._lock:
+            open_traces = len(self._open)
+            buffered = len(self._events)
+        return {
+            "latency": {name: stats.snapshot() for name, stats in list(self.latency.items())},
+            "open_traces": open_traces,
+            "buffered_events": buffered,
+        }
+
+
+# 进程内共用的追踪器
+tracer = Tracer()
@@ -0,0 +1,127 @@
+"""托盘图标图集
+
+托盘图标是一个倒计时进度环：工作状态按剩余时间比例分为 STEPS 级，其他状态
+显示满环，颜色区分状态。每一帧按 (状态, 帧序号, 图标尺寸) 缓存，只绘制一次；
+图标尺寸取系统小图标尺寸，随DPI变化时按新尺寸重新绘制。
+"""
+import math
+import wx
+from .app_states import AppState
+
+STEPS = 60
+
+STATE_COLORS = {
+    AppState.IDLE: (149, 165, 166),        # 灰色
+    AppState.WORKING: (46, 204, 113),      # 绿色
+    AppState.RESTING: (52, 152, 219),      # 蓝色
+    AppState.AWAY: (127, 140, 141),        # 深灰色
+    AppState.TEMP_PAUSED: (155, 89, 182),  # 紫色
+}
+
+STATE_NAMES = {
+    AppState.IDLE: "就绪",
+    AppState.WORKING: "工作中",
+    AppState.RESTING: "休息中",
+    AppState.AWAY: "用户离开",
+    AppState.TEMP_PAUSED: "临时暂停",
+}
+
+
+def progress_step(remaining_seconds, total_seconds, steps=STEPS):
+    """剩余时间对应的帧序号
+    Args:
+        remaining_seconds: 剩余秒数
+        total_seconds: 总秒数，不大于0时显示满环
+        steps: 帧数
+    Returns:
+        int: 0..steps，向上取整，只要还有剩余时间就不显示空环
+    """
+    if total_seconds <= 0:
+        return steps
+    remaining = min(max(int(remaining_seconds), 0), int(total_seconds))
+    return -(-remaining * steps // int(total_seconds))
+
+
+def tray_tooltip(state, remaining_seconds):
+    """托盘提示文字，工作中只精确到分钟，避免每秒都要更新图标"""
+    name = STATE_NAMES.get(state, "未知状态")
+    if state == AppState.WORKING and remaining_seconds > 0:
+        if remaining_seconds < 60:
+            return f"护眼助手 - {name}（不到1分钟）"
+        return f"护眼助手 - {name}（还剩 {-(-int(remaining_seconds) // 60)} 分钟）"
+    return f"护眼助手 - {name}"
+
+
+def icon_size():
+    """当前DPI下的托盘图标尺寸（像素）"""
+    size = wx.SystemSettings.GetMetric(wx.SYS_SMALLICON_X)
+    return size if size > 0 else 16
+
+
+class TrayIconAtlas:
+    """按状态、进度和尺寸缓存的托盘图标帧"""
+
+    def __init__(self, steps=STEPS):
+        self.steps = steps
+        self._frames = {}
+        self.rendered = 0  # 实际绘制的帧数
+
+    def get(self, state, step, size):
+        """获取一帧图标，第一次用到时绘制
+        Args:
+            state: AppState
+            step: 帧序号（0..steps）
+            size: 图标边长（像素）
+        Returns:
+            wx.Icon
+        """
+        key = (state, step, size)
+        icon = self._frames.get(key)
+        if icon is None:
+            icon = self._frames[key] = self._render(state, step, size)
+            self.rendered += 1
+        return icon
+
+    def clear(self):
+        self._frames.clear()
+
+    def _render(self, state, step, size):
+        """绘制进度环：浅色底环，从12点钟方向顺时针画出剩余比例"""
+        bitmap = wx.Bitmap.FromRGBA(size, size, 0, 0, 0, 0)
+        dc = wx.MemoryDC(bitmap)
+        gc = wx.GraphicsContext.Create(dc)
+
+        width = max(2.0, size / 6.0)
+        radius = (size - width) / 2.0
+        center = size / 2.0
+        red, green, blue = STATE_COLORS.get(state, STATE_COLORS[AppState.IDLE])
+
+        gc.SetPen(gc.CreatePen(wx.GraphicsPenInfo(wx.Colour(red, green, blue, 70)).Width(width)))
+        gc.StrokePath(self._arc(gc, center, radius, 1.0))
+
+        if step > 0:
+            gc.SetPen(gc.CreatePen(wx.GraphicsPenInfo(wx.Colour(red, green, blue)).Width(width)))
+            gc.StrokePath(self._arc(gc, center, radius, step / self.steps))
+
+        # 中心圆点，非工作状态时在小尺寸下也能分辨颜色
+        gc.SetPen(wx.TRANSPARENT_PEN)
+        gc.SetBrush(wx.Brush(wx.Colour(red, green, blue)))
+        dot = radius / 2.5
+        gc.DrawEllipse(center - dot, center - dot, dot * 2, dot * 2)
+
+        del gc
+        dc.SelectObject(wx.NullBitmap)
+        icon = wx.Icon()
+        icon.CopyFromBitmap(bitmap)
+        return icon
+
+    @staticmethod
+    def _arc(gc, center, radius, fraction):
+        path = gc.CreatePath()
+        start = -math.pi / 2
+        if fraction >= 1.0:
+            path.AddCircle(center, center, radius)
+        else:
+            path.MoveToPoint(center, center - radius)
+            path.AddArc(center, center, radius, start, start + 2 * math.pi * fraction, True)
+        return path
@@ -0,0 +1,97 @@
+"""界面更新合并器
+
+核心线程（每秒状态刷新、休息开始、临时暂停/恢复）、休息计时线程（每秒倒计时）
+和统计视图模型线程都要把回调交给界面线程执行。UiDispatcher 收集待执行的回调，
+同一时刻最多只向界面线程投递一次批处理（wx界面传入 wx.CallAfter 作为 schedule）:
+    - 按键投递（post）或登记为只保留最新值（latest_only）的回调，只执行最后一次的参数
+    - 其余回调按投递顺序执行
+界面线程卡顿期间积压的刷新在恢复后合并为一次执行。
+"""
+import itertools
+import threading
+from .logger_manager import LoggerManager
+
+
+class UiDispatcher:
+    """把跨线程的界面回调合并成批，在界面线程中执行"""
+
+    def __init__(self, schedule):
+        """初始化
+        Args:
+            schedule: 把函数交给界面线程执行的函数（如 wx.CallAfter）
+        """
+        self.logger = LoggerManager.get_logger()
+        self.schedule = schedule
+        self._lock = threading.Lock()
+        self._pending = {}              # 键 -> (函数, 参数)，按第一次投递的顺序执行
+        self._latest_only = set()
+        self._sequence = itertools.count()
+        self._scheduled = False
+
+        # 统计
+        self.posted = 0                 # 投递的回调数
+        self.coalesced = 0              # 被同键的新值替换掉的回调数
+        self.schedule_calls = 0         # 调用 schedule（wx.CallAfter）的次数
+        self.batches = 0
+        self.max_batch = 0
+
+    def latest_only(self, func):
+        """登记只需要最新值的回调（如状态文字、倒计时显示）
+        Returns:
+            func，便于链式使用
+        """
+        self._latest_only.add(func)
+        return func
+
+    def __call__(self, func, *args):
+        """与 wx.CallAfter 签名相同，可作为核心和休息管理器的 dispatch"""
+        key = func if func in self._latest_only else next(self._sequence)
+        self.post(key, func, *args)
+
+    def post(self, key, func, *args):
+        """投递回调，同键未执行的旧回调被替换
+        Args:
+            key: 合并键
+            func: 在界面线程中执行的函数
+            args: 参数
+        """
+        with self._lock:
+            self.posted += 1
+            if key in self._pending:
+                self.coalesced += 1
+            self._pending[key] = (func, args)
+            if self._scheduled:
+                return
+            self._scheduled = True
+            self.schedule_calls += 1
+        self.schedule(self._flush)
+
+    def _flush(self):
+        """在界面线程中执行一批回调"""
+        with self._lock:
+            batch = self._pending
+            self._pending = {}
+            self._scheduled = False
+        self.batches += 1
+        self.max_batch = max(self.max_batch, len(batch))
+        for func, args in batch.values():
+            try:
+                func(*args)
+            except Exception as e:
+                self.logger.error(f"界面更新回调出错: {str(e)}")
+
+    def get_stats(self):
+        """获取合并统计
+        Returns:
+            dict: posted/coalesced/schedule_calls/batches/max_batch/pending
+        """
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "posted": self.posted,
+            "coalesced": self.coalesced,
+            "schedule_calls": self.schedule_calls,
+            "batches": self.batches,
+            "max_batch": self.max_batch,
+            "pending": pending,
+        }
@@ -0,0 +1,206 @@
+"""主循环卡顿监测
+
+监测线程定期向每个登记的循环（核心事件循环、wx主循环）投递心跳回调，
+心跳超过阈值仍未执行时把所有线程的调用栈写入日志目录下的诊断文件；
+循环线程已经退出时可以重启它。没有需要执行的工作时（如核心处于离开或空闲
+状态）可以暂停对某个循环的监测，全部暂停时监测线程阻塞等待，不再周期唤醒。
+"""
+import os
+import sys
+import threading
+import time
+import traceback
+from datetime import datetime
+from .logger_manager import LoggerManager
+
+HEARTBEAT_INTERVAL = 1.0    # 心跳间隔（秒）
+STALL_THRESHOLD = 5.0       # 心跳超过该时间未执行视为卡顿（秒）
+MAX_DUMPS = 20              # 每次运行最多写入的诊断文件数
+
+
+class _Loop:
+    __slots__ = ("name", "post", "is_alive", "restart", "active", "sent_at", "pending",
+                 "reported", "last_latency", "max_latency", "stalls", "restarts")
+
+    def __init__(self, name, post, is_alive, restart):
+        self.name = name
+        self.post = post
+        self.is_alive = is_alive
+        self.restart = restart
+        self.active = True
+        self.sent_at = 0
+        self.pending = False
+        self.reported = False
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self.stalls = 0
+        self.restarts = 0
+
+
+class Watchdog:
+    """向各个循环发送心跳，卡顿时记录所有线程的调用栈"""
+
+    def __init__(self, interval=HEARTBEAT_INTERVAL, threshold=STALL_THRESHOLD, diagnostics_dir=None):
+        """初始化
+        Args:
+            interval: 心跳间隔（秒）
+            threshold: 卡顿阈值（秒）
+            diagnostics_dir: 诊断文件目录，None时使用日志目录
+        """
+        self.logger = LoggerManager.get_logger()
+        self.interval = interval
+        self.threshold = threshold
+        self.diagnostics_dir = diagnostics_dir or LoggerManager.get_logs_dir()
+        self.loops = {}
+        self.dumps = []             # 已写入的诊断文件
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._wake = threading.Event()     # 恢复监测或停止时唤醒监测线程
+        self._thread = None
+
+    def watch(self, name, post, is_alive=None, restart=None):
+        """登记一个循环
+        Args:
+            name: 循环名称（写入诊断文件和日志）
+            post: 把无参回调投递到该循环中执行的函数（如 wx.CallAfter）
+            is_alive: 返回循环线程是否存活的函数，None时不检查
+            restart: 重启已退出的循环线程的函数，None时只记录
+        """
+        with self._lock:
+            self.loops[name] = _Loop(name, post, is_alive, restart)
+
+    def set_active(self, name, active):
+        """暂停或恢复对一个循环的监测
+        Args:
+            name: 循环名称
+            active: False时不再发送心跳，尚未响应的心跳不计为卡顿
+        """
+        with self._lock:
+            loop = self.loops[name]
+            if loop.active == active:
+                return
+            loop.active = active
+            if not active:
+                loop.pending = False
+                loop.reported = False
+        if active:
+            self._wake.set()
+
+    def start(self):
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="Watchdog")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake.set()
+        if self._thread and threading.current_thread() != self._thread:
+            self._thread.join(timeout=2)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            with self._lock:
+                active = any(loop.active for loop in self.loops.values())
+            if not active:
+                # 所有循环都已暂停监测，等待恢复，期间没有周期唤醒
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            if self._stop_event.wait(self.interval):
+                break
+            with self._lock:
+                loops = [loop for loop in self.loops.values() if loop.active]
+            for loop in loops:
+                try:
+                    self._check(loop)
+                except Exception as e:
+                    self.logger.error(f"看门狗检查 {loop.name} 出错: {str(e)}")
+
+    def _check(self, loop):
+        now = time.monotonic()
+        if loop.is_alive and not loop.is_alive():
+            self.logger.error(f"{loop.name} 循环线程已退出")
+            self.dump_stacks(f"{loop.name} 循环线程已退出")
+            loop.pending = False
+            if loop.restart:
+                loop.restart()
+                loop.restarts += 1
+                self.logger.warning(f"已重启 {loop.name} 循环线程")
+            return
+
+        if loop.pending:
+            late = now - loop.sent_at
+            if late > self.threshold and not loop.reported:
+                loop.reported = True
+                loop.stalls += 1
+                self.logger.warning(f"{loop.name} 循环 {late:.1f} 秒未响应心跳")
+                self.dump_stacks(f"{loop.name} 循环 {late:.1f} 秒未响应心跳")
+            return
+
+        loop.sent_at = now
+        loop.pending = True
+        sent_at = now
+        loop.post(lambda: self._ack(loop, sent_at))
+
+    def _ack(self, loop, sent_at):
+        """心跳回调，在被监测的循环中执行"""
+        if sent_at != loop.sent_at:
+            return  # 线程重启前留在队列中的旧心跳
+        latency = time.monotonic() - sent_at
+        loop.last_latency = latency
+        loop.max_latency = max(loop.max_latency, latency)
+        if loop.reported:
+            self.logger.warning(f"{loop.name} 循环已恢复，卡顿 {latency:.1f} 秒")
+            loop.reported = False
+        loop.pending = False
+
+    def dump_stacks(self, reason):
+        """把所有线程的调用栈写入诊断文件
+        Args:
+            reason: 写入文件开头的原因
+        Returns:
+            str: 诊断文件路径，超过数量上限或写入失败时为None
+        """
+        if len(self.dumps) >= MAX_DUMPS:
+            return None
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        lines = [f"{datetime.now().isoformat(timespec='seconds')} {reason}", ""]
+        for ident, frame in sys._current_frames().items():
+            lines.append(f"线程 {names.get(ident, '?')} ({ident}):")
+            lines.extend(line.rstrip("\n") for line in traceback.format_stack(frame))
+            lines.append("")
+
+        path = os.path.join(self.diagnostics_dir,
+                            f"stall_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{len(self.dumps) + 1}.txt")
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("\n".join(lines))
+        except OSError as e:
+            self.logger.error(f"写入诊断文件失败: {str(e)}")
+            return None
+        self.dumps.append(path)
+        self.logger.warning(f"已写入线程调用栈: {path}")
+        return path
+
+    def get_stats(self):
+        """获取各循环的心跳统计
+        Returns:
+            dict: {"loops": {循环名称: {last_latency_ms, max_latency_ms, stalls, restarts, active, pending_seconds}},
+                   "dumps": 诊断文件数}
+        """
+        now = time.monotonic()
+        with self._lock:
+            loops = list(self.loops.values())
+        loop_stats = {
+            loop.name: {
+                "last_latency_ms": round(loop.last_latency * 1000, 2),
+                "max_latency_ms": round(loop.max_latency * 1000, 2),
+                "stalls": loop.stalls,
+                "restarts": loop.restarts,
+                "active": loop.active,
+                "pending_seconds": round(now - loop.sent_at, 1) if loop.pending else 0,
+            }
+            for loop in loops
+        }
+        return {"loops": loop_stats, "dumps": len(self.dumps)}
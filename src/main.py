@@ -1,48 +1,83 @@
-import wx
-import threading
-import time
+import argparse
 import os
 import sys
 
 # 添加项目根目录到 Python 路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from lib.main_window import MainFrame
 from lib.process_checker import check_duplicate_process, create_lock_file
 
-class EyeRestApp(wx.App):
-    def OnInit(self):
-        # 检查是否已有程序实例在运行
-        if check_duplicate_process():
-            wx.MessageBox(
-                "护眼助手已在运行中！\n\n请检查系统托盘图标，双击可打开设置界面。",
-                "护眼助手",
-                wx.OK | wx.ICON_INFORMATION
-            )
-            return False  # 退出应用
-        
-        # 创建锁文件
-        if not create_lock_file():
-            wx.MessageBox(
-                "无法创建程序锁定文件，可能存在权限问题。\n程序将继续运行，但可能无法防止重复启动。",
-                "警告",
-                wx.OK | wx.ICON_WARNING
-            )
-        
-        frame = MainFrame()
-        
-        # 检查是否有配置文件
-        config_exists = os.path.exists("eye_rest_config.json")
-        
-        if config_exists:
-            # 静默启动：不显示窗口，直接开始工作
-            frame.start_silent_mode()
-        else:
-            # 首次使用：显示配置界面
-            frame.Show()
-            
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="护眼助手")
+    action = parser.add_mutually_exclusive_group()
+    action.add_argument("--show", dest="command", action="store_const", const="show_settings",
+                        help="显示设置窗口（已在运行时转发给运行中的实例，默认行为）")
+    action.add_argument("--force-rest", dest="command", action="store_const", const="force_rest",
+                        help="立即开始休息（已在运行时转发给运行中的实例）")
+    parser.set_defaults(command="show_settings")
+    return parser.parse_args(argv)
+
+def forward_to_running_instance(command):
+    """把命令转发给已在运行的实例
+    Returns:
+        bool: 是否转发成功
+    """
+    from lib.ipc import send_command, ControlError
+    try:
+        send_command(command)
         return True
+    except (OSError, ValueError, ControlError):
+        return False
+
+def run_gui(command, duplicate):
+    """启动图形界面（wx在确认没有其他实例后才导入，第二个实例转发命令时不加载GUI）"""
+    import wx
+    app = wx.App(False)
+
+    if duplicate:
+        # 实例锁被占用但控制通道不可用（运行中的实例可能是旧版本）
+        wx.MessageBox(
+            "护眼助手已在运行中！\n\n请检查系统托盘图标，双击可打开设置界面。",
+            "护眼助手",
+            wx.OK | wx.ICON_INFORMATION
+        )
+        return  # 退出应用
+
+    # 在锁文件中记录进程信息
+    if not create_lock_file():
+        wx.MessageBox(
+            "无法创建程序锁定文件，可能存在权限问题。\n程序将继续运行，但可能无法防止重复启动。",
+            "警告",
+            wx.OK | wx.ICON_WARNING
+        )
+
+    from lib.main_window import MainFrame
+    frame = MainFrame()
+
+    # 检查是否有配置文件
+    config_exists = os.path.exists("eye_rest_config.json")
+
+    if config_exists:
+        # 静默启动：不显示窗口，直接开始工作
+        frame.start_silent_mode()
+        if command == "force_rest":
+            frame.core.force_rest()
+    else:
+        # 首次使用：显示配置界面
+        frame.Show()
 
-if __name__ == "__main__":
-    app = EyeRestApp()
     app.MainLoop()
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # 检查是否已有程序实例在运行：已有实例时把命令转发过去后立即退出
+    duplicate = check_duplicate_process()
+    if duplicate and forward_to_running_instance(args.command):
+        return 0
+
+    run_gui(args.command, duplicate)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
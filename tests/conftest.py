@@ -0,0 +1,22 @@
+import os
+import sys
+
+# 与 bench/ 下的脚本一样直接从 src 导入 lib
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import pytest
+
+
+@pytest.fixture
+def core(monkeypatch, tmp_path):
+    """使用假活动检测和假热键后端的核心，配置、统计和控制通道都在临时目录"""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("USERPROFILE", str(tmp_path))
+    monkeypatch.setenv("EYE_REST_ACTIVITY_BACKEND", "fake")
+    monkeypatch.setenv("EYE_REST_HOTKEY_BACKEND", "fake")
+    monkeypatch.chdir(tmp_path)
+    from lib.app_core import EyeRestCore
+
+    core = EyeRestCore()
+    yield core
+    core.cleanup()
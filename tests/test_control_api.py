@@ -0,0 +1,93 @@
+"""控制通道修改配置和开始工作时的类型和范围校验"""
+import json
+import os
+
+import pytest
+
+from lib.app_states import AppState
+from lib.config import Config
+from lib.control_api import ControlApi
+from lib.ipc import ControlError
+
+
+class RecordingCore:
+    """只记录 update_config 调用的核心替身"""
+
+    def __init__(self):
+        self.config = Config()
+        self.updates = []
+
+    def update_config(self, **changes):
+        self.updates.append(changes)
+
+
+@pytest.fixture
+def api(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    return ControlApi(RecordingCore())
+
+
+@pytest.mark.parametrize("changes", [
+    {"work_time": 45, "rest_time": 5},
+    {"work_time": 1, "idle_threshold_minutes": 30},
+    {"temp_pause_duration": 300, "adaptive_max_adjust_percent": 0},
+    {"play_sound_after_rest": False, "adaptive_schedule_enabled": True},
+])
+def test_valid_changes_are_applied(api, changes):
+    assert api.update_config(**changes) is True
+    assert api.core.updates == [changes]
+
+
+@pytest.mark.parametrize("changes", [
+    {"work_time": 0.5},
+    {"work_time": 0},
+    {"work_time": 101},
+    {"work_time": True},
+    {"idle_threshold_minutes": 1e9},
+    {"idle_threshold_minutes": 10 ** 9},
+    {"temp_pause_duration": 4},
+    {"adaptive_max_adjust_percent": 5000},
+    {"play_sound_after_rest": 1},
+    {"allow_password_skip": "false"},
+    {"unknown_key": 1},
+    {"hotkey": "ctrl+alt+x"},
+    {"rest_time": 5, "work_time": 0.5},
+])
+def test_invalid_changes_are_rejected(api, changes):
+    with pytest.raises(ControlError):
+        api.update_config(**changes)
+    assert api.core.updates == []
+
+
+@pytest.mark.parametrize("params", [
+    {"work_time": "abc"},
+    {"rest_time": -3},
+    {"work_time": "abc", "rest_time": -3},
+    {"work_time": 25.5},
+    {"rest_time": 101},
+])
+def test_invalid_start_parameters_are_rejected(api, params):
+    with pytest.raises(ControlError):
+        api.start_work_session(**params)
+
+
+def test_invalid_start_event_is_not_saved(core):
+    core.start_work_session("abc", -3, False, False)
+    core.event_queue.join()
+    core.persistence.flush()
+
+    assert core.current_state == AppState.IDLE
+    assert core.loop_errors == 0
+    assert (core.config.work_time, core.config.rest_time) == (10, 1)
+    assert not os.path.exists(core.config.config_path)
+
+
+def test_invalid_values_in_config_file_fall_back_to_defaults(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    with open("eye_rest_config.json", "w") as f:
+        json.dump({"work_time": "abc", "rest_time": -3, "idle_threshold_minutes": 10,
+                   "play_sound_after_rest": 0}, f)
+    config = Config()
+    assert (config.work_time, config.rest_time) == (10, 1)
+    assert config.idle_threshold_minutes == 10
+    assert config.play_sound_after_rest is True
@@ -0,0 +1,42 @@
+"""核心事件循环：处理失败的事件、退出和心跳"""
+from lib.app_states import AppState
+
+
+def test_failing_event_does_not_block_join(core):
+    def fail():
+        raise RuntimeError("处理失败")
+
+    core.event_queue.put({'type': 'HEARTBEAT', 'data': {'callback': fail}})
+    core.event_queue.join()
+    assert core.loop_errors == 1
+    assert core.event_queue.unfinished_tasks == 0
+
+
+def test_loop_blocks_without_timeout_and_exits_on_sentinel(core):
+    # 与 cleanup() 相同：清除运行标志并放入 None 唤醒阻塞等待的事件循环
+    core.running = False
+    core.event_queue.put(None)
+    core.event_loop_thread.join(1)
+    assert not core.event_loop_thread.is_alive()
+    assert core.event_queue.unfinished_tasks == 0
+
+
+def test_core_heartbeat_is_suspended_while_idle_or_away(core):
+    assert core.watchdog.get_stats()["loops"]["core"]["active"] is False
+
+    core.start_work_session(25, 5, False, False, idle_detection_enabled=True, idle_threshold_minutes=1)
+    core.event_queue.join()
+    assert core.watchdog.get_stats()["loops"]["core"]["active"] is True
+
+    core.activity_detector.backend.set_idle(90)
+    core.event_queue.put({'type': 'CHECK_IDLE'})
+    core.event_queue.join()
+    assert core.current_state == AppState.AWAY
+    assert core.watchdog.get_stats()["loops"]["core"]["active"] is False
+
+
+def test_exiting_loop_resumes_monitoring(core):
+    core.running = False
+    core.event_queue.put(None)
+    core.event_loop_thread.join(1)
+    assert core.watchdog.get_stats()["loops"]["core"]["active"] is True
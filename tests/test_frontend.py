@@ -0,0 +1,34 @@
+"""前端在收到 SIGTERM 时自行退出 run()，信号处理函数不获取订阅的锁"""
+import os
+import signal
+import threading
+import time
+
+import pytest
+
+from lib.frontend import Frontend, STOP_CHECK_INTERVAL
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGTERM") or os.name == "nt", reason="需要向自身发送 SIGTERM")
+def test_sigterm_while_waiting_for_events_stops_run(core):
+    frontend = Frontend(core)
+    previous = signal.signal(signal.SIGTERM, lambda signum, frame: frontend.request_stop())
+    try:
+        threading.Timer(0.2, os.kill, (os.getpid(), signal.SIGTERM)).start()
+        started = time.time()
+        frontend.run()
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+
+    assert time.time() - started < 0.2 + STOP_CHECK_INTERVAL + 1
+    assert frontend.subscription.closed
+
+
+def test_stop_from_another_thread_ends_run(core):
+    frontend = Frontend(core)
+    handled = []
+    frontend.on_tick = handled.append
+    core.events.tick("idle", 0, "就绪")
+    threading.Timer(0.1, frontend.stop).start()
+    frontend.run()
+    assert len(handled) == 1
@@ -0,0 +1,62 @@
+"""热键绑定在核心线程和界面线程中同时修改时，绑定表与后端注册保持一致"""
+import threading
+import time
+
+from lib.hotkey_backends import FakeHotkeyBackend
+from lib.hotkey_chord import Chord
+from lib.hotkey_manager import HotkeyManager
+
+
+class SlowBackend(FakeHotkeyBackend):
+    """注册和取消注册都要一点时间，记录重复注册和取消未注册的热键"""
+
+    def __init__(self):
+        super().__init__()
+        self.errors = []
+
+    def add(self, chord):
+        if chord in self.bindings:
+            self.errors.append(f"重复注册 {chord}")
+        time.sleep(0.001)
+        super().add(chord)
+
+    def remove(self, chord):
+        if chord not in self.bindings:
+            self.errors.append(f"取消未注册的 {chord}")
+        time.sleep(0.001)
+        super().remove(chord)
+
+
+def force_rest():
+    pass
+
+
+def temp_pause():
+    pass
+
+
+def test_concurrent_set_bindings_keep_backend_in_sync():
+    backend = SlowBackend()
+    manager = HotkeyManager(backend=backend)
+    binding_sets = [
+        [("ctrl+shift+r", force_rest), ("ctrl+shift+e", temp_pause)],
+        [("ctrl+shift+r", force_rest)],
+        [("ctrl+alt+r", force_rest), ("ctrl+shift+e", temp_pause)],
+    ]
+    start = threading.Barrier(4)
+
+    def worker(offset):
+        start.wait()
+        for index in range(30):
+            manager.set_bindings(binding_sets[(index + offset) % len(binding_sets)])
+
+    threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    manager.stop()
+
+    assert backend.errors == []
+    assert backend.bindings == set(manager._bindings)
+    assert backend.bindings in [{Chord.parse(hotkey) for hotkey, _ in bindings} for bindings in binding_sets]
@@ -0,0 +1,42 @@
+"""输入限流只作用于热键：热键触发会合并，按钮和控制通道的请求都入队"""
+import threading
+
+import pytest
+
+from lib.control_api import ControlApi
+
+
+@pytest.fixture
+def blocked_loop(core):
+    """让事件循环停在一个心跳回调里，期间入队的事件都不会被处理"""
+    release = threading.Event()
+    entered = threading.Event()
+
+    def wait():
+        entered.set()
+        release.wait(5)
+
+    core.event_queue.put({'type': 'HEARTBEAT', 'data': {'callback': wait}})
+    assert entered.wait(5)
+    yield core.event_queue
+    release.set()
+    core.event_queue.join()
+
+
+def test_hotkey_presses_are_coalesced(core, blocked_loop):
+    results = [core._force_rest_hotkey() for _ in range(10)]
+    assert results == ['queued'] + ['coalesced'] * 9
+    assert blocked_loop.qsize() == 1
+    assert core.get_input_limiter_stats()['FORCE_REST'] == {"accepted": 1, "dropped": 0, "merged": 9}
+
+
+def test_button_and_control_requests_are_not_limited(core, blocked_loop):
+    api = ControlApi(core)
+    assert [core.force_rest() for _ in range(3)] == ['queued'] * 3
+    assert [api.force_rest() for _ in range(3)] == [{"result": "queued"}] * 3
+    assert blocked_loop.qsize() == 6
+    assert core.get_input_limiter_stats() == {}
+
+    # 未经限流的事件出队不影响热键的合并状态
+    assert core._force_rest_hotkey() == 'queued'
+    assert core._force_rest_hotkey() == 'coalesced'
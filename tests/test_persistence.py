@@ -0,0 +1,60 @@
+"""后台持久化：flush 超时后的兜底写入不会与线程中的写入同时进行"""
+import threading
+import time
+
+from lib.persistence import PersistenceWorker
+
+
+class SlowDocument:
+    """persist() 阻塞到 release 被设置，记录同时进行的写入数"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.active = 0
+        self.max_active = 0
+        self.writes = 0
+        self._lock = threading.Lock()
+
+    def persist(self):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        self.started.set()
+        self.release.wait(5)
+        with self._lock:
+            self.active -= 1
+            self.writes += 1
+
+
+def test_flush_fallback_waits_for_write_in_progress():
+    worker = PersistenceWorker(coalesce_window=0)
+    document = SlowDocument()
+    try:
+        worker.mark_dirty(document)
+        assert document.started.wait(5)
+
+        # 线程仍在写入时再次保存，flush 超时后由调用线程兜底写入
+        worker.mark_dirty(document)
+        threading.Timer(0.3, document.release.set).start()
+        started = time.time()
+        assert worker.flush(timeout=0.05) is False
+        assert time.time() - started >= 0.2
+    finally:
+        document.release.set()
+        worker.stop()
+
+    assert document.max_active == 1
+    assert document.writes == 2
+
+
+def test_repeated_saves_are_coalesced():
+    worker = PersistenceWorker(coalesce_window=0.2)
+    document = SlowDocument()
+    document.release.set()
+    for _ in range(10):
+        worker.mark_dirty(document)
+    assert worker.flush() is True
+    worker.stop()
+    assert document.writes == 1
+    assert worker.save_requests == 10
@@ -0,0 +1,33 @@
+"""退出时正在进行的性能采集由事件循环线程结束（cProfile 只能在开始采集的线程中停止）"""
+import os
+import threading
+import time
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_capture_in_progress_is_stopped_in_event_loop(core, tmp_path):
+    core.profiler.output_dir = str(tmp_path)
+    stop_threads = []
+    original_stop = core.profiler.stop
+
+    def recording_stop():
+        stop_threads.append(threading.current_thread())
+        return original_stop()
+
+    core.profiler.stop = recording_stop
+    core.start_profiling(60)
+    assert wait_until(lambda: core.profiler.running)
+
+    core._stop_profiling_in_loop()
+
+    assert not core.profiler.running
+    assert stop_threads == [core.event_loop_thread]
+    assert os.path.exists(core.profiler.last_result["pstats"])
@@ -0,0 +1,176 @@
+"""统计文件合并：与顺序无关、幂等（包括旧格式文件），以及与重置、保留期清理的组合"""
+import json
+import random
+import shutil
+from datetime import date, timedelta
+
+import pytest
+
+from lib import statistics_crdt
+from lib.statistics_manager import StatisticsManager
+from lib.stats import merge_files
+
+LOCAL_DEVICE = "local-host"
+DEVICES = 1500
+
+
+@pytest.fixture(autouse=True)
+def local_device(monkeypatch, tmp_path):
+    """本机标识固定，统计文件写在临时目录"""
+    monkeypatch.setenv("EYE_REST_DEVICE_ID", LOCAL_DEVICE)
+    monkeypatch.chdir(tmp_path)
+
+
+def canonical(devices):
+    return json.dumps(devices, sort_keys=True)
+
+
+def day(offset):
+    return (date.today() - timedelta(days=offset)).strftime(statistics_crdt.DATE_FORMAT)
+
+
+def make_device_history(rng, days=20):
+    """一台设备的最终计数器，以及它在不同时间点导出的旧副本"""
+    counters = statistics_crdt.new_device_counters()
+    snapshots = []
+    for offset in range(days, -1, -1):
+        completed = rng.randint(0, 12)
+        if completed:
+            counters["daily"][day(offset)] = completed
+        counters["total"] += completed
+        counters["hourly"] = {"date": day(offset), "hours": [0] * 24}
+        for _ in range(completed):
+            counters["hourly"]["hours"][rng.randint(8, 20)] += 1
+        if rng.random() < 0.1:
+            snapshots.append(json.loads(json.dumps(counters)))
+    return counters, snapshots
+
+
+def write_json(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    return str(path)
+
+
+def legacy_document(total=17):
+    """旧格式（无 devices 字段）的统计文件内容"""
+    return {
+        "total_completed": total,
+        "daily_records": [{"date": day(1), "completed": total - 5}, {"date": day(0), "completed": 5}],
+        "today_hourly": {"date": day(0), "hours": [0] * 9 + [5] + [0] * 14},
+    }
+
+
+@pytest.fixture(scope="module")
+def device_files(tmp_path_factory):
+    """数千个模拟设备文件（每台设备还有若干旧副本）和期望的合并结果"""
+    directory = tmp_path_factory.mktemp("devices")
+    rng = random.Random(20250817)
+    expected = {}
+    paths = []
+    for index in range(DEVICES):
+        device_id = f"device-{index:05d}"
+        counters, snapshots = make_device_history(rng)
+        expected[device_id] = counters
+        paths.append(write_json(directory / f"{device_id}.json",
+                                statistics_crdt.build_document({device_id: counters})))
+        for n, snapshot in enumerate(snapshots):
+            paths.append(write_json(directory / f"{device_id}.old{n}.json",
+                                    statistics_crdt.build_document({device_id: snapshot})))
+    return paths, expected
+
+
+def test_merge_equals_latest_counters_per_device(device_files):
+    paths, expected = device_files
+    assert len(paths) > DEVICES
+    assert canonical(merge_files(paths)) == canonical(expected)
+
+
+def test_merge_is_order_independent(device_files):
+    paths, _ = device_files
+    merged = canonical(merge_files(paths))
+    rng = random.Random(1)
+    for _ in range(3):
+        shuffled = list(paths)
+        rng.shuffle(shuffled)
+        assert canonical(merge_files(shuffled)) == merged
+
+
+def test_merge_is_idempotent(device_files, tmp_path):
+    paths, _ = device_files
+    merged = merge_files(paths)
+    merged_path = write_json(tmp_path / "merged.json", statistics_crdt.build_document(merged))
+    again = merge_files(paths + [merged_path] + paths[: len(paths) // 2])
+    assert canonical(again) == canonical(merged)
+
+
+def test_legacy_file_and_its_migration_are_not_double_counted(tmp_path):
+    legacy_path = write_json(tmp_path / "statistics.json", legacy_document(17))
+
+    # StatisticsManager 加载旧文件时归属到本机，保存后即为迁移后的新格式
+    manager = StatisticsManager()
+    manager.stats_path = legacy_path
+    manager.load()
+    migrated_path = write_json(tmp_path / "migrated.json", manager.data)
+
+    merged = statistics_crdt.build_document(merge_files([legacy_path, migrated_path]))
+    assert merged["total_completed"] == 17
+    assert merged["devices"].keys() == {LOCAL_DEVICE}
+
+
+def test_legacy_file_copies_merge_idempotently(tmp_path):
+    first = write_json(tmp_path / "statistics.json", legacy_document(17))
+    (tmp_path / "backup").mkdir()
+    second = shutil.copy(first, tmp_path / "backup" / "statistics.json")
+
+    once = merge_files([first])
+    assert canonical(merge_files([first, second, first])) == canonical(once)
+    assert canonical(merge_files([second, first])) == canonical(once)
+    assert statistics_crdt.build_document(once)["total_completed"] == 17
+
+
+def test_legacy_file_with_explicit_device_is_separate(tmp_path):
+    other = write_json(tmp_path / "other.json", legacy_document(10))
+    local = write_json(tmp_path / "local.json", legacy_document(17))
+    devices = merge_files([local])
+    statistics_crdt.merge_devices(devices, merge_files([other], legacy_device_id="desktop"))
+    assert statistics_crdt.build_document(devices)["total_completed"] == 27
+
+
+def test_reset_then_merge_with_old_export_takes_maximum(tmp_path):
+    manager = StatisticsManager()
+    for _ in range(5):
+        manager.record_completed_rest()
+    old_export = write_json(tmp_path / "old.json", manager.data)
+
+    manager.reset_statistics()
+    for _ in range(2):
+        manager.record_completed_rest()
+    new_export = write_json(tmp_path / "new.json", manager.data)
+
+    # 重置只清空本地文件，与旧文件合并时旧计数按最大值重新出现，不会相加
+    merged = statistics_crdt.build_document(merge_files([new_export, old_export]))
+    assert merged["total_completed"] == 5
+    assert merged["daily_records"] == [{"date": day(0), "completed": 5}]
+    assert merged == statistics_crdt.build_document(merge_files([old_export, new_export, old_export]))
+
+
+def test_pruning_commutes_with_merge():
+    rng = random.Random(7)
+    a, _ = make_device_history(rng, days=60)
+    b, _ = make_device_history(rng, days=60)
+
+    def merged(*sources):
+        devices = {}
+        for source in sources:
+            statistics_crdt.merge_devices(devices, {LOCAL_DEVICE: json.loads(json.dumps(source))})
+        statistics_crdt.prune_devices(devices)
+        return canonical(devices)
+
+    pruned_a = {LOCAL_DEVICE: json.loads(json.dumps(a))}
+    statistics_crdt.prune_devices(pruned_a)
+
+    # 一方已清理过期的每日计数，合并后再清理的结果与双方都未清理时相同
+    assert merged(pruned_a[LOCAL_DEVICE], b) == merged(a, b) == merged(b, pruned_a[LOCAL_DEVICE])
+    cutoff = day(statistics_crdt.RETENTION_DAYS)
+    assert all(d >= cutoff for d in json.loads(merged(a, b))[LOCAL_DEVICE]["daily"])
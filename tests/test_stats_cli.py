@@ -0,0 +1,47 @@
+"""统计命令行：出错时报告错误、返回非0且不留下临时输出文件"""
+import json
+
+import pytest
+
+from lib.stats import main
+
+
+@pytest.fixture(autouse=True)
+def workdir(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+
+
+def test_bad_input_file_reports_error_and_removes_tmp(tmp_path, capsys):
+    (tmp_path / "broken.json").write_text("{ not json", encoding="utf-8")
+    (tmp_path / "out.json").write_text("旧的输出", encoding="utf-8")
+
+    assert main(["merge", "broken.json", "-o", "out.json"]) == 1
+    assert "错误" in capsys.readouterr().err
+    assert not (tmp_path / "out.json.tmp").exists()
+    assert (tmp_path / "out.json").read_text(encoding="utf-8") == "旧的输出"
+
+
+def test_missing_input_file_reports_error(tmp_path, capsys):
+    assert main(["merge", "missing.json", "-o", "out.json"]) == 1
+    assert "missing.json" in capsys.readouterr().err
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_interrupt_removes_tmp(tmp_path, monkeypatch, capsys):
+    (tmp_path / "stats.json").write_text(json.dumps({"total_completed": 1}), encoding="utf-8")
+
+    def interrupted(*args, **kwargs):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr("lib.stats.merge_files", interrupted)
+    assert main(["merge", "stats.json", "-o", "out.json"]) == 130
+    assert not (tmp_path / "out.json.tmp").exists()
+    assert not (tmp_path / "out.json").exists()
+
+
+@pytest.mark.parametrize("jobs", ["0", "-2", "x"])
+def test_jobs_must_be_positive(jobs, capsys):
+    with pytest.raises(SystemExit) as exc:
+        main(["summary", "stats.json", "--jobs", jobs])
+    assert exc.value.code == 2
+    assert "--jobs" in capsys.readouterr().err
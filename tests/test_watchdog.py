@@ -0,0 +1,49 @@
+"""看门狗：暂停监测的循环不发送心跳，全部暂停时监测线程不周期唤醒"""
+import time
+
+import pytest
+
+from lib.watchdog import Watchdog
+
+
+@pytest.fixture
+def watchdog(tmp_path):
+    watchdog = Watchdog(interval=0.02, threshold=0.1, diagnostics_dir=str(tmp_path))
+    yield watchdog
+    watchdog.stop()
+
+
+def test_suspended_loop_gets_no_heartbeats(watchdog):
+    posted = []
+    watchdog.watch('loop', posted.append)
+    watchdog.set_active('loop', False)
+    watchdog.start()
+    time.sleep(0.2)
+    assert posted == []
+
+    watchdog.set_active('loop', True)
+    time.sleep(0.2)
+    assert posted
+    posted[-1]()  # 响应心跳
+
+
+def test_unanswered_heartbeat_is_not_a_stall_after_suspend(watchdog):
+    posted = []
+    watchdog.watch('loop', posted.append)
+    watchdog.start()
+    time.sleep(0.05)
+    assert posted  # 心跳已发送但没有响应
+    watchdog.set_active('loop', False)
+    time.sleep(0.3)
+    stats = watchdog.get_stats()
+    assert stats["loops"]["loop"]["stalls"] == 0
+    assert stats["loops"]["loop"]["active"] is False
+    assert watchdog.dumps == []
+
+
+def test_stop_wakes_suspended_watchdog(watchdog):
+    watchdog.watch('loop', lambda callback: None)
+    watchdog.set_active('loop', False)
+    watchdog.start()
+    watchdog.stop()
+    assert not watchdog._thread.is_alive()
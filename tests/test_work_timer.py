@@ -0,0 +1,73 @@
+"""离开后回到工作状态：工作倒计时定时器与 work_end_time/work_duration 一致（含自适应调整）"""
+import time
+
+import pytest
+
+from lib.app_states import AppState
+
+WORK_MINUTES = 25
+IDLE_THRESHOLD_MINUTES = 1
+
+
+@pytest.fixture(autouse=True)
+def tired(core):
+    """疲劳度固定为最高，自适应调度会缩短工作时长"""
+    core.activity_history.fatigue = lambda timestamp=None: 1.0
+
+
+def handle(core, event_type):
+    """把事件交给事件循环并等待处理完成"""
+    core.event_queue.put({'type': event_type})
+    core.event_queue.join()
+
+
+def start_work(core, rest_minutes):
+    core.start_work_session(WORK_MINUTES, rest_minutes, False, False,
+                            idle_detection_enabled=True,
+                            idle_threshold_minutes=IDLE_THRESHOLD_MINUTES,
+                            adaptive_schedule_enabled=True)
+    core.event_queue.join()
+    assert core.current_state == AppState.WORKING
+
+
+def go_away(core, idle_seconds):
+    core.activity_detector.backend.set_idle(idle_seconds)
+    handle(core, 'CHECK_IDLE')
+    assert core.current_state == AppState.AWAY
+
+
+def come_back(core):
+    core.activity_detector.backend.touch()
+    handle(core, 'USER_ACTIVE')
+    assert core.current_state == AppState.WORKING
+
+
+def assert_timer_matches_end_time(core):
+    timer = core.timers['work_countdown']
+    assert core.work_end_time - core.work_start_time == pytest.approx(timer.interval, abs=0.5)
+    assert core.get_remaining_time() == pytest.approx(timer.interval, abs=2)
+
+
+def test_adjusted_work_time_is_kept_after_natural_break(core):
+    start_work(core, rest_minutes=1)
+    adjusted = core.work_duration
+    assert adjusted < WORK_MINUTES * 60
+    assert_timer_matches_end_time(core)
+
+    # 离开时长超过休息时间，记为自然休息并开始新的（同样经过调整的）工作周期
+    go_away(core, 120)
+    come_back(core)
+
+    assert core.timers['work_countdown'].interval == core.work_duration == adjusted
+    assert_timer_matches_end_time(core)
+
+
+def test_remaining_work_time_is_kept_after_short_away(core):
+    start_work(core, rest_minutes=5)
+    go_away(core, IDLE_THRESHOLD_MINUTES * 60 + 10)
+    remaining = core.remaining_work_time
+    come_back(core)
+
+    assert core.timers['work_countdown'].interval == remaining
+    assert core.work_end_time == pytest.approx(time.time() + remaining, abs=1)
+    assert core.get_remaining_time() == pytest.approx(remaining, abs=2)